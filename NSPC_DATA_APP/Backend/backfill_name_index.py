@@ -0,0 +1,55 @@
+import argparse
+
+from name_index import name_keys
+from server import create_app, db_pool
+
+SELECT_BATCH_QUERY = """
+SELECT master_id, v_name FROM Master_data
+WHERE master_id > %s AND v_name IS NOT NULL{missing}
+ORDER BY master_id LIMIT %s
+"""
+
+UPDATE_QUERY = "UPDATE Master_data SET v_name_norm = %s, v_name_phonetic = %s WHERE master_id = %s"
+
+
+def backfill(batch_size=1000, recompute=False):
+    """Fill v_name_norm and v_name_phonetic for rows inserted before they existed
+
+    With recompute every row is updated, for when name_index changes how the
+    keys are built. Walks the table in master_id order, committing each
+    batch, so it can be stopped and rerun at any time. Returns the number of
+    rows updated.
+    """
+    query = SELECT_BATCH_QUERY.format(missing='' if recompute else ' AND v_name_norm IS NULL')
+    updated = 0
+    last_id = 0
+    with db_pool.connection() as connection:
+        cursor = connection.cursor()
+        while True:
+            cursor.execute(query, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            cursor.executemany(UPDATE_QUERY, [name_keys(v_name) + (master_id,) for master_id, v_name in rows])
+            connection.commit()
+            updated += len(rows)
+            last_id = rows[-1][0]
+            print(f"Updated {updated} rows (master_id <= {last_id})")
+        cursor.close()
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the Master_data name search columns for existing rows")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per UPDATE batch (default: %(default)s)")
+    parser.add_argument("--all", action="store_true",
+                        help="Recompute the keys of every row, not only those without them (after migration 003)")
+    args = parser.parse_args()
+
+    # db_pool belongs to the app, so run inside its context
+    with create_app().app_context():
+        print(f"Done, {backfill(args.batch_size, recompute=args.all)} rows updated")
+
+
+if __name__ == "__main__":
+    main()
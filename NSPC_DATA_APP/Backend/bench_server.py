@@ -0,0 +1,113 @@
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+
+def wait_for_port(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Server did not start listening on {host}:{port}")
+
+
+def run_load(host, port, path, clients, duration):
+    """Hit path from clients keep-alive connections for duration seconds
+
+    Returns (requests, errors, latencies in seconds).
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client():
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        local, failed = [], 0
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 500:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+                continue
+            local.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), errors[0], latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /get_master_data requests/sec at several worker counts")
+    parser.add_argument("--field", default="v_id", choices=("v_id", "v_name", "contact"))
+    parser.add_argument("--value", required=True, help="Lookup value that exists in Master_data")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts (default: %(default)s)")
+    parser.add_argument("--threads", type=int, default=8, help="Threads per worker (default: %(default)s)")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent client connections (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per run (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=5055)
+    # Every run uses the same cache, or the worker counts aren't comparable. The in-process
+    # cache isn't offered: it is only correct with a single worker
+    parser.add_argument("--cache", choices=("none", "redis"), default="none",
+                        help="Lookup cache for every run: none (every request hits MySQL) or redis (default: %(default)s)")
+    parser.add_argument("--redis-url", default="redis://127.0.0.1:6379/0",
+                        help="Redis server for --cache redis (default: %(default)s)")
+    args = parser.parse_args()
+
+    host = '127.0.0.1'
+    path = '/get_master_data?' + urllib.parse.urlencode({args.field: args.value})
+    env = dict(os.environ)
+    env['NSPC_CACHE_BACKEND'] = args.cache
+    if args.cache == 'redis':
+        env['NSPC_CACHE_REDIS_URL'] = args.redis_url
+
+    print(f"GET {path}, {args.clients} clients, {args.duration:g}s per run, lookup cache: {args.cache}")
+    print(f"{'workers':>7} {'threads':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for workers in [int(count) for count in args.workers.split(',')]:
+        server = subprocess.Popen([sys.executable, 'serve.py', '--host', host, '--port', str(args.port),
+                                   '--workers', str(workers), '--threads', str(args.threads)],
+                                  cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(host, args.port)
+            # Warm up pools and caches before measuring
+            run_load(host, args.port, path, args.clients, 1)
+            count, errors, latencies = run_load(host, args.port, path, args.clients, args.duration)
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+
+        if len(latencies) > 1:
+            cuts = statistics.quantiles(latencies, n=100)
+            p50, p99 = cuts[49] * 1000, cuts[98] * 1000
+        else:
+            p50 = p99 = float('nan')
+        print(f"{workers:>7} {args.threads:>7} {count / args.duration:>9.1f} {p50:>8.1f} {p99:>8.1f} {errors:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import cv2
+import numpy as np
+
+# Voter cards are about 700x280 px at 300 DPI; the limits scale with the render DPI
+MIN_CARD_WIDTH = 400
+MIN_CARD_HEIGHT = 150
+MIN_ASPECT = 1.5
+MAX_ASPECT = 4
+# Ruling lines must be at least this long (at 300 DPI) to count as grid lines
+MIN_HORIZONTAL_LINE = 200
+MIN_VERTICAL_LINE = 100
+# Slack, in pixels, when deciding whether one box sits inside another
+NEST_TOLERANCE = 5
+# An enclosed box this close in area to its container is the same card outlined twice
+DUPLICATE_AREA_RATIO = 0.8
+
+
+def _grid_mask(binary, scale):
+    """Keep only the long horizontal and vertical ruling lines of the page"""
+    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (int(MIN_HORIZONTAL_LINE * scale), 1))
+    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, int(MIN_VERTICAL_LINE * scale)))
+    horizontal = cv2.morphologyEx(binary, cv2.MORPH_OPEN, horizontal_kernel)
+    vertical = cv2.morphologyEx(binary, cv2.MORPH_OPEN, vertical_kernel)
+    grid = cv2.bitwise_or(horizontal, vertical)
+    # Bridge small breaks where the lines meet
+    return cv2.dilate(grid, np.ones((3, 3), np.uint8))
+
+
+def _contains(outer, inner, tolerance=NEST_TOLERANCE):
+    ox, oy, ow, oh = outer
+    ix, iy, iw, ih = inner
+    return (ix >= ox - tolerance and iy >= oy - tolerance
+            and ix + iw <= ox + ow + tolerance and iy + ih <= oy + oh + tolerance)
+
+
+def _dedupe_nested(boxes):
+    """Drop duplicate outlines of the same card and frames that enclose several cards"""
+    boxes = sorted(boxes, key=lambda b: b[2] * b[3], reverse=True)
+    kept = []
+    for i, box in enumerate(boxes):
+        area = box[2] * box[3]
+        inner = [other for other in boxes[i + 1:] if _contains(box, other)]
+        if any(other[2] * other[3] < DUPLICATE_AREA_RATIO * area for other in inner):
+            # Encloses smaller cards, e.g. a section frame
+            continue
+        if any(_contains(other, box) for other in kept):
+            # Inner outline of a card that is already kept
+            continue
+        kept.append(box)
+    return kept
+
+
+def sort_reading_order(boxes):
+    """Sort boxes row by row, top to bottom, then left to right within a row"""
+    rows = []
+    for box in sorted(boxes, key=lambda b: b[1]):
+        # A box starting within half a card height of the row's first box joins that row
+        if rows and box[1] - rows[-1][0][1] < rows[-1][0][3] / 2:
+            rows[-1].append(box)
+        else:
+            rows.append([box])
+    return [box for row in rows for box in sorted(row, key=lambda b: b[0])]
+
+
+def detect_voter_boxes(gray, dpi=300):
+    """Find voter cards on a grayscale page
+
+    Cards are taken from the cells of the page's ruling-line grid, falling
+    back to external contours of the page when no grid is found. Candidates
+    are validated on size and aspect ratio, nested duplicates are removed and
+    the result is in reading order.
+
+    Returns (boxes, stats) where boxes are (x, y, w, h) tuples and stats
+    counts the candidates and why they were rejected.
+    """
+    scale = dpi / 300
+    _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY_INV)
+
+    stats = {'method': 'grid', 'candidates': 0, 'rejected_size': 0, 'rejected_aspect': 0, 'rejected_nested': 0}
+
+    accepted = []
+    for method in ('grid', 'contours'):
+        if method == 'grid':
+            contours, _ = cv2.findContours(_grid_mask(binary, scale), cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+        else:
+            contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        stats.update(method=method, candidates=len(contours), rejected_size=0, rejected_aspect=0)
+        accepted = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if w < MIN_CARD_WIDTH * scale or h < MIN_CARD_HEIGHT * scale:
+                stats['rejected_size'] += 1
+            elif not MIN_ASPECT < w / h < MAX_ASPECT:
+                stats['rejected_aspect'] += 1
+            else:
+                accepted.append((x, y, w, h))
+
+        if accepted:
+            break
+
+    boxes = _dedupe_nested(accepted)
+    stats['rejected_nested'] = len(accepted) - len(boxes)
+    stats['rejected'] = stats['candidates'] - len(boxes)
+
+    return sort_reading_order(boxes), stats
@@ -0,0 +1,88 @@
+import sys
+
+import pymysql
+
+from name_index import normalize_name, phonetic_key
+from server import (BATCH_LOOKUP_CHUNK_SIZE, DEFAULT_SEARCH_LIMIT, FUZZY_SEARCH_QUERY, MASTER_BATCH_LOOKUP_QUERIES,
+                    MASTER_FIELDS, MASTER_LOOKUP_QUERIES, PREFIX_SEARCH_QUERY, SEARCH_CANDIDATE_FACTOR, create_app,
+                    db_pool)
+
+# Used when Master_data is empty; EXPLAIN still reports the chosen key
+SAMPLE_PARAMS = {'v_id': 'ABC1234567', 'v_name': 'SAMPLE', 'contact': '0000000000'}
+
+
+def sample_params(cursor):
+    """Take lookup values from a real row so the optimizer sees realistic data"""
+    cursor.execute("SELECT v_id, v_name, contact FROM Master_data WHERE v_id IS NOT NULL LIMIT 1")
+    row = cursor.fetchone() or {}
+    return {field: row.get(field) or SAMPLE_PARAMS[field] for field in MASTER_LOOKUP_QUERIES}
+
+
+def sample_values(cursor, field, count):
+    """Up to count distinct real values of field, for the IN (...) batch queries"""
+    cursor.execute(f"SELECT DISTINCT {field} FROM Master_data WHERE {field} IS NOT NULL LIMIT %s", (count,))
+    return [row[field] for row in cursor.fetchall()] or [SAMPLE_PARAMS[field]]
+
+
+def lookup_checks(cursor):
+    """(label, query, params) for each Master_data read the API runs"""
+    params = sample_params(cursor)
+    checks = []
+    for field, query in MASTER_LOOKUP_QUERIES.items():
+        # First page of the lookup, as get_master_data runs it
+        checks.append((f"/get_master_data?{field}=", query.format(columns='master_id'), (params[field], 0, 1)))
+    for field, query in MASTER_BATCH_LOOKUP_QUERIES.items():
+        # A full chunk of values, as /get_master_data/batch sends them
+        values = sample_values(cursor, field, BATCH_LOOKUP_CHUNK_SIZE)
+        query = query.format(columns=', '.join(MASTER_FIELDS), placeholders=', '.join(['%s'] * len(values)))
+        checks.append((f"/get_master_data/batch {field}", query, values))
+
+    query_norm = normalize_name(params['v_name']) or 'sample'
+    checks.append(("/search?mode=prefix", PREFIX_SEARCH_QUERY, (query_norm + '%', DEFAULT_SEARCH_LIMIT)))
+    candidates = DEFAULT_SEARCH_LIMIT * SEARCH_CANDIDATE_FACTOR
+    checks.append(("/search?mode=fuzzy", FUZZY_SEARCH_QUERY,
+                   (phonetic_key(query_norm), candidates, query_norm, candidates)))
+    return checks
+
+
+def explain(cursor, query, params):
+    cursor.execute("EXPLAIN " + query, params)
+    return cursor.fetchall()
+
+
+def uses_index(plan):
+    """True if every table in the plan is read through an index, never a full scan"""
+    for row in plan:
+        if row.get('select_type') == 'UNION RESULT':
+            # Temporary table merging the branches of a UNION, each checked on its own row
+            continue
+        if row.get('Extra') and 'no matching row in const table' in row['Extra']:
+            # Unique-key lookup that the optimizer resolved before execution
+            continue
+        if row.get('key') is None or row.get('type') == 'ALL':
+            return False
+    return True
+
+
+def main():
+    failed = []
+    # db_pool belongs to the app, so run inside its context
+    with create_app().app_context(), db_pool.connection() as connection:
+        with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            for label, query, params in lookup_checks(cursor):
+                plan = explain(cursor, query, params)
+                ok = uses_index(plan)
+                for row in plan:
+                    print(f"{label}  type={row.get('type')} key={row.get('key')} "
+                          f"rows={row.get('rows')} {'OK' if ok else 'FULL SCAN'}")
+                if not ok:
+                    failed.append(label)
+
+    if failed:
+        print(f"Lookups without an index: {', '.join(failed)}")
+        sys.exit(1)
+    print("All Master_data lookups use an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pymysql
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the checkout timeout"""
+
+
+class PoolClosed(Exception):
+    """The pool has been shut down"""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of pymysql connections
+
+    Up to pool_size connections are kept open between requests. Under load
+    up to max_overflow extra connections are opened and closed again when
+    returned. Idle connections are pinged on checkout and replaced once
+    they are older than max_lifetime seconds.
+    """
+
+    def __init__(self, pool_size=5, max_overflow=10, max_lifetime=3600, timeout=30, **connect_kwargs):
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.connect_kwargs = connect_kwargs
+        self._idle = deque()
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _expired(self, connection):
+        return time.monotonic() - connection._pool_created_at > self.max_lifetime
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def _checkout_idle_or_slot(self):
+        """Pop an idle connection, or reserve a slot for a new one (returns None)"""
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosed("Connection pool is closed")
+                if self._idle:
+                    # Most recently used first, so surplus connections age out
+                    return self._idle.pop()
+                if self._open < self.pool_size + self.max_overflow:
+                    self._open += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"No database connection available after {self.timeout}s")
+                self._cond.wait(remaining)
+
+    def acquire(self):
+        """Check out a healthy connection"""
+        while True:
+            connection = self._checkout_idle_or_slot()
+            if connection is None:
+                try:
+                    connection = pymysql.connect(**self.connect_kwargs)
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+                connection._pool_created_at = time.monotonic()
+                return connection
+
+            if self._expired(connection):
+                self._discard(connection)
+                continue
+            try:
+                connection.ping(reconnect=False)
+            except Exception:
+                self._discard(connection)
+                continue
+            return connection
+
+    def release(self, connection, discard=False):
+        """Return a connection, rolling back anything left uncommitted"""
+        if not discard and connection.open:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            keep = (not discard and connection.open and not self._closed
+                    and not self._expired(connection) and len(self._idle) < self.pool_size)
+            if keep:
+                self._idle.append(connection)
+                self._cond.notify()
+                return
+
+        self._discard(connection)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a with block"""
+        connection = self.acquire()
+        broken = False
+        try:
+            yield connection
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            # The connection itself may be unusable, don't hand it out again
+            broken = True
+            raise
+        finally:
+            self.release(connection, discard=broken)
+
+    def close(self):
+        """Close idle connections and refuse new checkouts
+
+        Connections still checked out are closed as they are returned.
+        """
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for connection in idle:
+            self._discard(connection)
+
+    def stats(self):
+        with self._cond:
+            return {'open': self._open, 'idle': len(self._idle), 'in_use': self._open - len(self._idle),
+                    'pool_size': self.pool_size, 'max_overflow': self.max_overflow}
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Read PDFs in 1 MB chunks when hashing
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_sha256(path):
+    """Hex SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_key(settings):
+    """Canonical, hashable form of a settings dict"""
+    return json.dumps(settings or {}, sort_keys=True)
+
+
+class IngestManifest:
+    """Local record of the (PDF hash, settings, page) triples already committed to Master_data
+
+    Each finished page is appended to a JSON lines file and fsynced, so after a
+    crash a re-run only OCRs the pages that never reached the database. PDFs are
+    keyed by content, so a renamed file is still recognised and a revised roll
+    under the same name is ingested again. settings are whatever changes the
+    rows a page yields (booth_id, OCR options): a run with different ones
+    ingests every page again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._done = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short by the crash, that page is simply done again
+                        continue
+                    self._done.add((entry['pdf_sha256'], settings_key(entry.get('settings')), entry['page']))
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def pending_pages(self, pdf_hash, page_count, settings=None):
+        """0-based pages of a PDF not yet committed with these settings"""
+        key = settings_key(settings)
+        with self._lock:
+            return [page_num for page_num in range(page_count) if (pdf_hash, key, page_num) not in self._done]
+
+    def mark_done(self, pdf_hash, page_num, rows=0, settings=None):
+        """Record a page once its rows are committed"""
+        entry = {'pdf_sha256': pdf_hash, 'page': page_num, 'settings': settings or {}, 'rows': rows,
+                 'at': time.time()}
+        with self._lock:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._done.add((pdf_hash, settings_key(settings), page_num))
+
+    def close(self):
+        with self._lock:
+            self._file.close()
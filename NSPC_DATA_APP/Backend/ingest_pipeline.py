@@ -0,0 +1,225 @@
+import argparse
+import functools
+import glob
+import os
+import queue
+import threading
+import time
+
+import pytesseract
+
+from debug_writer import DEBUG_LEVELS
+from ingest_manifest import IngestManifest, file_sha256
+from lookup_cache import create_cache
+from master_db import (V_ID_INDEX, create_pool, insert_master_batch, load_config, master_cache_keys, master_values,
+                       stored_cache_keys)
+from master_rows import to_master_row
+from ocr_backend import BACKENDS
+from page_source import COLOR_MODES, POPPLER_PATH
+from voter_extractor_v3 import VoterExtractor, OCR_MODES, OCR_STRATEGIES
+
+TESSERACT_CMD = "C:\\Program Files\\Tesseract-OCR\\tesseract.exe"
+DEFAULT_MANIFEST = "ingest_manifest.jsonl"
+
+# Pages waiting for the database before OCR pauses
+MAX_PENDING_PAGES = 4
+# Extractor options that change the rows a page yields. With booth_id they are part of
+# the manifest key, so a re-run with other settings doesn't skip pages
+OUTPUT_OPTIONS = ('ocr_mode', 'ocr_strategy', 'ocr_backend', 'deskew', 'dpi', 'color', 'box_scale')
+
+
+class DatabaseWriter:
+    """Insert normalized Master_data rows on a background thread
+
+    Pages are handed over on a bounded queue, so when MySQL falls behind
+    put() blocks and OCR waits instead of buffering the whole PDF. Every page
+    is committed on its own, so its rows are visible as soon as it is done.
+    Rows are upserted on v_id, so writing a page twice is harmless. cache is
+    the API servers' shared (Redis) lookup cache, cleared of each page's
+    lookups once it is committed.
+    """
+
+    def __init__(self, pool, cache=None, batch_size=500, max_pending=MAX_PENDING_PAGES):
+        self.pool = pool
+        self.cache = cache
+        self.batch_size = batch_size
+        self.inserted = 0
+        self.skipped = 0
+        self.errors = []
+        self._error = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, label, rows, on_commit=None):
+        """Queue one page of rows, blocking while max_pending pages are waiting
+
+        on_commit is called on the writer thread once the page is committed.
+        """
+        if self._error is not None:
+            raise RuntimeError("Database writer stopped") from self._error
+        self._queue.put((label, rows, on_commit))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None:
+                    self._write(*item)
+            except Exception as e:
+                # Stop writing, the next put() or close() raises in the extracting thread
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, label, rows, on_commit=None):
+        start_time = time.time()
+        # Boxes where OCR found no voter ID can't be matched to a voter later
+        batch = [(index, master_values(row)) for index, row in enumerate(rows) if row.get('v_id')]
+        self.skipped += len(rows) - len(batch)
+
+        errors = []
+        inserted = 0
+        touched = set()
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            connection.begin()
+            for start in range(0, len(batch), self.batch_size):
+                chunk = batch[start:start + self.batch_size]
+                if self.cache is not None:
+                    # The stored rows' lookups, their contacts may be about to change
+                    touched.update(stored_cache_keys(cursor, [values[V_ID_INDEX] for _, values in chunk]))
+                inserted += insert_master_batch(cursor, chunk, errors)
+            connection.commit()
+            cursor.close()
+
+        if self.cache is not None:
+            touched.update(key for row in rows for key in master_cache_keys(row))
+            self.cache.delete_many(touched)
+        if on_commit is not None:
+            on_commit()
+        self.inserted += inserted
+        self.errors.extend({'page': label, **error} for error in errors)
+        print(f"{label}: wrote {inserted} of {len(rows)} rows, {len(errors)} failed "
+              f"({time.time() - start_time:.2f}s)")
+
+    def close(self):
+        """Wait for queued pages to be written, re-raising a write failure"""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+def ingest_pdf(pdf_path, writer, booth_id=None, manifest=None, **extractor_options):
+    """OCR a PDF page by page, handing each page's normalized rows to writer
+
+    With a manifest, pages already committed by an earlier run with the same
+    booth_id and OUTPUT_OPTIONS are skipped without being rendered, and each
+    page is recorded once it is committed.
+    """
+    extractor = VoterExtractor(pdf_path, **extractor_options)
+    name = os.path.basename(pdf_path)
+    page_nums = None
+    if manifest is not None:
+        pdf_hash = file_sha256(pdf_path)
+        settings = {'booth_id': booth_id, **{option: extractor_options.get(option) for option in OUTPUT_OPTIONS}}
+        page_nums = manifest.pending_pages(pdf_hash, extractor.pages.page_count, settings)
+        skipped = extractor.pages.page_count - len(page_nums)
+        if skipped:
+            print(f"{name}: {skipped} pages already ingested, {len(page_nums)} to go")
+
+    rows_total = 0
+    for page_num, df in extractor.iter_page_results(page_nums):
+        rows = [to_master_row(record, booth_id) for record in df.to_dict('records')]
+        on_commit = None
+        if manifest is not None:
+            on_commit = functools.partial(manifest.mark_done, pdf_hash, page_num, len(rows), settings)
+        writer.put(f"{name} page {page_num + 1}", rows, on_commit)
+        rows_total += len(rows)
+    extractor.flush_debug()
+    return rows_total
+
+
+def find_pdfs(paths):
+    """Expand files and directories into a sorted list of PDF paths"""
+    pdfs = []
+    for path in paths:
+        if os.path.isdir(path):
+            pdfs.extend(glob.glob(os.path.join(path, "*.pdf")))
+        else:
+            pdfs.append(path)
+    return sorted(set(pdfs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR booth PDFs straight into Master_data, page by page")
+    parser.add_argument("paths", nargs="+", help="PDF files or directories of PDFs")
+    parser.add_argument("--booth-id", type=int, help="Polling_booth.booth_id to set on every row")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per executemany (default: %(default)s)")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING_PAGES,
+                        help="Pages queued for the database before OCR pauses (default: %(default)s)")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST,
+                        help="Pages already committed, skipped on a re-run (default: %(default)s)")
+    parser.add_argument("--no-resume", action="store_true", help="Ingest every page, ignoring the manifest")
+    parser.add_argument("--ocr-mode", choices=OCR_MODES, default='box')
+    parser.add_argument("--ocr-strategy", choices=OCR_STRATEGIES, default='adaptive')
+    parser.add_argument("--ocr-backend", choices=BACKENDS, default='auto')
+    parser.add_argument("--ocr-cache", metavar="PATH",
+                        help="SQLite file of OCR results reused across runs, e.g. ocr_cache.sqlite")
+    parser.add_argument("--deskew", action="store_true", help="Straighten skewed scans before box detection")
+    parser.add_argument("--dpi", type=int, default=300, help="Page render resolution (default: %(default)s)")
+    parser.add_argument("--color", choices=COLOR_MODES, default='rgb')
+    parser.add_argument("--box-scale", type=int, help="Upscale factor for voter boxes (default: towards 600 DPI)")
+    parser.add_argument("--debug-level", choices=DEBUG_LEVELS, default='off')
+    parser.add_argument("--tesseract-cmd", default=TESSERACT_CMD)
+    parser.add_argument("--poppler-path", default=POPPLER_PATH)
+    args = parser.parse_args()
+
+    pdf_paths = find_pdfs(args.paths)
+    if not pdf_paths:
+        parser.error("No PDF files found")
+    pytesseract.pytesseract.tesseract_cmd = args.tesseract_cmd
+
+    # Same NSPC_* database and cache settings as the API server
+    config = load_config()
+    pool = create_pool(config)
+    cache = None
+    if config['CACHE_REDIS_URL']:
+        cache = create_cache('redis', config['CACHE_REDIS_URL'], ttl=config['CACHE_TTL'])
+    else:
+        # An API server's in-process cache can't be reached from here
+        print("CACHE_REDIS_URL is not set: an API server run with CACHE_BACKEND=local may return its cached lookups "
+              f"for ingested voters for up to {config['CACHE_TTL']}s")
+    writer = DatabaseWriter(pool, cache=cache, batch_size=args.batch_size, max_pending=args.max_pending)
+
+    # Pages are still recorded with --no-resume, so the next run can resume
+    manifest = IngestManifest(args.manifest)
+    start_time = time.time()
+    rows_total = 0
+    try:
+        for pdf_path in pdf_paths:
+            print(f"\nIngesting {pdf_path}")
+            rows_total += ingest_pdf(pdf_path, writer, booth_id=args.booth_id,
+                                     manifest=None if args.no_resume else manifest,
+                                     poppler_path=args.poppler_path,
+                                     ocr_mode=args.ocr_mode, ocr_backend=args.ocr_backend,
+                                     debug_level=args.debug_level, ocr_strategy=args.ocr_strategy,
+                                     ocr_cache=args.ocr_cache, deskew=args.deskew,
+                                     dpi=args.dpi, color=args.color, box_scale=args.box_scale)
+    finally:
+        writer.close()
+        manifest.close()
+        pool.close()
+
+    print(f"\nExtracted {rows_total} rows from {len(pdf_paths)} PDFs: wrote {writer.inserted}, "
+          f"skipped {writer.skipped} without a voter ID, failed {len(writer.errors)}",
+          f"Time Taken {time.time() - start_time}")
+    for error in writer.errors[:20]:
+        print(f"  {error['page']} row {error['row']} ({error['v_id']}): {error['message']}")
+
+
+if __name__ == "__main__":
+    main()
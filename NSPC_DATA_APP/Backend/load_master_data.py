@@ -0,0 +1,57 @@
+import argparse
+import csv
+import json
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from master_rows import to_master_row
+
+DEFAULT_URL = "http://127.0.0.1:5000/insert_master_data/bulk"
+
+
+def iter_ndjson(csv_path, booth_id=None):
+    """Stream a CSV file as NDJSON lines, one Master_data row per line"""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for record in csv.DictReader(f):
+            yield (json.dumps(to_master_row(record, booth_id)) + "\n").encode('utf-8')
+
+
+def load_csv(csv_path, url=DEFAULT_URL, batch_size=500, atomic=False, booth_id=None):
+    """POST a CSV to the bulk insert endpoint and return the decoded JSON response"""
+    query = urllib.parse.urlencode({'batch_size': batch_size, 'atomic': str(atomic).lower()})
+    # An iterable body is sent with chunked transfer encoding, so the file is never fully in memory
+    request = urllib.request.Request(f"{url}?{query}", data=iter_ndjson(csv_path, booth_id), method='POST',
+                                     headers={'Content-Type': 'application/x-ndjson'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        return json.load(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load voter CSV output into Master_data via the bulk endpoint")
+    parser.add_argument("csv_path", nargs="?", default="voter_data_all.csv")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per executemany (default: %(default)s)")
+    parser.add_argument("--booth-id", type=int, help="Polling_booth.booth_id to set on every row")
+    parser.add_argument("--atomic", action="store_true", help="Insert nothing if any row fails")
+    args = parser.parse_args()
+
+    result = load_csv(args.csv_path, url=args.url, batch_size=args.batch_size, atomic=args.atomic, booth_id=args.booth_id)
+
+    print(f"Status: {result.get('status')}", f"Received: {result.get('received')}",
+          f"Inserted: {result.get('inserted')}", f"Failed: {result.get('failed')}")
+    if result.get('message'):
+        print(result['message'])
+    for error in result.get('errors', [])[:20]:
+        print(f"  row {error['row']} ({error['v_id']}): {error['message']}")
+
+    if result.get('status') != 'success':
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # redis is optional, the in-process cache needs nothing
+    redis = None
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters shared by the cache backends"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {'hits': 0, 'misses': 0, 'sets': 0, 'invalidations': 0, 'evictions': 0, 'expired': 0}
+
+    def add(self, name, count=1):
+        with self._lock:
+            self.counts[name] += count
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self.counts)
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_ratio'] = round(counts['hits'] / lookups, 3) if lookups else None
+        return counts
+
+
+# Names accepted by create_cache
+CACHE_BACKENDS = ('none', 'local', 'redis')
+
+
+class NullCache:
+    """Caches nothing, every lookup is a miss"""
+
+    backend = 'none'
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get_many(self, keys):
+        self.stats.add('misses', len(list(keys)))
+        return {}
+
+    def set_many(self, mapping):
+        pass
+
+    def delete_many(self, keys):
+        pass
+
+    def clear(self):
+        pass
+
+    def info(self):
+        return {'backend': self.backend, **self.stats.snapshot()}
+
+
+class LRUCache:
+    """In-process LRU cache with a per-entry TTL
+
+    Holds at most max_entries values, evicting the least recently used.
+    Entries older than ttl seconds are treated as misses. Inserts made by
+    other processes never reach it, so it is only right for a single
+    worker process.
+    """
+
+    backend = 'local'
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """Return {key: value} for the keys that are cached and fresh"""
+        keys = list(keys)
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    self.stats.add('expired')
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        self.stats.add('hits', len(found))
+        self.stats.add('misses', len(keys) - len(found))
+        return found
+
+    def set_many(self, mapping):
+        expires_at = time.monotonic() + self.ttl
+        evicted = 0
+        with self._lock:
+            for key, value in mapping.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self.stats.add('sets', len(mapping))
+        self.stats.add('evictions', evicted)
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        self.stats.add('invalidations', len(keys))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self):
+        with self._lock:
+            size = len(self._entries)
+        return {'backend': self.backend, 'entries': size, 'max_entries': self.max_entries, 'ttl': self.ttl,
+                **self.stats.snapshot()}
+
+
+class RedisCache:
+    """Cache shared by every worker through a Redis-compatible server
+
+    Values are stored as JSON with a TTL; Redis does the LRU eviction
+    (configure maxmemory-policy allkeys-lru). Counters are per process.
+    """
+
+    backend = 'redis'
+
+    def __init__(self, url='redis://127.0.0.1:6379/0', ttl=300, prefix='nspc:master:'):
+        if redis is None:
+            raise ImportError("redis is not installed")
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+        self._client = redis.Redis.from_url(url)
+
+    def _key(self, key):
+        return self.prefix + ':'.join(key)
+
+    def get_many(self, keys):
+        keys = list(keys)
+        found = {}
+        if keys:
+            for key, raw in zip(keys, self._client.mget([self._key(key) for key in keys])):
+                if raw is not None:
+                    found[key] = json.loads(raw)
+        self.stats.add('hits', len(found))
+        self.stats.add('misses', len(keys) - len(found))
+        return found
+
+    def set_many(self, mapping):
+        with self._client.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(self._key(key), json.dumps(value, default=str), ex=self.ttl)
+            pipe.execute()
+        self.stats.add('sets', len(mapping))
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        if keys:
+            self._client.delete(*[self._key(key) for key in keys])
+        self.stats.add('invalidations', len(keys))
+
+    def clear(self):
+        for name in self._client.scan_iter(match=self.prefix + '*'):
+            self._client.delete(name)
+
+    def info(self):
+        return {'backend': self.backend, 'ttl': self.ttl, **self.stats.snapshot()}
+
+
+def create_cache(backend=None, redis_url=None, max_entries=10000, ttl=300):
+    """Cache for backend, one of CACHE_BACKENDS
+
+    Without a backend, Redis is used when redis_url is set and nothing is
+    cached otherwise: the in-process LRU has to be asked for by name.
+    """
+    if backend is None:
+        backend = 'redis' if redis_url else 'none'
+    if backend == 'redis':
+        if not redis_url:
+            raise ValueError("The redis cache backend needs a redis_url")
+        return RedisCache(redis_url, ttl=ttl)
+    if backend == 'local':
+        return LRUCache(max_entries=max_entries, ttl=ttl)
+    if backend == 'none':
+        return NullCache()
+    raise ValueError(f"Unknown cache backend {backend!r}, expected one of {', '.join(CACHE_BACKENDS)}")
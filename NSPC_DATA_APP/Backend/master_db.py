@@ -0,0 +1,163 @@
+import json
+import os
+
+import pymysql
+
+from db_pool import ConnectionPool
+from lookup_cache import create_cache
+from master_rows import MASTER_COLUMNS
+from name_index import name_keys
+
+# Settings shared by the API server and the ingest pipeline. Every key can be overridden
+# with an NSPC_ prefixed environment variable, e.g. NSPC_DB_HOST=db.internal NSPC_DB_POOL_SIZE=20
+DEFAULT_CONFIG = {
+    # MySQL database connection details
+    'DB_HOST': '127.0.0.1',
+    'DB_PORT': 3306,
+    'DB_USER': 'NSPC_Admin',
+    'DB_PASSWORD': None,      # Required, set NSPC_DB_PASSWORD
+    'DB_NAME': 'NSPC_DATA_APP',
+    # Shared connection pool, so requests don't pay TCP + auth on every call
+    'DB_POOL_SIZE': 5,        # Connections kept open between requests
+    'DB_MAX_OVERFLOW': 10,    # Extra connections allowed under load
+    'DB_MAX_LIFETIME': 3600,  # Seconds before a connection is recycled
+    'DB_POOL_TIMEOUT': 30,    # Seconds to wait for a free connection
+    # Read-through cache for v_id and contact lookups, invalidated by the insert routes.
+    # An insert only clears the cache of the process that handled it, so the in-process
+    # LRU ('local') is only right for a single worker process and has to be asked for
+    'CACHE_BACKEND': None,      # 'none', 'local' or 'redis'; unset means 'redis' if CACHE_REDIS_URL is set, else 'none'
+    'CACHE_REDIS_URL': None,    # e.g. 'redis://127.0.0.1:6379/0' to share the cache between workers
+    'CACHE_MAX_ENTRIES': 10000, # Lookups kept in the in-process LRU
+    'CACHE_TTL': 300,           # Seconds before a cached lookup is read again from MySQL
+}
+
+ENV_PREFIX = 'NSPC_'
+
+# Upsert on the v_id UNIQUE key, so re-sending a voter is safe. Fields the new row leaves
+# empty keep their stored value (e.g. a contact added in the field), and MySQL doesn't
+# write rows that come back unchanged
+UPSERT_COLUMNS = tuple(column for column in MASTER_COLUMNS if column != 'v_id') + ('v_name_norm', 'v_name_phonetic')
+# Position of v_id in the value tuples passed to INSERT_MASTER_QUERY
+V_ID_INDEX = MASTER_COLUMNS.index('v_id')
+
+INSERT_MASTER_QUERY = """
+INSERT INTO Master_data (booth_id, s_no, v_id, v_name, relation_name, relation_type, address, age, gender, v_status, contact,
+                         v_name_norm, v_name_phonetic)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+""" + ',\n'.join(f"    {column} = COALESCE(VALUES({column}), {column})" for column in UPSERT_COLUMNS)
+
+# Lookups served through the lookup cache
+CACHED_LOOKUP_FIELDS = ('v_id', 'contact')
+
+# Cached lookup values of the stored rows an upsert is about to change, locked until it commits
+STORED_LOOKUP_QUERY = ("SELECT " + ', '.join(CACHED_LOOKUP_FIELDS)
+                       + " FROM Master_data WHERE v_id IN ({placeholders}) FOR UPDATE")
+
+# Values per IN (...) query
+BATCH_LOOKUP_CHUNK_SIZE = 200
+
+
+def load_config(prefix=ENV_PREFIX):
+    """DEFAULT_CONFIG overridden by NSPC_* environment variables
+
+    Values are parsed as JSON where they can be, like Flask's
+    from_prefixed_env, so scripts see the same settings as create_app.
+    """
+    config = dict(DEFAULT_CONFIG)
+    for name, value in os.environ.items():
+        if name.startswith(prefix):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+            config[name[len(prefix):]] = value
+    return config
+
+
+def create_pool(config):
+    """ConnectionPool for the DB_* settings of config"""
+    if config['DB_PASSWORD'] is None:
+        raise RuntimeError("No database password configured, set NSPC_DB_PASSWORD")
+    return ConnectionPool(
+        pool_size=config['DB_POOL_SIZE'],
+        max_overflow=config['DB_MAX_OVERFLOW'],
+        max_lifetime=config['DB_MAX_LIFETIME'],
+        timeout=config['DB_POOL_TIMEOUT'],
+        host=config['DB_HOST'],
+        port=int(config['DB_PORT']),
+        user=config['DB_USER'],
+        # Settings are parsed as JSON, so a numeric password arrives as an int
+        password=str(config['DB_PASSWORD']),
+        database=config['DB_NAME'],
+    )
+
+
+def create_lookup_cache(config):
+    """Lookup cache for the CACHE_* settings of config"""
+    return create_cache(
+        backend=config['CACHE_BACKEND'],
+        redis_url=config['CACHE_REDIS_URL'],
+        max_entries=config['CACHE_MAX_ENTRIES'],
+        ttl=config['CACHE_TTL'],
+    )
+
+
+def master_values(row):
+    """INSERT_MASTER_QUERY values for a Master_data row dict"""
+    return tuple(row.get(column) for column in MASTER_COLUMNS) + name_keys(row.get('v_name'))
+
+
+def insert_master_batch(cursor, batch, errors):
+    """Upsert a batch of (row_index, values) with executemany
+
+    If the batch fails it is rolled back to a savepoint and retried row by
+    row, so only the offending rows are reported in errors.
+    Returns the number of rows inserted or updated.
+    """
+    cursor.execute("SAVEPOINT bulk_batch")
+    try:
+        cursor.executemany(INSERT_MASTER_QUERY, [values for _, values in batch])
+        return len(batch)
+    except (pymysql.MySQLError, TypeError, ValueError):
+        # TypeError/ValueError: pymysql couldn't escape a value, nothing was sent
+        cursor.execute("ROLLBACK TO SAVEPOINT bulk_batch")
+
+    inserted = 0
+    for index, values in batch:
+        try:
+            cursor.execute(INSERT_MASTER_QUERY, values)
+            inserted += 1
+        except (pymysql.MySQLError, TypeError, ValueError) as e:
+            errors.append({'row': index, 'v_id': values[V_ID_INDEX], 'message': str(e)})
+    return inserted
+
+
+def cache_key(field, value):
+    """Lookup cache key for a lookup, equal for values MySQL treats as equal"""
+    value = str(value).strip()
+    if field == 'contact' and value.isdigit():
+        return (field, str(int(value)))
+    return (field, value.casefold())
+
+
+def master_cache_keys(row):
+    """Cached lookups that inserting row would change"""
+    return [cache_key(field, row[field]) for field in CACHED_LOOKUP_FIELDS if row.get(field) not in (None, '')]
+
+
+def stored_cache_keys(cursor, v_ids):
+    """Cached lookups of the rows already stored under v_ids
+
+    An upsert can change a voter's contact, so the lookup for the old
+    contact has to be dropped as well as the one for the new. Call this
+    in the upsert's transaction, before it runs.
+    """
+    v_ids = list(dict.fromkeys(v_ids))
+    keys = set()
+    for start in range(0, len(v_ids), BATCH_LOOKUP_CHUNK_SIZE):
+        chunk = v_ids[start:start + BATCH_LOOKUP_CHUNK_SIZE]
+        cursor.execute(STORED_LOOKUP_QUERY.format(placeholders=', '.join(['%s'] * len(chunk))), chunk)
+        for row in cursor.fetchall():
+            keys.update(master_cache_keys(dict(zip(CACHED_LOOKUP_FIELDS, row))))
+    return keys
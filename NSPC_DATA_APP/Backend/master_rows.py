@@ -0,0 +1,95 @@
+import re
+
+# Extractor output field (VoterExtractor rows, voter_data_all.csv) -> Master_data column
+EXTRACTOR_COLUMNS = {
+    'voter_id': 'v_id',
+    'name': 'v_name',
+    'relative_name': 'relation_name',
+    'relation_type': 'relation_type',
+    'house_number': 'address',
+    'age': 'age',
+    'gender': 'gender',
+}
+
+# Master_data columns accepted from clients, in insert order (master_id is AUTO_INCREMENT)
+MASTER_COLUMNS = ('booth_id', 's_no', 'v_id', 'v_name', 'relation_name', 'relation_type', 'address', 'age', 'gender', 'v_status', 'contact')
+
+# VARCHAR sizes from Create_tables.sql, so strict-mode MySQL never rejects a long OCR string
+COLUMN_LENGTHS = {'s_no': 5, 'v_id': 45, 'v_name': 100, 'relation_name': 100, 'relation_type': 50,
+                  'address': 150, 'v_status': 45}
+
+# Master_data.gender is VARCHAR(1): Male, Female, Third gender
+GENDER_CODES = ('M', 'F', 'T')
+RELATION_TYPES = ('Father', 'Mother', 'Husband', 'Wife', 'Other')
+# Electoral rolls only list adults
+MIN_AGE = 18
+MAX_AGE = 120
+
+
+def normalize_gender(value):
+    code = str(value).strip()[:1].upper()
+    return code if code in GENDER_CODES else None
+
+
+def normalize_age(value):
+    try:
+        age = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return age if MIN_AGE <= age <= MAX_AGE else None
+
+
+def normalize_relation_type(value):
+    text = str(value).strip()
+    for relation in RELATION_TYPES:
+        # OCR case and plural variants, e.g. "HUSBAND", "Others"
+        if text.lower().startswith(relation.lower()):
+            return relation
+    return text.title() or None
+
+
+def normalize_contact(value):
+    digits = re.sub(r'\D', '', str(value))
+    return int(digits) if digits else None
+
+
+def normalize_master_row(row):
+    """Clean a Master_data row in place so it fits the column types, and return it"""
+    for column, value in row.items():
+        if isinstance(value, str):
+            row[column] = value.strip() or None
+        elif isinstance(value, float) and value != value:
+            # pandas reads empty CSV cells as NaN
+            row[column] = None
+
+    if row.get('v_id'):
+        row['v_id'] = row['v_id'].replace(' ', '').upper()
+    if row.get('gender') is not None:
+        row['gender'] = normalize_gender(row['gender'])
+    if row.get('age') is not None:
+        row['age'] = normalize_age(row['age'])
+    if row.get('relation_type') is not None:
+        row['relation_type'] = normalize_relation_type(row['relation_type'])
+    if row.get('contact') is not None:
+        row['contact'] = normalize_contact(row['contact'])
+
+    for column, length in COLUMN_LENGTHS.items():
+        if isinstance(row.get(column), str):
+            row[column] = row[column][:length]
+    return row
+
+
+def to_master_row(record, booth_id=None):
+    """Map an extractor or CSV record to a normalized Master_data row
+
+    Accepts both the extractor's field names (voter_id, name, ...) and records
+    that already use the Master_data column names (e.g. master_data1.csv).
+    """
+    if 'v_id' in record:
+        row = {column: record.get(column) for column in MASTER_COLUMNS}
+    else:
+        row = {column: record.get(field) for field, column in EXTRACTOR_COLUMNS.items()}
+
+    if booth_id is not None:
+        row['booth_id'] = booth_id
+    return normalize_master_row(row)
@@ -0,0 +1,86 @@
+import re
+
+# Spellings that sound the same in transliterated Indian names, applied in order
+PHONETIC_REPLACEMENTS = (
+    ('aa', 'a'), ('ee', 'i'), ('oo', 'u'), ('ou', 'u'),
+    ('bh', 'b'), ('dh', 'd'), ('gh', 'g'), ('jh', 'j'), ('kh', 'k'), ('th', 't'),
+    ('ph', 'f'), ('sh', 's'), ('ch', 'c'), ('ck', 'k'), ('ks', 'x'), ('q', 'k'), ('w', 'v'), ('z', 'j'),
+)
+
+# Soundex-style consonant groups; vowels, h and y carry no code
+PHONETIC_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgkjsx', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+
+# Word keys are padded like Soundex, so even one-letter initials clear InnoDB's
+# innodb_ft_min_token_size (3) in the ft_master_name_phonetic FULLTEXT index
+PHONETIC_TOKEN_LENGTH = 4
+# Length of the v_name_phonetic column
+MAX_PHONETIC_KEY_LENGTH = 150
+
+
+def normalize_name(name):
+    """Lowercase a name and reduce it to single-spaced letters"""
+    if not name:
+        return ''
+    return ' '.join(re.sub(r'[^a-z]+', ' ', name.lower()).split())
+
+
+def _phonetic_token(token):
+    for spelling, sound in PHONETIC_REPLACEMENTS:
+        token = token.replace(spelling, sound)
+
+    key = token[0]
+    previous = PHONETIC_CODES.get(token[0])
+    for letter in token[1:]:
+        code = PHONETIC_CODES.get(letter)
+        if code is not None and code != previous:
+            key += code
+        if code is not None or letter in 'aeiou':
+            # Vowels separate repeated codes, h and y do not
+            previous = code
+    return key.ljust(PHONETIC_TOKEN_LENGTH, '0')
+
+
+def phonetic_key(name):
+    """Phonetic key of a name, one Soundex-like code per word
+
+    Unlike Soundex the codes are not truncated, and common transliteration
+    variants are folded first, so "Lakshmi" and "Laxmi" share a key. Words
+    are matched one by one, so "Laxmi" also finds "Lakshmi Devi".
+    """
+    return ' '.join(_phonetic_token(token) for token in normalize_name(name).split())
+
+
+def trigrams(name):
+    """Set of character trigrams of a normalized name, words padded with spaces"""
+    grams = set()
+    for token in normalize_name(name).split():
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    """Trigram similarity of two names, from 0 (nothing shared) to 1 (same)"""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def name_keys(name):
+    """(v_name_norm, v_name_phonetic) stored alongside v_name
+
+    A phonetic key too long for its column keeps its leading whole words.
+    """
+    norm = normalize_name(name)
+    phonetic = phonetic_key(norm)
+    if len(phonetic) > MAX_PHONETIC_KEY_LENGTH:
+        phonetic = phonetic[:MAX_PHONETIC_KEY_LENGTH + 1].rsplit(' ', 1)[0]
+    return (norm or None, phonetic or None)
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from ocr_backend import OcrBackend
+
+# Default size bound for the cache file's stored results
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Fraction of max_bytes kept after an eviction, so evictions don't run on every insert
+EVICT_TO = 0.9
+# Seconds between last_used updates for an entry, reads mostly stay read-only
+TOUCH_INTERVAL = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ocr_results_last_used ON ocr_results (last_used);
+"""
+
+
+def image_digest(image):
+    """SHA-256 of an image's pixels, shape and type (numpy array or PIL image)"""
+    digest = hashlib.sha256()
+    if isinstance(image, np.ndarray):
+        image = np.ascontiguousarray(image)
+        digest.update(f"{image.shape}{image.dtype}".encode())
+    else:
+        digest.update(f"{image.size}{image.mode}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(kind, image, config, engine):
+    """Key for one OCR call: what was asked for, on which pixels, with which engine"""
+    return hashlib.sha256(f"{kind}\0{config}\0{engine}\0{image_digest(image)}".encode()).hexdigest()
+
+
+class OcrCache:
+    """On-disk OCR results in SQLite, evicting least recently used past max_bytes
+
+    Several processes can share one cache file. Values are JSON, so both
+    image_to_string text and image_to_data word boxes can be stored.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        # Bytes written since the last size check; the total is re-read from the file
+        # because other processes write to it too
+        self._written = 0
+
+    def get(self, key):
+        """Cached value for key, or None"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, last_used FROM ocr_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            if now - row[1] > TOUCH_INTERVAL:
+                self._connection.execute("UPDATE ocr_results SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        value = json.dumps(value)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO ocr_results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()))
+            self._written += len(value)
+            if self._written > self.max_bytes * (1 - EVICT_TO):
+                self._written = 0
+                self._evict()
+
+    def _evict(self):
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+        excess = total - self.max_bytes * EVICT_TO
+        if total <= self.max_bytes or excess <= 0:
+            return
+        keys = []
+        for key, size in self._connection.execute("SELECT key, size FROM ocr_results ORDER BY last_used"):
+            keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._connection.executemany("DELETE FROM ocr_results WHERE key = ?", keys)
+
+    def info(self):
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results").fetchone()
+        return {'path': self.path, 'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM ocr_results")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class CachedBackend(OcrBackend):
+    """Serve OCR calls from an OcrCache, running the wrapped backend on a miss
+
+    Keys cover the image pixels, the tesseract config and the engine
+    version, so re-running an extraction with new parsing rules only reads
+    the cache while a tesseract upgrade starts from scratch.
+    """
+
+    def __init__(self, backend, cache):
+        super().__init__(threads=backend.threads)
+        self.backend = backend
+        self.cache = cache
+        self.name = backend.name
+        self._engine = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = f"{self.backend.name} {self.backend.version()}"
+        return self._engine
+
+    def version(self):
+        return self.backend.version()
+
+    def image_to_string(self, image, config=''):
+        key = cache_key('string', image, config, self.engine)
+        text = self.cache.get(key)
+        if text is None:
+            text = self.backend.image_to_string(image, config=config)
+            self.cache.set(key, text)
+        return text
+
+    def image_to_data(self, image, config=''):
+        key = cache_key('data', image, config, self.engine)
+        data = self.cache.get(key)
+        if data is None:
+            data = self.backend.image_to_data(image, config=config)
+            self.cache.set(key, data)
+        return data
+
+    def close(self):
+        super().close()
+        self.backend.close()
+        self.cache.close()
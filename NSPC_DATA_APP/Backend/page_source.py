@@ -0,0 +1,74 @@
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+from page_preprocess import BINARY_THRESHOLD
+
+POPPLER_PATH = "C:\\Users\\chsat\\Documents\\poppler-24.08.0\\Library\\bin"
+
+# 'gray' has poppler render one channel instead of RGB; 'mono' also thresholds it to
+# black and white as it is rendered (pdf2image has no option for pdftoppm -mono)
+COLOR_MODES = ('rgb', 'gray', 'mono')
+# Lookup table for 'mono', the same cut the extractor binarizes boxes with
+MONO_TABLE = [255 if level > BINARY_THRESHOLD else 0 for level in range(256)]
+
+
+class PdfPageSource:
+    """Rasterize the pages of a PDF on demand, one page at a time"""
+
+    def __init__(self, pdf_path, dpi=300, poppler_path=POPPLER_PATH, color='rgb'):
+        if color not in COLOR_MODES:
+            raise ValueError(f"color must be one of {COLOR_MODES}, got {color!r}")
+        self.pdf_path = pdf_path
+        self.dpi = dpi
+        self.color = color
+        self.poppler_path = poppler_path
+        self._page_count = None
+        # Keep only the most recently rendered page so repeated lookups
+        # of the same page never re-rasterize the PDF
+        self._cached_page_num = None
+        self._cached_page = None
+
+    @property
+    def page_count(self):
+        """Number of pages, read from the PDF metadata (no rendering)"""
+        if self._page_count is None:
+            info = pdfinfo_from_path(self.pdf_path, poppler_path=self.poppler_path)
+            self._page_count = int(info["Pages"])
+        return self._page_count
+
+    def __len__(self):
+        return self.page_count
+
+    def render_page(self, page_num):
+        """Render a single page (0-based) as a PIL image without caching it
+
+        The image is RGB, or single-channel 'L' for the gray and mono modes.
+        """
+        if not 0 <= page_num < self.page_count:
+            raise IndexError(f"Page {page_num + 1} out of range (PDF has {self.page_count} pages)")
+
+        pages = convert_from_path(
+            self.pdf_path,
+            dpi=self.dpi,
+            first_page=page_num + 1,
+            last_page=page_num + 1,
+            poppler_path=self.poppler_path,
+            grayscale=self.color != 'rgb',
+        )
+        if self.color == 'mono':
+            return pages[0].point(MONO_TABLE)
+        return pages[0]
+
+    def get_page(self, page_num):
+        """Render a single page (0-based) as a PIL image, reusing the last render"""
+        if page_num != self._cached_page_num:
+            # Drop the previous bitmap before rendering the next one
+            self.release()
+            self._cached_page = self.render_page(page_num)
+            self._cached_page_num = page_num
+
+        return self._cached_page
+
+    def release(self):
+        """Drop the cached page bitmap"""
+        self._cached_page_num = None
+        self._cached_page = None
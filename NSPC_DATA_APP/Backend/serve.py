@@ -0,0 +1,84 @@
+import argparse
+import importlib
+import signal
+import threading
+
+try:
+    import gunicorn.app.base
+except ImportError:  # gunicorn is optional (and POSIX only), werkzeug's threaded server is the fallback
+    gunicorn = None
+
+
+def load_app(spec):
+    """Call an app factory given as 'module:function'"""
+    module_name, _, factory = spec.partition(':')
+    return getattr(importlib.import_module(module_name), factory or 'create_app')()
+
+
+def serve_gunicorn(spec, host, port, workers, threads, timeout, graceful_timeout):
+    """Run under gunicorn with workers processes of threads threads each
+
+    Every worker calls the factory itself, so no connection pool is shared
+    across a fork. On SIGTERM gunicorn stops accepting, lets in-flight
+    requests finish for up to graceful_timeout seconds, and each worker
+    drains its pool on exit.
+    """
+
+    class Application(gunicorn.app.base.BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"{host}:{port}")
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('timeout', timeout)
+            self.cfg.set('graceful_timeout', graceful_timeout)
+
+        def load(self):
+            return load_app(spec)
+
+    Application().run()
+
+
+def serve_threaded(spec, host, port):
+    """Run werkzeug's threaded server in this process, without debugger or reloader"""
+    from werkzeug.serving import make_server
+
+    server = make_server(host, port, load_app(spec), threaded=True)
+
+    def stop(signum, frame):
+        # shutdown() waits for serve_forever to return, so call it off the main thread
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    print(f"Serving {spec} on http://{host}:{port} (threaded, single process)")
+    server.serve_forever()
+    # Pools are drained by their atexit hooks once serve_forever returns
+
+
+def main(argv=None, default_app='server:create_app', default_workers=4, max_workers=None):
+    parser = argparse.ArgumentParser(description="Serve a Flask app factory for production use")
+    parser.add_argument("--app", default=default_app, help="App factory as module:function (default: %(default)s)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("-w", "--workers", type=int, default=default_workers,
+                        help="Worker processes (default: %(default)s)")
+    parser.add_argument("-t", "--threads", type=int, default=8, help="Threads per worker (default: %(default)s)")
+    parser.add_argument("--timeout", type=int, default=120, help="Seconds before a stuck worker is restarted")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="Seconds in-flight requests get to finish on shutdown")
+    args = parser.parse_args(argv)
+    if max_workers is not None and args.workers > max_workers:
+        # The app keeps state in its process that other workers wouldn't see
+        parser.error(f"{args.app} runs with at most {max_workers} worker process(es), use --threads for concurrency")
+
+    if gunicorn is not None:
+        serve_gunicorn(args.app, args.host, args.port, args.workers, args.threads, args.timeout, args.graceful_timeout)
+    else:
+        if args.workers > 1:
+            print("gunicorn is not installed, serving with a single threaded process")
+        serve_threaded(args.app, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
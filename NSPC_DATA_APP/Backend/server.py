@@ -1,24 +1,93 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, Response, current_app, request, jsonify
+import atexit
+import json
 import pymysql
+from werkzeug.local import LocalProxy
+from master_db import (BATCH_LOOKUP_CHUNK_SIZE, CACHED_LOOKUP_FIELDS, DEFAULT_CONFIG, INSERT_MASTER_QUERY, V_ID_INDEX,
+                       cache_key, create_lookup_cache, create_pool, insert_master_batch, master_cache_keys,
+                       master_values, stored_cache_keys)
+from master_rows import MASTER_COLUMNS
+from name_index import name_keys, normalize_name, phonetic_key, similarity
 
-app = Flask(__name__)
+bp = Blueprint('master_data', __name__)
 
-# MySQL database connection details
-db_config = {
-    'host': '127.0.0.1',  # Replace with your MySQL host
-    'user': 'NSPC_Admin',    # Replace with your MySQL username
-    'password': 'NSPC@2024_admin!',  # Replace with your MySQL password
-    'database': 'NSPC_DATA_APP'  # Your database name
+# The current app's pool and cache (see create_app)
+db_pool = LocalProxy(lambda: current_app.extensions['db_pool'])
+lookup_cache = LocalProxy(lambda: current_app.extensions['lookup_cache'])
+
+# Columns clients can read back, and the default projection of get_master_data
+MASTER_FIELDS = ('master_id',) + MASTER_COLUMNS
+
+# get_master_data lookups in priority order, each backed by an index (see check_indexes.py).
+# Pages are keyed on master_id, which InnoDB stores in every secondary index, so each page
+# is a range scan on the lookup index whatever its offset
+MASTER_LOOKUP_QUERIES = {
+    'v_id': "SELECT {columns} FROM Master_data WHERE v_id = %s AND master_id > %s ORDER BY master_id LIMIT %s",
+    'v_name': "SELECT {columns} FROM Master_data WHERE v_name = %s AND master_id > %s ORDER BY master_id LIMIT %s",
+    'contact': "SELECT {columns} FROM Master_data WHERE contact = %s AND master_id > %s ORDER BY master_id LIMIT %s",
+}
+
+# Batch lookups by a list of values, on the same indexes as MASTER_LOOKUP_QUERIES
+MASTER_BATCH_LOOKUP_QUERIES = {
+    'v_id': "SELECT {columns} FROM Master_data WHERE v_id IN ({placeholders}) ORDER BY master_id",
+    'contact': "SELECT {columns} FROM Master_data WHERE contact IN ({placeholders}) ORDER BY master_id",
 }
 
+# Lookups of CACHED_LOOKUP_FIELDS matching more rows than this are not cached
+MAX_CACHED_ROWS = 50
+
+# Values per request to /get_master_data/batch, queried BATCH_LOOKUP_CHUNK_SIZE at a time
+MAX_BATCH_LOOKUP_VALUES = 1000
+
+# Rows per get_master_data page; NDJSON streams are unlimited unless a limit is given
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# MySQL's documented LIMIT for "all remaining rows"
+NO_LIMIT = 18446744073709551615
+
+# Rows per executemany call for bulk inserts
+DEFAULT_BULK_BATCH_SIZE = 500
+MAX_BULK_BATCH_SIZE = 5000
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+# /search settings
+SEARCH_MODES = ('fuzzy', 'prefix')
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Fuzzy search fetches this many candidates per requested result and ranks them here
+SEARCH_CANDIDATE_FACTOR = 10
+# Added to the trigram similarity of candidates that sound the same, scaled by the
+# share of the query's words they share a phonetic key with
+PHONETIC_MATCH_BONUS = 0.3
+
+# Range scan on idx_master_name_norm. Search results carry the same columns as get_master_data,
+# the search keys stay internal
+PREFIX_SEARCH_QUERY = ("SELECT " + ', '.join(MASTER_FIELDS)
+                       + " FROM Master_data WHERE v_name_norm LIKE %s ORDER BY v_name_norm LIMIT %s")
+
+# Candidates with a word that sounds the same (ft_master_name_phonetic, one key per word)
+# or that share n-grams (ft_master_name_norm), most relevant first
+FUZZY_SEARCH_QUERY = """
+(SELECT {columns} FROM Master_data WHERE MATCH (v_name_phonetic) AGAINST (%s IN NATURAL LANGUAGE MODE) LIMIT %s)
+UNION
+(SELECT {columns} FROM Master_data WHERE MATCH (v_name_norm) AGAINST (%s IN NATURAL LANGUAGE MODE) LIMIT %s)
+""".format(columns=', '.join(MASTER_FIELDS))
+
+def non_scalar_columns(row):
+    """Columns of row holding a JSON object or array, which can't be stored in a column"""
+    return [column for column in MASTER_COLUMNS if isinstance(row.get(column), (dict, list))]
+
+
 # Route to accept master data and insert into the database
-@app.route('/insert_master_data', methods=['POST'])
+@bp.route('/insert_master_data', methods=['POST'])
 def insert_master_data():
     try:
         # Get JSON data from the client
         data = request.json
 
         # Extract data fields
+        booth_id = data.get('booth_id')
         s_no = data.get('s_no')
         v_id = data.get('v_id')
         v_name = data.get('v_name')
@@ -30,68 +99,403 @@ def insert_master_data():
         v_status = data.get('v_status')
         contact = data.get('contact')
 
-        # Create a database connection
-        connection = pymysql.connect(**db_config)
-        cursor = connection.cursor()
+        # Rows are matched on v_id, one without it would be inserted again on every re-send
+        if not v_id:
+            return jsonify({'status': 'error', 'message': 'v_id is required'}), 400
+        invalid = non_scalar_columns(data)
+        if invalid:
+            return jsonify({'status': 'error', 'message': f"{', '.join(invalid)} must be a string or number"}), 400
 
-        # Insert data into the Master_data table
-        insert_query = """
-        INSERT INTO Master_data (s_no, v_id, v_name, relation_name, relation_type, address, age, gender, v_status, contact)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(insert_query, (s_no, v_id, v_name, relation_name, relation_type, address, age, gender, v_status, contact))
+        # Borrow a pooled connection, it is returned even if the insert fails
+        with db_pool.connection() as connection:
+            cursor = connection.cursor()
+            # The stored row's lookups, its contact may be about to change
+            touched = stored_cache_keys(cursor, [v_id])
 
-        # Commit the transaction
-        connection.commit()
+            # Insert data into the Master_data table, or update the row with this v_id
+            affected = cursor.execute(INSERT_MASTER_QUERY, (booth_id, s_no, v_id, v_name, relation_name, relation_type, address, age, gender, v_status, contact)
+                           + name_keys(v_name))
 
-        # Close the connection
-        cursor.close()
-        connection.close()
+            # Commit the transaction
+            connection.commit()
+            cursor.close()
 
-        # Return success response
-        return jsonify({'status': 'success', 'message': 'Data inserted successfully'}), 201
+        lookup_cache.delete_many(touched.union(master_cache_keys(data)))
+
+        # Return success response; MySQL reports 1 affected row for an insert, 2 for an update
+        if affected == 1:
+            return jsonify({'status': 'success', 'message': 'Data inserted successfully'}), 201
+        if affected == 2:
+            return jsonify({'status': 'success', 'message': 'Data updated successfully'}), 200
+        return jsonify({'status': 'success', 'message': 'Data unchanged'}), 200
 
     except Exception as e:
         # Handle exceptions and return error response
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+def iter_bulk_rows():
+    """Yield (row, error) pairs from a JSON array body or an NDJSON stream"""
+    if request.mimetype in NDJSON_MIMETYPES:
+        # Read the stream line by line so the body is never held in memory
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line), None
+            except ValueError as e:
+                yield None, f"Invalid JSON: {e}"
+        return
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON array of rows or an NDJSON stream')
+    for row in data:
+        yield row, None
+
+
+# Route to accept many master data rows and insert them in one transaction
+@bp.route('/insert_master_data/bulk', methods=['POST'])
+def insert_master_data_bulk():
+    try:
+        batch_size = int(request.args.get('batch_size', DEFAULT_BULK_BATCH_SIZE))
+        if not 1 <= batch_size <= MAX_BULK_BATCH_SIZE:
+            return jsonify({'status': 'error', 'message': f'batch_size must be between 1 and {MAX_BULK_BATCH_SIZE}'}), 400
+        # atomic=true rolls back the whole load if any row fails
+        atomic = request.args.get('atomic', 'false').lower() == 'true'
+
+        # Anything left uncommitted is rolled back when the connection is returned
+        with db_pool.connection() as connection:
+            cursor = connection.cursor()
+            connection.begin()
+
+            errors = []
+            inserted = 0
+            total = 0
+            batch = []
+            # Cached lookups to drop once the rows are committed
+            touched = set()
+            for index, (row, error) in enumerate(iter_bulk_rows()):
+                total += 1
+                if error is None and not isinstance(row, dict):
+                    error = 'Row must be a JSON object'
+                elif error is None and not row.get('v_id'):
+                    # Rows are matched on v_id, one without it would be inserted again on every re-send
+                    error = 'v_id is required'
+                elif error is None and non_scalar_columns(row):
+                    error = f"{', '.join(non_scalar_columns(row))} must be a string or number"
+                if error is not None:
+                    errors.append({'row': index, 'v_id': None, 'message': error})
+                    continue
+
+                batch.append((index, master_values(row)))
+                touched.update(master_cache_keys(row))
+                if len(batch) >= batch_size:
+                    touched.update(stored_cache_keys(cursor, [values[V_ID_INDEX] for _, values in batch]))
+                    inserted += insert_master_batch(cursor, batch, errors)
+                    batch = []
+
+            if batch:
+                touched.update(stored_cache_keys(cursor, [values[V_ID_INDEX] for _, values in batch]))
+                inserted += insert_master_batch(cursor, batch, errors)
+
+            errors.sort(key=lambda e: e['row'])
+            if atomic and errors:
+                connection.rollback()
+                return jsonify({'status': 'error', 'message': 'No rows inserted (atomic load had failures)',
+                                'received': total, 'inserted': 0, 'failed': len(errors), 'errors': errors}), 422
+
+            connection.commit()
+            cursor.close()
+
+        lookup_cache.delete_many(touched)
+
+        response = {'received': total, 'inserted': inserted, 'failed': len(errors), 'errors': errors}
+        if errors:
+            return jsonify({'status': 'partial', **response}), 207
+        return jsonify({'status': 'success', **response}), 201
+
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    except Exception as e:
+        # Handle exceptions and return error response
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+def parse_fields(value):
+    """Columns for a comma-separated fields parameter; master_id is always included for paging"""
+    if not value:
+        return MASTER_FIELDS
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in MASTER_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ('master_id',) + tuple(name for name in dict.fromkeys(fields) if name != 'master_id')
+
+
+def parse_int_arg(name, default, low, high):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+    if not low <= number <= high:
+        raise ValueError(f'{name} must be between {low} and {high}')
+    return number
+
+
+def stream_master_rows(query, params):
+    """Yield NDJSON lines from an unbuffered server-side cursor
+
+    Only one row is held in memory at a time. The first next() runs the
+    query and yields None, so errors surface before the response starts.
+    """
+    with db_pool.connection() as connection:
+        cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+        cursor.execute(query, params)
+        yield None
+
+        finished = False
+        try:
+            for row in cursor:
+                yield json.dumps(row, default=str) + "\n"
+            finished = True
+        finally:
+            if finished:
+                cursor.close()
+            else:
+                # Client went away mid-stream: closing the connection is cheaper than draining the result
+                connection.close()
+
+
 # Route to fetch master data by v_id, v_name, or contact
-@app.route('/get_master_data', methods=['GET'])
+@bp.route('/get_master_data', methods=['GET'])
 def get_master_data():
     try:
-        # Get query parameters from the client
-        v_id = request.args.get('v_id')
-        v_name = request.args.get('v_name')
-        contact = request.args.get('contact')
-
-        # Create a database connection
-        connection = pymysql.connect(**db_config)
-        cursor = connection.cursor(pymysql.cursors.DictCursor)  # Use DictCursor for dictionary-style output
-
-        # Build the quer`y dynamically based on the input
-        if v_id:
-            query = "SELECT * FROM Master_data WHERE v_id = %s"
-            cursor.execute(query, (v_id,))
-        elif v_name:
-            query = "SELECT * FROM Master_data WHERE v_name = %s"
-            cursor.execute(query, (v_name,))
-        elif contact:
-            query = "SELECT * FROM Master_data WHERE contact = %s"
-            cursor.execute(query, (contact,))
-        else:
+        # Use the first query parameter the client provided: v_id, v_name, then contact
+        field = next((name for name in MASTER_LOOKUP_QUERIES if request.args.get(name)), None)
+        if field is None:
             # Return error if no parameters are provided
             return jsonify({'status': 'error', 'message': 'Please provide v_id, v_name, or contact'}), 400
 
-        # Fetch the result
-        result = cursor.fetchall()
+        # format=ndjson (or Accept: application/x-ndjson) streams every row instead of one page
+        stream = (request.args.get('format') == 'ndjson'
+                  or request.accept_mimetypes.best in NDJSON_MIMETYPES)
+        try:
+            columns = parse_fields(request.args.get('fields'))
+            after_master_id = parse_int_arg('after_master_id', 0, 0, NO_LIMIT)
+            limit = parse_int_arg('limit', NO_LIMIT if stream else DEFAULT_PAGE_SIZE, 1,
+                                  NO_LIMIT if stream else MAX_PAGE_SIZE)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
 
-        # Close the connection
-        cursor.close()
-        connection.close()
+        query = MASTER_LOOKUP_QUERIES[field].format(columns=', '.join(columns))
+        value = request.args.get(field)
+
+        if stream:
+            rows = stream_master_rows(query, (value, after_master_id, limit))
+            next(rows)
+            return Response(rows, mimetype='application/x-ndjson')
+
+        result = None
+        if field in CACHED_LOOKUP_FIELDS:
+            rows = lookup_master_value(field, value)
+            if rows is not None:
+                # One extra row tells whether there is a next page
+                result = [project(row, columns) for row in rows if row['master_id'] > after_master_id][:limit + 1]
+
+        if result is None:
+            # Borrow a pooled connection, it is returned even if the query fails
+            with db_pool.connection() as connection:
+                cursor = connection.cursor(pymysql.cursors.DictCursor)  # Use DictCursor for dictionary-style output
+                # One extra row tells whether there is a next page
+                cursor.execute(query, (value, after_master_id, limit + 1))
+
+                # Fetch the result
+                result = cursor.fetchall()
+                cursor.close()
 
         # Return the fetched data or an empty result if not found
         if result:
-            return jsonify({'status': 'success', 'data': result}), 200
+            has_more = len(result) > limit
+            result = result[:limit]
+            return jsonify({'status': 'success', 'data': result,
+                            'next_after_master_id': result[-1]['master_id'] if has_more else None}), 200
+        else:
+            return jsonify({'status': 'success', 'message': 'No matching records found'}), 404
+
+    except Exception as e:
+        # Handle exceptions and return error response
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+def rank_candidates(rows, query_norm, limit):
+    """Score fuzzy candidates by trigram similarity plus a bonus for the words that sound the same"""
+    query_words = phonetic_key(query_norm).split()
+    for row in rows:
+        name_norm = normalize_name(row['v_name'])
+        score = similarity(query_norm, name_norm)
+        if query_words:
+            name_words = set(phonetic_key(name_norm).split())
+            score += PHONETIC_MATCH_BONUS * sum(word in name_words for word in query_words) / len(query_words)
+        row['score'] = round(score, 3)
+    rows.sort(key=lambda row: row['score'], reverse=True)
+    return rows[:limit]
+
+
+def project(row, columns):
+    return {column: row[column] for column in columns}
+
+
+def fetch_master_rows(cursor, field, values):
+    """Full rows for many values of field, one IN (...) query per chunk of values
+
+    Returns {value: [rows]} with an empty list for values that match nothing.
+    """
+    # MySQL ignores case (and leading zeros for contact), so map matches back to every value
+    # as sent: "aex2" and "AEX2" both find the same row
+    requested = {}
+    for value in values:
+        requested.setdefault(cache_key(field, value), []).append(value)
+    results = {value: [] for value in values}
+    # One value per key is enough to find the rows, and keeps a row from being read twice
+    distinct = [same[0] for same in requested.values()]
+    for start in range(0, len(distinct), BATCH_LOOKUP_CHUNK_SIZE):
+        chunk = distinct[start:start + BATCH_LOOKUP_CHUNK_SIZE]
+        query = MASTER_BATCH_LOOKUP_QUERIES[field].format(
+            columns=', '.join(MASTER_FIELDS), placeholders=', '.join(['%s'] * len(chunk)))
+        cursor.execute(query, chunk)
+        for row in cursor.fetchall():
+            for value in requested.get(cache_key(field, row[field]), ()):
+                results[value].append(row)
+    return results
+
+
+def lookup_master_rows(field, values):
+    """fetch_master_rows read through lookup_cache, so hot values never reach MySQL
+
+    Values that match nothing are cached too, inserts invalidate them.
+    """
+    keys = {value: cache_key(field, value) for value in values}
+    cached = lookup_cache.get_many(set(keys.values()))
+    results = {value: cached[key] for value, key in keys.items() if key in cached}
+
+    misses = [value for value in values if value not in results]
+    if misses:
+        with db_pool.connection() as connection:
+            cursor = connection.cursor(pymysql.cursors.DictCursor)
+            fetched = fetch_master_rows(cursor, field, misses)
+            cursor.close()
+        lookup_cache.set_many({keys[value]: rows for value, rows in fetched.items() if len(rows) <= MAX_CACHED_ROWS})
+        results.update(fetched)
+    return results
+
+
+def lookup_master_value(field, value):
+    """Full rows for one value of field read through lookup_cache, None if it matches too many to cache
+
+    At most MAX_CACHED_ROWS + 1 rows are read, so a busy contact costs a
+    bounded fetch before get_master_data falls back to its paged query.
+    """
+    key = cache_key(field, value)
+    cached = lookup_cache.get_many([key])
+    if key in cached:
+        return cached[key]
+
+    with db_pool.connection() as connection:
+        cursor = connection.cursor(pymysql.cursors.DictCursor)
+        cursor.execute(MASTER_LOOKUP_QUERIES[field].format(columns=', '.join(MASTER_FIELDS)),
+                       (value, 0, MAX_CACHED_ROWS + 1))
+        rows = list(cursor.fetchall())
+        cursor.close()
+    if len(rows) > MAX_CACHED_ROWS:
+        return None
+    lookup_cache.set_many({key: rows})
+    return rows
+
+
+def parse_lookup_values(data, field):
+    """Distinct lookup values for field from a batch request body, as strings"""
+    values = data.get(field) or []
+    if not isinstance(values, list):
+        raise ValueError(f'{field} must be a list')
+    if any(not isinstance(value, (str, int)) or isinstance(value, bool) for value in values):
+        raise ValueError(f'{field} values must be strings or numbers')
+    return list(dict.fromkeys(str(value).strip() for value in values if str(value).strip()))
+
+
+# Route to fetch master data for many v_ids and/or contacts in one request
+@bp.route('/get_master_data/batch', methods=['POST'])
+def get_master_data_batch():
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'status': 'error', 'message': 'Expected a JSON object with v_id and/or contact lists'}), 400
+        try:
+            lookups = {field: parse_lookup_values(data, field) for field in MASTER_BATCH_LOOKUP_QUERIES}
+            # fields is a list of column names or a comma-separated string, as in get_master_data
+            fields = data.get('fields')
+            columns = parse_fields(','.join(map(str, fields)) if isinstance(fields, list) else fields and str(fields))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        total = sum(len(values) for values in lookups.values())
+        if total == 0:
+            return jsonify({'status': 'error', 'message': 'Please provide v_id and/or contact lists'}), 400
+        if total > MAX_BATCH_LOOKUP_VALUES:
+            return jsonify({'status': 'error', 'message': f'At most {MAX_BATCH_LOOKUP_VALUES} values per request'}), 400
+
+        results = {field: lookup_master_rows(field, values) for field, values in lookups.items() if values}
+
+        # v_id is unique, a contact can be shared by a household
+        data = {'v_id': {value: project(rows[0], columns) for value, rows in results.get('v_id', {}).items() if rows},
+                'contact': {value: [project(row, columns) for row in rows]
+                            for value, rows in results.get('contact', {}).items() if rows}}
+        not_found = {field: [value for value in values if not results[field][value]] if values else []
+                     for field, values in lookups.items()}
+        return jsonify({'status': 'success', 'data': data, 'not_found': not_found}), 200
+
+    except Exception as e:
+        # Handle exceptions and return error response
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+# Route to report lookup cache hit/miss counters
+@bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({'status': 'success', 'cache': lookup_cache.info()}), 200
+
+
+# Route to search master data by name, tolerating OCR and spelling noise
+@bp.route('/search', methods=['GET'])
+def search():
+    try:
+        query_norm = normalize_name(request.args.get('q'))
+        if not query_norm:
+            return jsonify({'status': 'error', 'message': 'Please provide a name to search for in q'}), 400
+        mode = request.args.get('mode', 'fuzzy')
+        if mode not in SEARCH_MODES:
+            return jsonify({'status': 'error', 'message': f"mode must be one of {', '.join(SEARCH_MODES)}"}), 400
+        try:
+            limit = parse_int_arg('limit', DEFAULT_SEARCH_LIMIT, 1, MAX_SEARCH_LIMIT)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        with db_pool.connection() as connection:
+            cursor = connection.cursor(pymysql.cursors.DictCursor)
+            if mode == 'prefix':
+                # Normalized names hold only letters and spaces, so nothing needs escaping for LIKE
+                cursor.execute(PREFIX_SEARCH_QUERY, (query_norm + '%', limit))
+                result = list(cursor.fetchall())
+            else:
+                candidates = limit * SEARCH_CANDIDATE_FACTOR
+                cursor.execute(FUZZY_SEARCH_QUERY, (phonetic_key(query_norm), candidates, query_norm, candidates))
+                result = rank_candidates(list(cursor.fetchall()), query_norm, limit)
+            cursor.close()
+
+        if result:
+            return jsonify({'status': 'success', 'mode': mode, 'data': result}), 200
         else:
             return jsonify({'status': 'success', 'message': 'No matching records found'}), 404
 
@@ -99,5 +503,28 @@ def get_master_data():
         # Handle exceptions and return error response
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+def create_app(config=None):
+    """Build the Master_data API
+
+    Configuration is master_db.DEFAULT_CONFIG, then NSPC_* environment
+    variables, then config. Each app (so each server worker) gets its own
+    connection pool, which is drained when the process exits. Lookups are cached in Redis
+    when CACHE_REDIS_URL is set; CACHE_BACKEND=local caches them in this
+    process instead, for single-process servers only.
+    """
+    app = Flask(__name__)
+    app.config.from_mapping(DEFAULT_CONFIG)
+    app.config.from_prefixed_env('NSPC')
+    if config:
+        app.config.from_mapping(config)
+    app.extensions['db_pool'] = create_pool(app.config)
+    # Runs after the server has finished in-flight requests
+    atexit.register(app.extensions['db_pool'].close)
+    app.extensions['lookup_cache'] = create_lookup_cache(app.config)
+    app.register_blueprint(bp)
+    return app
+
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    from serve import main
+    main(default_app='server:create_app')
@@ -0,0 +1,182 @@
+import os
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Master_data as in Create_tables.sql; NOCASE stands in for MySQL's case-insensitive collation
+SCHEMA = """
+CREATE TABLE Master_data (
+    master_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    booth_id INTEGER,
+    s_no TEXT,
+    v_id TEXT COLLATE NOCASE UNIQUE,
+    v_name TEXT COLLATE NOCASE,
+    relation_name TEXT,
+    relation_type TEXT,
+    address TEXT,
+    age INTEGER,
+    gender TEXT,
+    v_status TEXT,
+    contact INTEGER,
+    v_name_norm TEXT,
+    v_name_phonetic TEXT
+)
+"""
+
+# SQLite integers are 64-bit signed, MySQL's "no limit" LIMIT is not
+SQLITE_MAX_INT = 2 ** 63 - 1
+
+
+def _fulltext_match(column, query):
+    """Any query word appearing in column, roughly what the FULLTEXT branches find"""
+    words = set((column or '').split())
+    return int(any(word in words for word in (query or '').split()))
+
+
+def translate(query):
+    """The MySQL the routes send, rewritten for SQLite"""
+    query = query.replace('%s', '?').replace(' FOR UPDATE', '')
+    if 'ON DUPLICATE KEY UPDATE' in query:
+        head, tail = query.split('ON DUPLICATE KEY UPDATE')
+        query = head + 'ON CONFLICT(v_id) DO UPDATE SET' + re.sub(r'VALUES\((\w+)\)', r'excluded.\1', tail)
+    query = re.sub(r'MATCH \((\w+)\) AGAINST \(\? IN [A-Z ]+ MODE\)', r'fulltext_match(\1, ?)', query)
+    # SQLite has no parenthesized SELECT ... LIMIT in a UNION
+    return re.sub(r'\((SELECT [^()]*(?:\([^()]*\)[^()]*)*LIMIT \?)\)', r'SELECT * FROM (\1)', query)
+
+
+class FakeCursor:
+    def __init__(self, connection, dict_rows):
+        self._cursor = connection.cursor()
+        self._dict_rows = dict_rows
+
+    def execute(self, query, params=()):
+        params = tuple(params or ())
+        for value in params:
+            if isinstance(value, (dict, set)):
+                # pymysql refuses these while escaping, before anything is sent
+                raise TypeError(f"{type(value).__name__} can not be used as parameter")
+        params = tuple(min(value, SQLITE_MAX_INT) if isinstance(value, int) else value for value in params)
+        upsert = 'ON DUPLICATE KEY UPDATE' in query
+        before = None
+        if upsert:
+            before = self._cursor.connection.execute(
+                "SELECT * FROM Master_data WHERE v_id = ?", (params[2],)).fetchone()
+        try:
+            self._cursor.execute(translate(query), params)
+        except sqlite3.IntegrityError as e:
+            import pymysql
+            raise pymysql.err.IntegrityError(1062, str(e))
+        except sqlite3.OperationalError as e:
+            import pymysql
+            raise pymysql.err.ProgrammingError(1064, str(e))
+        if upsert and before is not None:
+            after = self._cursor.connection.execute(
+                "SELECT * FROM Master_data WHERE v_id = ?", (params[2],)).fetchone()
+            # MySQL counts an updated row twice and an unchanged one not at all
+            return 2 if after != before else 0
+        return self._cursor.rowcount
+
+    def executemany(self, query, seq_of_params):
+        for params in seq_of_params:
+            self.execute(query, params)
+
+    def _row(self, row):
+        if not self._dict_rows:
+            return row
+        return dict(zip([column[0] for column in self._cursor.description], row))
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else self._row(row)
+
+    def __iter__(self):
+        for row in self._cursor:
+            yield self._row(row)
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FakeConnection:
+    def __init__(self, path):
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.create_function('fulltext_match', 2, _fulltext_match)
+        self.open = True
+
+    def cursor(self, cursor_class=None):
+        return FakeCursor(self._connection, cursor_class is not None and 'Dict' in cursor_class.__name__)
+
+    def begin(self):
+        if not self._connection.in_transaction:
+            self._connection.execute("BEGIN")
+
+    def commit(self):
+        if self._connection.in_transaction:
+            self._connection.execute("COMMIT")
+
+    def rollback(self):
+        if self._connection.in_transaction:
+            self._connection.execute("ROLLBACK")
+
+    def close(self):
+        self.open = False
+        self._connection.close()
+
+
+class FakePool:
+    """ConnectionPool stand-in over a SQLite file, with the routes' MySQL translated"""
+
+    def __init__(self, path):
+        self.path = path
+        with sqlite3.connect(path) as connection:
+            connection.execute(SCHEMA)
+
+    @contextmanager
+    def connection(self):
+        connection = FakeConnection(self.path)
+        try:
+            # pymysql starts a transaction implicitly, so uncommitted work is rolled back on release
+            connection.begin()
+            yield connection
+        finally:
+            connection.rollback()
+            connection.close()
+
+    def execute(self, query, params=()):
+        """Run a query straight on the database, for test setup and checks"""
+        with sqlite3.connect(self.path) as connection:
+            return connection.execute(query, params).fetchall()
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The Master_data API on a fresh database, with the in-process lookup cache"""
+    import server
+    monkeypatch.setenv('NSPC_DB_PASSWORD', 'test')
+    app = server.create_app({'CACHE_BACKEND': 'local'})
+    app.extensions['db_pool'] = FakePool(str(tmp_path / 'master.sqlite'))
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db(app):
+    return app.extensions['db_pool']
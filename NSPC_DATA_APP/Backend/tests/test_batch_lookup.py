@@ -0,0 +1,63 @@
+import pytest
+
+import server
+
+
+@pytest.fixture
+def voters(client):
+    rows = [{'v_id': 'AEX1', 'v_name': 'Ramu', 'contact': 9876543210},
+            {'v_id': 'AEX2', 'v_name': 'Sita', 'contact': 9876543210},
+            {'v_id': 'AEX3', 'v_name': 'Gopal', 'contact': 9123456789}]
+    assert client.post('/insert_master_data/bulk', json=rows).status_code == 201
+
+
+def test_batch_lookup_and_not_found(client, voters):
+    response = client.post('/get_master_data/batch', json={'v_id': ['AEX1', 'NOPE'], 'contact': [9876543210, '1'],
+                                                           'fields': ['v_name']})
+    assert response.status_code == 200
+    assert response.json['data'] == {
+        'v_id': {'AEX1': {'master_id': 1, 'v_name': 'Ramu'}},
+        'contact': {'9876543210': [{'master_id': 1, 'v_name': 'Ramu'}, {'master_id': 2, 'v_name': 'Sita'}]},
+    }
+    assert response.json['not_found'] == {'v_id': ['NOPE'], 'contact': ['1']}
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_values_differing_in_case_or_zeros_are_each_found(client, voters, cached):
+    body = {'v_id': ['aex2', 'AEX2', ' Aex2 '], 'contact': ['09123456789', '9123456789'], 'fields': 'v_id'}
+    if cached:
+        client.post('/get_master_data/batch', json=body)
+    response = client.post('/get_master_data/batch', json=body)
+    assert response.json['data'] == {
+        # Values are reported as sent, less surrounding whitespace
+        'v_id': {value: {'master_id': 2, 'v_id': 'AEX2'} for value in ('aex2', 'AEX2', 'Aex2')},
+        'contact': {'09123456789': [{'master_id': 3, 'v_id': 'AEX3'}], '9123456789': [{'master_id': 3, 'v_id': 'AEX3'}]},
+    }
+    assert response.json['not_found'] == {'v_id': [], 'contact': []}
+
+
+def test_equal_values_in_different_chunks_read_each_row_once(client, voters, monkeypatch):
+    monkeypatch.setattr(server, 'BATCH_LOOKUP_CHUNK_SIZE', 1)
+    response = client.post('/get_master_data/batch', json={'contact': ['9876543210', '09876543210']})
+    contacts = response.json['data']['contact']
+    assert [row['v_id'] for row in contacts['9876543210']] == ['AEX1', 'AEX2']
+    assert [row['v_id'] for row in contacts['09876543210']] == ['AEX1', 'AEX2']
+
+
+@pytest.mark.parametrize('body, message', [
+    ([], 'Expected a JSON object with v_id and/or contact lists'),
+    ({}, 'Please provide v_id and/or contact lists'),
+    ({'v_id': 'AEX1'}, 'v_id must be a list'),
+    ({'v_id': [{'a': 1}]}, 'v_id values must be strings or numbers'),
+    ({'v_id': ['AEX1'], 'fields': ['password']}, 'Unknown fields: password'),
+])
+def test_bad_batch_requests(client, body, message):
+    response = client.post('/get_master_data/batch', json=body)
+    assert response.status_code == 400
+    assert response.json['message'] == message
+
+
+def test_too_many_values(client, monkeypatch):
+    monkeypatch.setattr(server, 'MAX_BATCH_LOOKUP_VALUES', 2)
+    response = client.post('/get_master_data/batch', json={'v_id': ['A', 'B'], 'contact': ['1']})
+    assert response.status_code == 400
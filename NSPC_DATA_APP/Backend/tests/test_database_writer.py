@@ -0,0 +1,19 @@
+from ingest_pipeline import DatabaseWriter
+from lookup_cache import LRUCache
+from master_rows import to_master_row
+
+
+def test_writer_commits_pages_and_invalidates_lookups(db):
+    cache = LRUCache()
+    cache.set_many({('v_id', 'aex1234567'): [], ('contact', '1'): []})
+    committed = []
+    writer = DatabaseWriter(db, cache=cache, batch_size=1)
+    rows = [to_master_row({'voter_id': 'AEX1234567', 'name': 'Lakshmi Devi', 'age': '40'}),
+            to_master_row({'voter_id': '', 'name': 'No ID'})]
+    writer.put('booth.pdf page 1', rows, on_commit=lambda: committed.append(1))
+    writer.close()
+
+    assert (writer.inserted, writer.skipped, writer.errors) == (1, 1, [])
+    assert committed == [1]
+    assert db.execute("SELECT v_id, v_name_norm FROM Master_data") == [('AEX1234567', 'lakshmi devi')]
+    assert cache.get_many([('v_id', 'aex1234567'), ('contact', '1')]) == {('contact', '1'): []}
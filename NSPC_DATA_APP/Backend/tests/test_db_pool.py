@@ -0,0 +1,133 @@
+import pymysql
+import pytest
+
+import db_pool
+from db_pool import ConnectionPool, PoolClosed, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.open = True
+        self.healthy = True
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        if not self.healthy:
+            raise pymysql.err.OperationalError(2006, 'MySQL server has gone away')
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.open = False
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Every connection the pool opens, in order"""
+    opened = []
+
+    def connect(**kwargs):
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    monkeypatch.setattr(db_pool.pymysql, 'connect', connect)
+    return opened
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(db_pool.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_connection_is_reused_and_rolled_back(connections):
+    pool = ConnectionPool(pool_size=2, max_overflow=0)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert second is first
+    assert len(connections) == 1
+    assert first.rollbacks == 2
+    assert pool.stats() == {'open': 1, 'idle': 1, 'in_use': 0, 'pool_size': 2, 'max_overflow': 0}
+
+
+def test_overflow_connections_are_closed_on_release(connections):
+    pool = ConnectionPool(pool_size=1, max_overflow=1)
+    first, second = pool.acquire(), pool.acquire()
+    assert pool.stats()['in_use'] == 2
+    pool.release(first)
+    pool.release(second)
+    assert first.open and not second.open
+    assert pool.stats()['open'] == 1
+
+
+def test_checkout_times_out_when_exhausted(connections):
+    pool = ConnectionPool(pool_size=1, max_overflow=0, timeout=0.01)
+    pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+
+def test_broken_connection_is_discarded(connections):
+    pool = ConnectionPool(pool_size=1, max_overflow=0)
+    with pytest.raises(pymysql.err.OperationalError):
+        with pool.connection():
+            raise pymysql.err.OperationalError(2013, 'Lost connection')
+    assert not connections[0].open
+    assert pool.stats()['open'] == 0
+    # The freed slot is usable again
+    with pool.connection() as connection:
+        assert connection is connections[1]
+
+
+def test_failed_ping_replaces_idle_connection(connections):
+    pool = ConnectionPool(pool_size=1, max_overflow=0)
+    with pool.connection():
+        pass
+    connections[0].healthy = False
+    with pool.connection() as connection:
+        assert connection is connections[1]
+    assert not connections[0].open
+    assert pool.stats()['open'] == 1
+
+
+def test_failed_connect_frees_its_slot(monkeypatch):
+    def connect(**kwargs):
+        raise pymysql.err.OperationalError(1045, 'Access denied')
+
+    monkeypatch.setattr(db_pool.pymysql, 'connect', connect)
+    pool = ConnectionPool(pool_size=1, max_overflow=0)
+    with pytest.raises(pymysql.err.OperationalError):
+        pool.acquire()
+    assert pool.stats()['open'] == 0
+
+
+def test_connections_older_than_max_lifetime_are_recycled(connections, clock):
+    pool = ConnectionPool(pool_size=1, max_overflow=0, max_lifetime=60)
+    with pool.connection():
+        pass
+    clock[0] += 30
+    with pool.connection() as connection:
+        assert connection is connections[0]
+    clock[0] += 31
+    with pool.connection() as connection:
+        assert connection is connections[1]
+    assert not connections[0].open
+
+
+def test_close_drains_idle_and_refuses_checkout(connections):
+    pool = ConnectionPool(pool_size=2, max_overflow=0)
+    held = pool.acquire()
+    with pool.connection():
+        pass
+    pool.close()
+    assert not connections[1].open
+    with pytest.raises(PoolClosed):
+        pool.acquire()
+    # Connections still out are closed when they come back
+    pool.release(held)
+    assert not held.open
+    assert pool.stats()['open'] == 0
@@ -0,0 +1,103 @@
+import hashlib
+import types
+
+import pandas as pd
+import pytest
+
+import ingest_pipeline
+from ingest_manifest import IngestManifest, file_sha256
+
+SETTINGS = {'booth_id': 7, 'dpi': 300}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'manifest.jsonl')
+
+
+def test_done_pages_are_skipped_after_reopening(path):
+    manifest = IngestManifest(path)
+    assert manifest.pending_pages('abc', 3, SETTINGS) == [0, 1, 2]
+    manifest.mark_done('abc', 1, rows=30, settings=SETTINGS)
+    assert manifest.pending_pages('abc', 3, SETTINGS) == [0, 2]
+    manifest.close()
+
+    manifest = IngestManifest(path)
+    assert manifest.pending_pages('abc', 3, dict(reversed(list(SETTINGS.items())))) == [0, 2]
+    # Another PDF, or the same one with other settings, starts from scratch
+    assert manifest.pending_pages('def', 3, SETTINGS) == [0, 1, 2]
+    assert manifest.pending_pages('abc', 3, {**SETTINGS, 'booth_id': 8}) == [0, 1, 2]
+    assert manifest.pending_pages('abc', 3, {**SETTINGS, 'dpi': 400}) == [0, 1, 2]
+    manifest.close()
+
+
+def test_line_cut_short_by_a_crash_is_ignored(path):
+    manifest = IngestManifest(path)
+    manifest.mark_done('abc', 0, settings=SETTINGS)
+    manifest.close()
+    with open(path, 'a') as f:
+        f.write('{"pdf_sha256": "abc", "pa')
+
+    manifest = IngestManifest(path)
+    assert manifest.pending_pages('abc', 2, SETTINGS) == [1]
+    manifest.close()
+
+
+def test_file_sha256(tmp_path):
+    pdf = tmp_path / 'booth.pdf'
+    pdf.write_bytes(b'%PDF-1.4')
+    assert file_sha256(str(pdf)) == hashlib.sha256(b'%PDF-1.4').hexdigest()
+
+
+class FakeExtractor:
+    """Three pages of one voter each, recording which pages were extracted"""
+    extracted = []
+
+    def __init__(self, pdf_path, **options):
+        self.pages = types.SimpleNamespace(page_count=3)
+
+    def iter_page_results(self, page_nums=None):
+        for page_num in range(3) if page_nums is None else page_nums:
+            FakeExtractor.extracted.append(page_num)
+            yield page_num, pd.DataFrame([{'voter_id': f'AEX{page_num}', 'name': 'Ramu'}])
+
+    def flush_debug(self):
+        pass
+
+
+class FakeWriter:
+    """Commits every page at once"""
+
+    def __init__(self):
+        self.rows = []
+
+    def put(self, label, rows, on_commit=None):
+        self.rows.extend(rows)
+        if on_commit is not None:
+            on_commit()
+
+
+def test_ingest_resumes_only_with_the_same_settings(tmp_path, path, monkeypatch):
+    monkeypatch.setattr(ingest_pipeline, 'VoterExtractor', FakeExtractor)
+    pdf = tmp_path / 'booth.pdf'
+    pdf.write_bytes(b'%PDF-1.4')
+    manifest = IngestManifest(path)
+
+    def ingest(**options):
+        FakeExtractor.extracted = []
+        writer = FakeWriter()
+        ingest_pipeline.ingest_pdf(str(pdf), writer, manifest=manifest, **options)
+        return FakeExtractor.extracted, writer.rows
+
+    pages, rows = ingest(booth_id=7, dpi=300)
+    assert pages == [0, 1, 2]
+    assert {row['booth_id'] for row in rows} == {7}
+    assert ingest(booth_id=7, dpi=300) == ([], [])
+    # A different booth or render setting would write different rows
+    pages, rows = ingest(booth_id=8, dpi=300)
+    assert pages == [0, 1, 2]
+    assert {row['booth_id'] for row in rows} == {8}
+    assert ingest(booth_id=8, dpi=400)[0] == [0, 1, 2]
+    # Options that don't change the rows don't matter
+    assert ingest(booth_id=8, dpi=400, debug_level='full')[0] == []
+    manifest.close()
@@ -0,0 +1,79 @@
+import json
+
+
+def voter(v_id, **fields):
+    return {'booth_id': 1, 's_no': '1', 'v_id': v_id, 'v_name': 'Lakshmi Devi', 'relation_name': 'Ramu',
+            'relation_type': 'Husband', 'address': '1-23', 'age': 40, 'gender': 'F', 'v_status': None,
+            'contact': None, **fields}
+
+
+def test_insert_then_update_then_unchanged(client, db):
+    assert client.post('/insert_master_data', json=voter('AEX1')).status_code == 201
+    response = client.post('/insert_master_data', json=voter('AEX1', contact=9876543210))
+    assert response.status_code == 200
+    assert response.json['message'] == 'Data updated successfully'
+    assert client.post('/insert_master_data', json=voter('AEX1')).json['message'] == 'Data unchanged'
+    # Fields left empty keep the stored value
+    assert db.execute("SELECT contact, v_name_norm FROM Master_data") == [(9876543210, 'lakshmi devi')]
+
+
+def test_insert_rejects_missing_v_id_and_objects(client, db):
+    assert client.post('/insert_master_data', json=voter(None)).status_code == 400
+    response = client.post('/insert_master_data', json=voter('AEX1', age={'a': 1}))
+    assert response.status_code == 400
+    assert response.json['message'] == 'age must be a string or number'
+    assert db.execute("SELECT COUNT(*) FROM Master_data") == [(0,)]
+
+
+def test_bulk_all_rows_inserted(client, db):
+    response = client.post('/insert_master_data/bulk?batch_size=2', json=[voter(f'AEX{i}') for i in range(5)])
+    assert response.status_code == 201
+    assert response.json == {'status': 'success', 'received': 5, 'inserted': 5, 'failed': 0, 'errors': []}
+    assert db.execute("SELECT COUNT(*) FROM Master_data") == [(5,)]
+
+
+def test_bulk_reports_bad_rows_and_keeps_the_rest(client, db):
+    rows = [voter('AEX1'), 'not a row', voter(''), voter('AEX2', age={'a': 1}), voter('AEX3', address=['x'])]
+    response = client.post('/insert_master_data/bulk', json=rows)
+    assert response.status_code == 207
+    assert response.json['status'] == 'partial'
+    assert (response.json['received'], response.json['inserted'], response.json['failed']) == (5, 1, 4)
+    assert [(error['row'], error['message']) for error in response.json['errors']] == [
+        (1, 'Row must be a JSON object'),
+        (2, 'v_id is required'),
+        (3, 'age must be a string or number'),
+        (4, 'address must be a string or number'),
+    ]
+    assert db.execute("SELECT v_id FROM Master_data") == [('AEX1',)]
+
+
+def test_bulk_batch_falls_back_to_rows_on_unescapable_values(client, db, monkeypatch):
+    import server
+    # A value that gets past validation but that the driver refuses
+    monkeypatch.setattr(server, 'non_scalar_columns', lambda row: [])
+    response = client.post('/insert_master_data/bulk', json=[voter('AEX1'), voter('AEX2', age={'a': 1}), voter('AEX3')])
+    assert response.status_code == 207
+    assert [(error['row'], error['v_id']) for error in response.json['errors']] == [(1, 'AEX2')]
+    assert db.execute("SELECT v_id FROM Master_data ORDER BY v_id") == [('AEX1',), ('AEX3',)]
+
+
+def test_bulk_atomic_rolls_back_everything(client, db):
+    response = client.post('/insert_master_data/bulk?atomic=true', json=[voter('AEX1'), voter('')])
+    assert response.status_code == 422
+    assert response.json['inserted'] == 0
+    assert db.execute("SELECT COUNT(*) FROM Master_data") == [(0,)]
+
+
+def test_bulk_ndjson_stream(client, db):
+    body = '\n'.join([json.dumps(voter('AEX1')), '{broken', '', json.dumps(voter('AEX2'))])
+    response = client.post('/insert_master_data/bulk', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 207
+    assert response.json['received'] == 3
+    assert response.json['errors'][0]['row'] == 1
+    assert response.json['errors'][0]['message'].startswith('Invalid JSON')
+    assert db.execute("SELECT COUNT(*) FROM Master_data") == [(2,)]
+
+
+def test_bulk_rejects_non_array_body_and_bad_batch_size(client):
+    assert client.post('/insert_master_data/bulk', json={'v_id': 'AEX1'}).status_code == 400
+    assert client.post('/insert_master_data/bulk?batch_size=0', json=[]).status_code == 400
@@ -0,0 +1,120 @@
+import pytest
+
+import lookup_cache
+from lookup_cache import LRUCache, NullCache, create_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(lookup_cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_get_many_returns_only_cached_keys():
+    cache = LRUCache()
+    cache.set_many({('v_id', 'aex1'): [{'master_id': 1}], ('contact', '1'): []})
+    assert cache.get_many([('v_id', 'aex1'), ('contact', '1'), ('v_id', 'aex2')]) == {
+        ('v_id', 'aex1'): [{'master_id': 1}], ('contact', '1'): []}
+    stats = cache.info()
+    assert (stats['hits'], stats['misses'], stats['sets'], stats['entries']) == (2, 1, 2, 2)
+    assert stats['hit_ratio'] == 0.667
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_entries=2)
+    cache.set_many({'a': 1, 'b': 2})
+    # Reading a makes b the least recently used
+    cache.get_many(['a'])
+    cache.set_many({'c': 3})
+    assert cache.get_many(['a', 'b', 'c']) == {'a': 1, 'c': 3}
+    assert cache.info()['evictions'] == 1
+
+
+def test_overwriting_refreshes_recency():
+    cache = LRUCache(max_entries=2)
+    cache.set_many({'a': 1, 'b': 2})
+    cache.set_many({'a': 10})
+    cache.set_many({'c': 3})
+    assert cache.get_many(['a', 'b', 'c']) == {'a': 10, 'c': 3}
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache(ttl=60)
+    cache.set_many({'a': 1})
+    clock[0] += 59
+    assert cache.get_many(['a']) == {'a': 1}
+    clock[0] += 1
+    assert cache.get_many(['a']) == {}
+    assert cache.info()['expired'] == 1
+    assert cache.info()['entries'] == 0
+
+
+def test_delete_many_invalidates():
+    cache = LRUCache()
+    cache.set_many({'a': 1, 'b': 2})
+    cache.delete_many(['a', 'missing'])
+    assert cache.get_many(['a', 'b']) == {'b': 2}
+    assert cache.info()['invalidations'] == 2
+
+
+def test_clear():
+    cache = LRUCache()
+    cache.set_many({'a': 1})
+    cache.clear()
+    assert cache.get_many(['a']) == {}
+
+
+def test_zero_entries_caches_nothing():
+    cache = LRUCache(max_entries=0)
+    cache.set_many({'a': 1})
+    assert cache.get_many(['a']) == {}
+
+
+def test_null_cache_caches_nothing():
+    cache = NullCache()
+    cache.set_many({'a': 1})
+    assert cache.get_many(['a']) == {}
+    assert cache.info()['misses'] == 1
+
+
+def test_create_cache_caches_nothing_unless_asked():
+    assert isinstance(create_cache(), NullCache)
+    assert isinstance(create_cache(backend='none', redis_url='redis://127.0.0.1:6379/0'), NullCache)
+    cache = create_cache(backend='local', max_entries=5, ttl=10)
+    assert isinstance(cache, LRUCache)
+    assert (cache.max_entries, cache.ttl) == (5, 10)
+
+
+def test_create_cache_rejects_bad_backends():
+    with pytest.raises(ValueError):
+        create_cache(backend='memcached')
+    with pytest.raises(ValueError):
+        create_cache(backend='redis')
+
+
+@pytest.mark.skipif(lookup_cache.redis is not None, reason="redis is installed")
+def test_redis_cache_needs_redis():
+    with pytest.raises(ImportError):
+        create_cache(redis_url='redis://127.0.0.1:6379/0')
+
+
+def test_app_caches_in_process_only_when_asked(monkeypatch):
+    import server
+    monkeypatch.setenv('NSPC_DB_PASSWORD', 'test')
+    assert server.create_app().extensions['lookup_cache'].backend == 'none'
+    monkeypatch.setenv('NSPC_CACHE_BACKEND', 'local')
+    assert server.create_app().extensions['lookup_cache'].backend == 'local'
+
+
+def test_inserts_invalidate_cached_lookups(client):
+    client.post('/insert_master_data', json={'v_id': 'AEX1', 'v_name': 'Ramu', 'contact': 9876543210})
+    assert client.get('/get_master_data?contact=9876543210').status_code == 200
+    # Not found is cached too
+    assert client.get('/get_master_data?contact=9123456789').status_code == 404
+
+    # Moving the voter to a new contact drops both the old and the new lookup
+    client.post('/insert_master_data/bulk', json=[{'v_id': 'AEX1', 'contact': 9123456789}])
+    assert client.get('/get_master_data?contact=9876543210').status_code == 404
+    assert client.get('/get_master_data?contact=9123456789').json['data'][0]['v_id'] == 'AEX1'
+    assert client.get('/cache/stats').json['cache']['invalidations'] > 0
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def household(client):
+    """Five voters named Ramu sharing one contact"""
+    rows = [{'v_id': f'AEX{i}', 'v_name': 'Ramu', 'age': 30 + i, 'contact': 9876543210} for i in range(5)]
+    assert client.post('/insert_master_data/bulk', json=rows).status_code == 201
+
+
+@pytest.mark.parametrize('field, value', [('v_name', 'Ramu'), ('contact', '9876543210')])
+def test_keyset_paging_walks_every_row_once(client, household, field, value):
+    seen = []
+    after = 0
+    while after is not None:
+        response = client.get(f'/get_master_data?{field}={value}&limit=2&after_master_id={after}')
+        assert response.status_code == 200
+        page = response.json['data']
+        assert len(page) <= 2
+        seen += [row['v_id'] for row in page]
+        after = response.json['next_after_master_id']
+    assert seen == [f'AEX{i}' for i in range(5)]
+
+
+def test_last_full_page_has_no_next(client, household):
+    response = client.get('/get_master_data?v_name=Ramu&limit=5')
+    assert len(response.json['data']) == 5
+    assert response.json['next_after_master_id'] is None
+
+
+def test_fields_projection_always_includes_master_id(client, household):
+    response = client.get('/get_master_data?v_id=AEX1&fields=v_name,age')
+    assert response.json['data'] == [{'master_id': 2, 'v_name': 'Ramu', 'age': 31}]
+
+
+@pytest.mark.parametrize('query, message', [
+    ('v_id=AEX1&fields=password', 'Unknown fields: password'),
+    ('v_id=AEX1&limit=0', 'limit must be between 1 and 1000'),
+    ('v_id=AEX1&after_master_id=x', 'after_master_id must be an integer'),
+    ('', 'Please provide v_id, v_name, or contact'),
+])
+def test_bad_lookup_parameters(client, query, message):
+    response = client.get(f'/get_master_data?{query}')
+    assert response.status_code == 400
+    assert response.json['message'] == message
+
+
+def test_not_found(client, household):
+    assert client.get('/get_master_data?v_id=NOPE').status_code == 404
+
+
+def test_ndjson_streams_every_row(client, household):
+    response = client.get('/get_master_data?v_name=Ramu&format=ndjson&fields=v_id')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['v_id'] for row in rows] == [f'AEX{i}' for i in range(5)]
+    assert set(rows[0]) == {'master_id', 'v_id'}
+
+
+def test_ndjson_by_accept_header_resumes_after_master_id(client, household):
+    response = client.get('/get_master_data?contact=9876543210&after_master_id=3&limit=1',
+                          headers={'Accept': 'application/x-ndjson'})
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['master_id'] for row in rows] == [4]
@@ -0,0 +1,36 @@
+import pytest
+
+import master_db
+from master_db import (INSERT_MASTER_QUERY, V_ID_INDEX, cache_key, create_pool, load_config, master_cache_keys,
+                       master_values)
+
+
+def test_load_config_reads_prefixed_environment(monkeypatch):
+    monkeypatch.setenv('NSPC_DB_HOST', 'db.internal')
+    monkeypatch.setenv('NSPC_DB_POOL_SIZE', '20')
+    monkeypatch.setenv('NSPC_DB_PASSWORD', '1234')
+    config = load_config()
+    assert (config['DB_HOST'], config['DB_POOL_SIZE'], config['DB_PASSWORD']) == ('db.internal', 20, 1234)
+    assert config['DB_NAME'] == master_db.DEFAULT_CONFIG['DB_NAME']
+
+
+def test_create_pool_needs_a_password(monkeypatch):
+    monkeypatch.delenv('NSPC_DB_PASSWORD', raising=False)
+    with pytest.raises(RuntimeError):
+        create_pool(load_config())
+    # A numeric password from the environment is still passed as a string
+    pool = create_pool({**load_config(), 'DB_PASSWORD': 1234})
+    assert pool.connect_kwargs['password'] == '1234'
+
+
+def test_master_values_match_the_insert_query():
+    values = master_values({'v_id': 'AEX1', 'v_name': 'Lakshmi Devi', 'unknown': 'ignored'})
+    assert len(values) == INSERT_MASTER_QUERY.count('%s')
+    assert values[V_ID_INDEX] == 'AEX1'
+    assert values[-2:] == ('lakshmi devi', 'l250 d100')
+
+
+def test_cache_keys_match_how_mysql_compares():
+    assert cache_key('v_id', ' aex1 ') == cache_key('v_id', 'AEX1')
+    assert cache_key('contact', '09876543210') == cache_key('contact', 9876543210)
+    assert master_cache_keys({'v_id': 'AEX1', 'contact': None}) == [('v_id', 'aex1')]
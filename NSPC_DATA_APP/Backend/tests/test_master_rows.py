@@ -0,0 +1,50 @@
+import pytest
+
+from master_rows import (MASTER_COLUMNS, normalize_age, normalize_contact, normalize_gender, normalize_master_row,
+                         normalize_relation_type, to_master_row)
+
+
+@pytest.mark.parametrize('value, expected', [('Male', 'M'), (' f', 'F'), ('T', 'T'), ('X', None), ('', None)])
+def test_normalize_gender(value, expected):
+    assert normalize_gender(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [(40, 40), ('40', 40), ('40.0', 40), ('17', None), (121, None),
+                                             ('forty', None), (None, None)])
+def test_normalize_age(value, expected):
+    assert normalize_age(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [('HUSBAND', 'Husband'), ('Others', 'Other'), ('father ', 'Father'),
+                                             ('guardian', 'Guardian'), ('', None)])
+def test_normalize_relation_type(value, expected):
+    assert normalize_relation_type(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [('+91 98765-43210', 919876543210), (9876543210, 9876543210),
+                                             ('n/a', None)])
+def test_normalize_contact(value, expected):
+    assert normalize_contact(value) == expected
+
+
+def test_normalize_master_row_cleans_and_truncates():
+    row = normalize_master_row({'v_id': ' aex 1234567 ', 'v_name': '  ', 's_no': '123456', 'age': float('nan'),
+                                'address': 'x' * 200, 'gender': 'female'})
+    assert row == {'v_id': 'AEX1234567', 'v_name': None, 's_no': '12345', 'age': None,
+                   'address': 'x' * 150, 'gender': 'F'}
+
+
+def test_to_master_row_maps_extractor_fields():
+    record = {'voter_id': 'aex1234567', 'name': 'Lakshmi Devi', 'relative_name': 'Ramu', 'relation_type': 'HUSBAND',
+              'house_number': '1-23', 'age': '40', 'gender': 'Female', 'page_num': 3}
+    assert to_master_row(record, booth_id=7) == {
+        'v_id': 'AEX1234567', 'v_name': 'Lakshmi Devi', 'relation_name': 'Ramu', 'relation_type': 'Husband',
+        'address': '1-23', 'age': 40, 'gender': 'F', 'booth_id': 7}
+
+
+def test_to_master_row_keeps_master_columns():
+    record = {column: None for column in MASTER_COLUMNS}
+    record.update({'v_id': 'AEX1', 'contact': '98765 43210', 'booth_id': 2, 'extra': 'ignored'})
+    row = to_master_row(record)
+    assert set(row) == set(MASTER_COLUMNS)
+    assert (row['contact'], row['booth_id']) == (9876543210, 2)
@@ -0,0 +1,60 @@
+import pytest
+
+from name_index import MAX_PHONETIC_KEY_LENGTH, name_keys, normalize_name, phonetic_key, similarity, trigrams
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('  Lakshmi   DEVI ', 'lakshmi devi'),
+    ('K. Ramesh-Kumar', 'k ramesh kumar'),
+    ('Rao 2nd', 'rao nd'),
+    ('', ''),
+    (None, ''),
+])
+def test_normalize_name(name, expected):
+    assert normalize_name(name) == expected
+
+
+@pytest.mark.parametrize('a, b', [
+    ('Lakshmi', 'Laxmi'),
+    ('Srinivas', 'Shrinivas'),
+    ('Bhaskar', 'Baskar'),
+    ('Geetha', 'Gita'),
+    ('Ramu', 'Raamu'),
+])
+def test_spelling_variants_share_a_phonetic_key(a, b):
+    assert phonetic_key(a) == phonetic_key(b)
+
+
+def test_different_names_have_different_keys():
+    assert phonetic_key('Lakshmi') != phonetic_key('Lakshman')
+    assert phonetic_key('Ramesh') != phonetic_key('Rajesh')
+
+
+def test_phonetic_key_is_one_padded_code_per_word():
+    assert phonetic_key('Lakshmi Devi') == 'l250 d100'
+    assert phonetic_key('K. Ramesh') == 'k000 r520'
+    # Each word stands on its own, so a single name matches a full one word by word
+    assert phonetic_key('Laxmi') in phonetic_key('Lakshmi Devi').split()
+
+
+def test_name_keys():
+    assert name_keys('Lakshmi  Devi') == ('lakshmi devi', 'l250 d100')
+    assert name_keys('') == (None, None)
+    assert name_keys('123') == (None, None)
+
+
+def test_long_phonetic_key_keeps_whole_words():
+    norm, phonetic = name_keys(' '.join(['a'] * 60))
+    assert len(phonetic) <= MAX_PHONETIC_KEY_LENGTH
+    assert set(phonetic.split()) == {'a000'}
+
+
+def test_trigrams_pad_each_word():
+    assert trigrams('Ram') == {'  r', ' ra', 'ram', 'am '}
+
+
+def test_similarity():
+    assert similarity('lakshmi devi', 'Lakshmi Devi') == 1.0
+    assert similarity('lakshmi', 'ramesh') == 0.0
+    assert similarity('', 'ramesh') == 0.0
+    assert similarity('lakshmi devi', 'laxmi devi') > similarity('lakshmi devi', 'lakshman rao')
@@ -0,0 +1,68 @@
+import pytest
+
+
+@pytest.fixture
+def voters(client):
+    rows = [{'v_id': f'AEX{i}', 'v_name': name} for i, name in
+            enumerate(['Lakshmi Devi', 'Laxmi Devi', 'Lakshman Rao', 'Ramesh Kumar'])]
+    assert client.post('/insert_master_data/bulk', json=rows).status_code == 201
+
+
+@pytest.mark.parametrize('limit, message', [
+    ('ten', 'limit must be an integer'),
+    ('0', 'limit must be between 1 and 100'),
+    ('101', 'limit must be between 1 and 100'),
+])
+def test_bad_limit(client, limit, message):
+    response = client.get(f'/search?q=lakshmi&limit={limit}')
+    assert response.status_code == 400
+    assert response.json['message'] == message
+
+
+def test_other_errors_are_not_reported_as_bad_limit(client, voters, monkeypatch):
+    import server
+
+    def fail(*args):
+        raise ValueError('ranking failed')
+
+    monkeypatch.setattr(server, 'rank_candidates', fail)
+    response = client.get('/search?q=lakshmi')
+    assert response.status_code == 500
+    assert response.json['message'] == 'ranking failed'
+
+
+def test_prefix_search(client, voters):
+    response = client.get('/search?q=laksh&mode=prefix')
+    assert response.status_code == 200
+    assert [row['v_name'] for row in response.json['data']] == ['Lakshman Rao', 'Lakshmi Devi']
+
+
+def test_no_match(client, voters):
+    assert client.get('/search?q=zzz&mode=prefix').status_code == 404
+
+
+@pytest.mark.parametrize('mode', ['prefix', 'fuzzy'])
+def test_results_have_the_master_fields_only(client, voters, mode):
+    import server
+    response = client.get(f'/search?q=lakshmi devi&mode={mode}')
+    assert response.status_code == 200
+    for row in response.json['data']:
+        assert set(row) - {'score'} == set(server.MASTER_FIELDS)
+
+
+def test_fuzzy_search_ranks_the_closest_name_first(client, voters):
+    response = client.get('/search?q=Lakshmi Devi')
+    assert response.status_code == 200
+    names = [row['v_name'] for row in response.json['data']]
+    assert names[0] == 'Lakshmi Devi'
+    assert 'Laxmi Devi' in names
+    assert 'Ramesh Kumar' not in names
+
+
+def test_fuzzy_search_matches_phonetic_keys_word_by_word(client, voters, db):
+    assert db.execute("SELECT v_name_phonetic FROM Master_data WHERE v_id = 'AEX0'") == [('l250 d100',)]
+    response = client.get('/search?q=Laxmi')
+    assert response.status_code == 200
+    names = [row['v_name'] for row in response.json['data']]
+    assert {'Lakshmi Devi', 'Laxmi Devi'} <= set(names)
+    assert 'Lakshman Rao' not in names
@@ -1,302 +1,360 @@
 import os
+import re
 import cv2
 import numpy as np
 import pandas as pd
-from pdf2image import convert_from_path
 import pytesseract
 from PIL import Image
-import re
 import time
+from page_source import PdfPageSource, POPPLER_PATH, COLOR_MODES
+from page_preprocess import BoxBuffer, binarize_page, box_scale_for_dpi, estimate_skew, resize_boxes, rotate_page
+from batch_ocr import batch_image_to_string, page_image_to_texts
+from ocr_backend import OcrBackend, get_backend
+from debug_writer import DebugWriter, DEBUG_LEVELS
+from box_detector import detect_voter_boxes
+from voter_parser import parse_voter_fields
+
+PSM_11 = '--oem 3 --psm 11'
+PSM_6 = '--oem 3 --psm 6'
+PSM_7 = '--oem 3 --psm 7'
+# Automatic layout for whole pages, like pdf-ocr-extracter.py
+PSM_3 = '--oem 3 --psm 3'
+
+# 'page' reads every card from one OCR pass over the page, OCR'ing single boxes only when that fails
+OCR_MODES = ('box', 'batch', 'page')
+PAGE_PASS = ('page', PSM_3)
+OCR_STRATEGIES = ('adaptive', 'full')
+
+# First-pass OCR for every box: (region, config)
+FIRST_PASS = {
+    # Cheapest useful pass only, later passes are run per box as needed
+    'adaptive': [('resized', PSM_6)],
+    # Every PSM up front
+    'full': [('resized', PSM_11), ('resized', PSM_6), ('age_region', PSM_7)],
+}
+
+PARSED_FIELDS = ('voter_id', 'name', 'relative_name', 'house_number', 'age', 'gender')
+AGE_GENDER = ('age', 'gender')
+
+# Passes tried in order while fields are still missing or low-confidence:
+# (region, config, fields the pass can help with)
+ESCALATION_PASSES = [
+    ('resized', PSM_6, PARSED_FIELDS),
+    ('resized', PSM_11, PARSED_FIELDS),
+    ('age_region', PSM_7, AGE_GENDER),
+    ('age_region', PSM_6, AGE_GENDER),
+]
+
+# Fields whose words average below this tesseract confidence (0-100) get re-read
+MIN_FIELD_CONFIDENCE = 60
+
+# A box missing any of these counts as a failure for debug_level='failures'
+REQUIRED_FIELDS = ('voter_id', 'name', 'age', 'gender')
+
+# EPIC number layout; in page mode an ID that doesn't fit sends the box to per-box OCR
+VOTER_ID_FORMAT = re.compile(r'[A-Z]{3}\d{7}')
+
+DEBUG_TEXT_FILES = {
+    ('resized', PSM_11): "text_psm11.txt",
+    ('resized', PSM_6): "text_psm6.txt",
+    ('age_region', PSM_7): "text_psm7.txt",
+    ('age_region', PSM_6): "text_age_psm6.txt",
+    PAGE_PASS: "text_page.txt",
+}
+
+
+def _ordered_texts(texts, keys):
+    """Texts for the given (region, config) keys that have been OCR'd, in order"""
+    return [texts[key] for key in keys if key in texts]
+
 
 class VoterExtractor:
-    def __init__(self, pdf_path):
+    def __init__(self, pdf_path, poppler_path=POPPLER_PATH, ocr_mode='box', ocr_backend='auto', ocr_threads=1,
+                 debug_level='off', ocr_strategy='adaptive', ocr_cache=None, deskew=False,
+                 dpi=300, color='rgb', box_scale=None):
+        if ocr_mode not in OCR_MODES:
+            raise ValueError(f"ocr_mode must be one of {OCR_MODES}, got {ocr_mode!r}")
+        if ocr_strategy not in OCR_STRATEGIES:
+            raise ValueError(f"ocr_strategy must be one of {OCR_STRATEGIES}, got {ocr_strategy!r}")
+        if color not in COLOR_MODES:
+            raise ValueError(f"color must be one of {COLOR_MODES}, got {color!r}")
+        if debug_level not in DEBUG_LEVELS:
+            raise ValueError(f"debug_level must be one of {DEBUG_LEVELS}, got {debug_level!r}")
         self.pdf_path = pdf_path
+        # color='gray' or 'mono' renders a single channel, the pipeline only ever uses gray
+        self.pages = PdfPageSource(pdf_path, dpi=dpi, poppler_path=poppler_path, color=color)
+        # Boxes are upscaled to about 600 DPI for OCR, not at all once the render is that sharp
+        self.box_scale = box_scale or box_scale_for_dpi(dpi)
+        self.ocr_mode = ocr_mode
+        self.ocr_strategy = ocr_strategy
+        # Straighten scanned pages before box detection
+        self.deskew = deskew
+        # Every page's resized boxes are written into this one allocation
+        self.box_buffer = BoxBuffer()
+        # Engine handles are shared by every extractor in this process. With ocr_cache
+        # (a SQLite file path) OCR results are reused across runs on the same PDFs
+        if isinstance(ocr_backend, OcrBackend):
+            self.ocr = ocr_backend
+        else:
+            self.ocr = get_backend(ocr_backend, threads=ocr_threads, cache_path=ocr_cache)
         self.debug_folder = "debug_images"
-        os.makedirs(self.debug_folder, exist_ok=True)
+        self.debug_level = debug_level
+        # Debug artifacts are written off the OCR path by a background thread
+        self.debug = DebugWriter(self.debug_folder) if debug_level != 'off' else None
+        # Box detection counts per page number
+        self.detection_stats = {}
+
+    def prepare_voter_box(self, image, box, box_num, resized=None):
+        """Crop and binarize a voter box, returning its OCR regions by name
 
-    def process_voter_box(self, image, box, box_num):
-        """Process a single voter box using simple approach"""
+        process_page passes the box already binarized and resized from the
+        whole page; otherwise that is done here from the crop.
+        """
         x, y, w, h = box
-        box_folder = os.path.join(self.debug_folder, f"box_{box_num}")
-        os.makedirs(box_folder, exist_ok=True)
         
-        # Extract and save original box
+        # Extract original box
         box_image = image[y:y+h, x:x+w]
-        cv2.imwrite(os.path.join(box_folder, "original_box.png"), box_image)
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(box_image, cv2.COLOR_BGR2GRAY)
-        
-        # Simple binary threshold
-        _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
         
-        # Resize for better OCR
-        resized = cv2.resize(binary, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
-        cv2.imwrite(os.path.join(box_folder, "resized.png"), resized)
+        if resized is None:
+            # Convert to grayscale, unless the page was rendered gray
+            gray = box_image if box_image.ndim == 2 else cv2.cvtColor(box_image, cv2.COLOR_BGR2GRAY)
+            
+            # Simple binary threshold
+            _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
+            
+            # Resize for better OCR
+            resized = binary if self.box_scale == 1 else cv2.resize(
+                binary, None, fx=self.box_scale, fy=self.box_scale, interpolation=cv2.INTER_CUBIC)
         
         # Extract age region (bottom 30% of image, but before 'Available' text)
         height = resized.shape[0]
         age_region = resized[int(height*0.6):int(height*0.85), :]  # Adjusted region
-        cv2.imwrite(os.path.join(box_folder, "age_region.png"), age_region)
-        
-        # Get text with different PSM modes
-        text_11 = pytesseract.image_to_string(resized, config='--oem 3 --psm 11')
-        text_6 = pytesseract.image_to_string(resized, config='--oem 3 --psm 6')
-        text_7 = pytesseract.image_to_string(age_region, config='--oem 3 --psm 7')
         
-        # Save debug text
-        with open(os.path.join(box_folder, "text_psm11.txt"), 'w') as f:
-            f.write(text_11)
-        with open(os.path.join(box_folder, "text_psm6.txt"), 'w') as f:
-            f.write(text_6)
-        with open(os.path.join(box_folder, "text_psm7.txt"), 'w') as f:
-            f.write(text_7)
-        
-        # Parse information
-        info = {
-            'box_num': box_num,
-            'voter_id': '',
-            'name': '',
-            'relative_name': '',
-            'relation_type': '',
-            'house_number': '',
-            'age': '',
-            'gender': ''
-        }
-        
-        # Enhanced voter ID patterns
-        voter_id_patterns = [
-            r'([A-Z]{2,3}\s*\d{7,8})',  # With possible space
-            r'([A-Z]{2,3}[A-Z0-9]\d{6,7})',  # With extra character
-            r"[A-Z]{3}\d[^\w\s]\d{5}", #special characters handling
-            r'([A-Z]{2,3}\d{7,8})'  # Standard format
-        ]
+        return {'original': box_image, 'resized': resized, 'age_region': age_region}
+
+    def save_box_debug(self, box_num, regions, texts, info):
+        """Queue a box's images and OCR text for the debug writer"""
+        if self.debug is None:
+            return
+        if self.debug_level == 'failures' and all(info[field] for field in REQUIRED_FIELDS):
+            return
         
-        # Try to find voter ID in both PSM 11 and PSM 6
-        for text in [text_11, text_6]:
-            for pattern in voter_id_patterns:
-                voter_id_match = re.search(pattern, text)
-                if voter_id_match:
-                    # Clean up the voter ID (remove spaces and normalize)
-                    voter_id = voter_id_match.group(1).replace(" ", "")
-                    # If it has an extra character after the prefix, handle it
-                    if len(voter_id) > 10:
-                        voter_id = voter_id[:3] + voter_id[4:]
-                    info['voter_id'] = voter_id
+        box_folder = f"box_{box_num}"
+        self.debug.write_image(os.path.join(box_folder, "original_box.png"), regions['original'])
+        # Resized boxes live in the reusable box buffer, which the next page overwrites
+        self.debug.write_image(os.path.join(box_folder, "resized.png"), regions['resized'].copy())
+        self.debug.write_image(os.path.join(box_folder, "age_region.png"), regions['age_region'].copy())
+        for key, text in texts.items():
+            self.debug.write_text(os.path.join(box_folder, DEBUG_TEXT_FILES[key]), text)
+
+    def flush_debug(self):
+        """Wait for queued debug artifacts to reach the disk"""
+        if self.debug is not None:
+            self.debug.flush()
+
+    def ocr_voter_boxes(self, box_regions):
+        """Run the first OCR pass for a page of boxes, one text dict per box
+
+        In batch mode every (region, config) pair is OCR'd for all boxes at
+        once through a stitched mosaic instead of one tesseract call per box.
+        """
+        all_texts = [{} for _ in box_regions]
+        for region, config in FIRST_PASS[self.ocr_strategy]:
+            images = [regions[region] for regions in box_regions]
+            if self.ocr_mode == 'batch':
+                # Single-line PSM 7 needs the tiles side by side
+                axis = 1 if config == PSM_7 else 0
+                texts = batch_image_to_string(images, config=config, axis=axis, backend=self.ocr)
+            elif self.ocr_strategy == 'adaptive':
+                # Word confidences decide what to re-read, so go through image_to_data
+                texts = self.ocr.map_image_to_text(images, config=config)
+            else:
+                texts = self.ocr.map_image_to_string(images, config=config)
+            for box_texts, text in zip(all_texts, texts):
+                box_texts[(region, config)] = text
+        return all_texts
+
+    def ocr_page(self, binary, voter_boxes):
+        """Read every box of a page from a single whole-page OCR pass, one text dict per box"""
+        texts = page_image_to_texts(binary, voter_boxes, config=PSM_3, backend=self.ocr)
+        return [{PAGE_PASS: text} for text in texts]
+
+    def ocr_region(self, regions, texts, region, config):
+        """OCR one region of a box, at most once per (region, config)"""
+        key = (region, config)
+        if key not in texts:
+            if self.ocr_strategy == 'adaptive':
+                texts[key] = self.ocr.image_to_text(regions[region], config=config)
+            else:
+                texts[key] = self.ocr.image_to_string(regions[region], config=config)
+        return texts[key]
+
+    def field_confidence(self, value, texts):
+        """Best mean word confidence for a field value across the OCR'd texts
+
+        Returns None when no text has confidences covering every word of the value.
+        """
+        tokens = value.lower().split()
+        best = None
+        for text in texts.values():
+            words = [(word.lower(), conf) for word, conf in getattr(text, 'words', [])]
+            confidences = []
+            for token in tokens:
+                matches = [conf for word, conf in words if token in word]
+                if not matches:
                     break
-            if info['voter_id']:
-                break
-        
-        # Extract name (try both PSM 11 and PSM 6)
-        for text in [text_6, text_11]:
-            name_match = re.search(r'Name\s*:\s*([^\n]+)', text)
-            if name_match:
-                info['name'] = name_match.group(1).strip()
-                break
+                confidences.append(max(matches))
+            else:
+                if confidences:
+                    confidence = sum(confidences) / len(confidences)
+                    best = confidence if best is None else max(best, confidence)
+        return best
+
+    def pending_fields(self, info, texts):
+        """Fields worth another OCR pass: missing, or read with low confidence"""
+        if self.ocr_strategy == 'full' and self.ocr_mode != 'page':
+            # Every field already had all three first passes
+            return {field for field in AGE_GENDER if not info[field]}
+
+        pending = set()
+        if self.ocr_mode == 'page' and info['voter_id'] and not VOTER_ID_FORMAT.fullmatch(info['voter_id']):
+            pending.add('voter_id')
+        for field in PARSED_FIELDS:
+            if not info[field]:
+                pending.add(field)
+                continue
+            confidence = self.field_confidence(info[field], texts)
+            if confidence is not None and confidence < MIN_FIELD_CONFIDENCE:
+                pending.add(field)
+        return pending
+
+    def process_voter_box(self, image, box, box_num, regions=None, texts=None):
+        """Process a single voter box, escalating OCR only for fields still missing"""
+        if regions is None:
+            regions = self.prepare_voter_box(image, box, box_num)
+        if texts is None:
+            texts = self.ocr_voter_boxes([regions])[0]
         
-        # Extract relation (try both PSM 6 and PSM 11)
-        relation_patterns = [
-            (r"Husband'?s?\s*Name\s*:\s*([^\n]+)", "Husband"),
-            (r"Father'?s?\s*Name\s*:\s*([^\n]+)", "Father"),
-            (r"Mother'?s?\s*Name\s*:\s*([^\n]+)", "Mother"),
-            (r"Others?\s*:?\s*([^\n]+)", "Other")  # Added pattern for "Others"
-        ]
+        info = self.parse_voter_texts(texts, box_num)
         
-        for text in [text_6, text_11]:
-            for pattern, rel_type in relation_patterns:
-                match = re.search(pattern, text)
-                if match:
-                    relative_name = match.group(1).strip()
-                    # Clean up the relative name
-                    relative_name = relative_name.replace('Photo', '').strip()
-                    if relative_name:  # Only set if we have a name
-                        info['relation_type'] = rel_type
-                        info['relative_name'] = relative_name
-                        break
-            if info['relative_name']:
+        for region, config, fields in ESCALATION_PASSES:
+            pending = self.pending_fields(info, texts)
+            if not pending:
                 break
+            if (region, config) in texts or not pending.intersection(fields):
+                continue
+            self.ocr_region(regions, texts, region, config)
+            info = self.parse_voter_texts(texts, box_num)
         
-        # Extract house number (try both PSM 6 and PSM 11)
-        for text in [text_11, text_6]:  # Try PSM 11 first as it seems to handle multi-line better
-            # First try to find the house number and all text until Age/Gender/Available
-            house_match = re.search(r'House\s*Number\s*:\s*(.*?)(?=\s*(?:Age|Gender|Available))', text, re.DOTALL)
-            if house_match:
-                # Get all lines after "House Number:"
-                house_text = house_match.group(1)
-                
-                # Clean up the text:
-                # 1. Split into lines
-                # 2. Remove 'Photo' and empty lines
-                # 3. Join everything with spaces
-                house_lines = [
-                    line.strip()
-                    for line in house_text.split('\n')
-                    if line.strip() and 'Photo' not in line
-                ]
-                
-                # Join all parts and clean up
-                house_number = ' '.join(house_lines)
-                
-                # Additional cleanup
-                house_number = (house_number
-                              .replace('Flat Photo', 'Flat')  # Remove Photo if it's part of Flat
-                              .replace('  ', ' ')  # Remove double spaces
-                              .strip())
-                
-                # Only use if we have a meaningful address (more than just numbers/dots)
-                if house_number and len(house_number) > 2 and not house_number.endswith('.'):
-                    info['house_number'] = house_number
-                    break
-        
-        # If we didn't get a good house number, try the simpler pattern
-        if not info['house_number']:
-            for text in [text_11, text_6]:
-                house_match = re.search(r'House\s*Number\s*:\s*([^\n]+?)(?=\s*(?:Age|Gender|Photo|$))', text)
-                if house_match:
-                    house_number = house_match.group(1).strip()
-                    if house_number and len(house_number) > 2 and not house_number.endswith('.'):
-                        info['house_number'] = house_number
-                        break
-        
-        # Extract age and gender (try PSM 7 first, then others)
-        for text in [text_7, text_6, text_11]:
-            # Try exact pattern first with very flexible matching
-            age_gender_match = re.search(r'Age\s*[>:]?\s*(\d+).*?(?:Gender|Gander)\s*[>:]?\s*([MmFf][^\s\n]*)', text)
-            if not age_gender_match:
-                # Try separate patterns with more flexible matching
-                age_match = re.search(r'Age\s*[>:]?\s*(\d+)', text)
-                # Very flexible gender pattern
-                gender_match = re.search(r'(?:Gender|Gander)\s*[>:]?\s*([MmFf][^\s\n]*)', text)
-                
-                if age_match:
-                    age = age_match.group(1)
-                    if age.isdigit() and 18 <= int(age) <= 120:
-                        info['age'] = age
-                
-                if gender_match:
-                    # Normalize gender text
-                    gender = gender_match.group(1).strip().upper()
-                    if gender.startswith('M'):
-                        info['gender'] = 'Male'
-                    elif gender.startswith('F'):
-                        info['gender'] = 'Female'
-                
-                if info['age'] and info['gender']:
-                    break
-            else:
-                age = age_gender_match.group(1)
-                if age.isdigit() and 18 <= int(age) <= 120:
-                    info['age'] = age
-                    # Normalize gender text
-                    gender = age_gender_match.group(2).strip().upper()
-                    if gender.startswith('M'):
-                        info['gender'] = 'Male'
-                    elif gender.startswith('F'):
-                        info['gender'] = 'Female'
-                    break
-        
-        # If still no age/gender, try one more time with very flexible pattern
-        if not info['age'] or not info['gender']:
-            # Try all possible regions and PSM modes
-            regions = [
-                (resized, '--oem 3 --psm 6'),
-                (resized, '--oem 3 --psm 11'),
-                (age_region, '--oem 3 --psm 7'),
-                (age_region, '--oem 3 --psm 6')
-            ]
-            
-            for region, config in regions:
-                text = pytesseract.image_to_string(region, config=config)
-                
-                # Try to find age if still missing
-                if not info['age']:
-                    age_match = re.search(r'\b(\d{2})\b', text)
-                    if age_match:
-                        age = age_match.group(1)
-                        if age.isdigit() and 18 <= int(age) <= 120:
-                            info['age'] = age
-                
-                # Try to find gender if still missing with very flexible pattern
-                if not info['gender']:
-                    # Look for any word containing 'male' or starting with M/F
-                    gender_patterns = [
-                        r'(?:Gender|Gander)\s*[>:]?\s*([MmFf][^\s\n]*)',  # Try to match full gender field first
-                        r'\b(M[ae]le)\b',  # Match Male with variations
-                        r'\b(F[ae]male)\b',  # Match Female with variations
-                        r'\b([MmFf][^\s\n]*)\b'  # Last resort - any word starting with M/F
-                    ]
-                    
-                    for pattern in gender_patterns:
-                        gender_match = re.search(pattern, text, re.IGNORECASE)
-                        if gender_match:
-                            # Always use group 1 since all patterns now have capturing groups
-                            gender = gender_match.group(1).strip().upper()
-                            if gender.startswith('M') or 'MALE' in gender:
-                                info['gender'] = 'Male'
-                                break
-                            elif gender.startswith('F') or 'FEMALE' in gender:
-                                info['gender'] = 'Female'
-                                break
-                
-                if info['age'] and info['gender']:
-                    break
-        
+        self.save_box_debug(box_num, regions, texts, info)
         return info
 
-    def process_page(self, page_num=0):
-        """Process a single page"""
-        # Convert PDF to image
-        pages = convert_from_path(self.pdf_path, dpi=300, poppler_path= "C:\\Users\\chsat\\Documents\\poppler-24.08.0\\Library\\bin")
-        page = pages[page_num]
+    def parse_voter_texts(self, texts, box_num):
+        """Parse voter fields from the OCR'd texts of a box, keyed by (region, config)"""
+        fields = parse_voter_fields(
+            # PSM 11 keeps the voter ID and multi-line house numbers together best
+            # The whole-page read comes last, a box only gets its own OCR when that read failed
+            id_texts=_ordered_texts(texts, [('resized', PSM_11), ('resized', PSM_6), PAGE_PASS]),
+            name_texts=_ordered_texts(texts, [('resized', PSM_6), ('resized', PSM_11), PAGE_PASS]),
+            age_texts=_ordered_texts(texts, [('age_region', PSM_7), ('resized', PSM_6), ('resized', PSM_11), PAGE_PASS]),
+            # Every region and PSM read so far, in escalation order
+            fallback_texts=_ordered_texts(texts, [(region, config) for region, config, _ in ESCALATION_PASSES]
+                                          + [PAGE_PASS]),
+        )
+        return {
+            'box_num': box_num,
+            'voter_id': fields['voter_id'],
+            'name': fields['name'],
+            'relative_name': fields['relative_name'],
+            'relation_type': fields['relation_type'],
+            'house_number': fields['house_number'],
+            'age': fields['age'],
+            'gender': fields['gender'],
+        }
+
+    def load_page_image(self, page_num, cache=True):
+        """Render a page and convert it to an OpenCV BGR array, or a 2-D gray one for gray/mono renders"""
+        page = self.pages.get_page(page_num) if cache else self.pages.render_page(page_num)
+        image = np.array(page)
+        del page
         
-        # Convert to OpenCV format
-        image = cv2.cvtColor(np.array(page), cv2.COLOR_RGB2BGR)
+        if image.ndim == 3:
+            # Swap RGB to BGR in place instead of allocating another full-page copy
+            cv2.cvtColor(image, cv2.COLOR_RGB2BGR, dst=image)
+        return image
+
+    def process_page(self, page_num=0, image=None):
+        """Process a single page"""
+        # Render only the requested page unless the caller already did
+        if image is None:
+            image = self.load_page_image(page_num)
         
-        # Detect boxes
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY_INV)
+        # Detect voter cards, in reading order
+        # The gray page is thresholded in place below, so a gray render is copied
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image.copy()
+        if self.deskew:
+            angle = estimate_skew(gray)
+            if angle:
+                image, gray = rotate_page(image, angle), rotate_page(gray, angle)
+        voter_boxes, stats = detect_voter_boxes(gray, dpi=self.pages.dpi)
+        # Threshold the whole page once, in place; every box is cut from it as a view
+        binary = binarize_page(gray)
+        box_texts = self.ocr_page(binary, voter_boxes) if self.ocr_mode == 'page' else None
+        resized_boxes = resize_boxes(binary, voter_boxes, self.box_buffer, scale=self.box_scale)
+        # Only the BGR page is needed from here on
+        del gray, binary
         
-        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        self.detection_stats[page_num + 1] = stats
+        print(f"Detected {len(voter_boxes)} voter boxes via {stats['method']}, "
+              f"rejected {stats['rejected']} of {stats['candidates']} candidates "
+              f"(size {stats['rejected_size']}, aspect {stats['rejected_aspect']}, nested {stats['rejected_nested']})")
 
-        cv2.imwrite(f"{self.debug_folder}/page_{page_num + 1}_boxes.png", image.copy())
-        
-        voter_boxes = []
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            voter_boxes.append((x, y, w, h))
-            print(f"Contour: x={x}, y={y}, w={w}, h={h}")
-            # if w > 400 and h > 150 and 1.5 < w/h < 4:
-            #     voter_boxes.append((x, y, w, h))
+        if self.debug_level == 'full':
+            # The page is never modified after this point, so no copy is needed
+            self.debug.write_image(f"page_{page_num + 1}_boxes.png", image)
         
-        # Sort boxes top to bottom
-        # voter_boxes.sort(key=lambda x: x[1])
+        # Crop every box, then run the first OCR pass for the whole page
+        box_regions = [self.prepare_voter_box(image, box, i, resized=resized)
+                       for i, (box, resized) in enumerate(zip(voter_boxes, resized_boxes), 1)]
+        if box_texts is None:
+            box_texts = self.ocr_voter_boxes(box_regions)
         
         # Process each box
         results = []
         for i, box in enumerate(voter_boxes, 1):
-            info = self.process_voter_box(image, box, i)
+            info = self.process_voter_box(image, box, i, regions=box_regions[i - 1], texts=box_texts[i - 1])
             # Add page number to the info
             print(f"info: {info}")
             info['page_num'] = page_num + 1
             results.append(info)
         
+        if self.ocr_mode == 'page':
+            fallbacks = sum(1 for texts in box_texts if len(texts) > 1)
+            print(f"Whole-page OCR read {len(voter_boxes) - fallbacks} of {len(voter_boxes)} boxes, "
+                  f"{fallbacks} needed per-box OCR")
+        
         return pd.DataFrame(results)
 
 
+    def iter_page_results(self, page_nums=None):
+        """Yield (page_num, DataFrame) for each page, one rendered page at a time
+
+        page_nums limits extraction to those 0-based pages; the rest are never rendered.
+        """
+        total_pages = self.pages.page_count
+        for page_num in range(total_pages) if page_nums is None else page_nums:
+            print(f"\nProcessing page {page_num + 1} of {total_pages}...")
+            # Render uncached so the page bitmap is freed as soon as process_page returns,
+            # before page k+1 is rendered
+            df = self.process_page(page_num, image=self.load_page_image(page_num, cache=False))
+            yield page_num, df
+
     def process_all_pages(self):
         """Process all pages in the PDF"""
-        # Convert PDF to images first to get total pages
-        pages = convert_from_path(self.pdf_path, dpi=300, poppler_path= "C:\\Users\\chsat\\Documents\\poppler-24.08.0\\Library\\bin")
-        total_pages = len(pages)
-        
-        
-        # Process each page
+        # Process each page as it streams out of the PDF
         all_results = []
-        for page_num in range(total_pages):
-            start_time = time.time()
-            print(f"\nProcessing page {page_num + 1} of {total_pages}...")
-            df = self.process_page(page_num)
-            
+        start_time = time.time()
+        for page_num, df in self.iter_page_results():
             # Save individual page results
             output_file = f"voter_data_page_{page_num + 1}.csv"
             df.to_csv(output_file, index=False)
@@ -304,12 +362,14 @@ class VoterExtractor:
             print(f"Saved {output_file}", f"Time Taken {end_time - start_time }")
             
             all_results.append(df)
+            start_time = time.time()
         
         # Combine all results
         combined_df = pd.concat(all_results, ignore_index=True)
         
         # Save combined results
         combined_df.to_csv("voter_data_all.csv", index=False)
+        self.flush_debug()
         print("\nSaved combined results to voter_data_all.csv")
         
         return combined_df
@@ -0,0 +1,238 @@
+import argparse
+import os
+import re
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+# Voter ID patterns, tried in order on each text
+VOTER_ID_PATTERNS = [
+    re.compile(r'([A-Z]{2,3}\s*\d{7,8})'),  # With possible space
+    re.compile(r'([A-Z]{2,3}[A-Z0-9]\d{6,7})'),  # With extra character
+    re.compile(r"([A-Z]{3}\d[^\w\s]\d{5})"),  # Special characters handling
+    re.compile(r'([A-Z]{2,3}\d{7,8})'),  # Standard format
+]
+
+NAME_PATTERN = re.compile(r'Name\s*:\s*([^\n]+)')
+
+RELATION_PATTERNS = [
+    (re.compile(r"Husband'?s?\s*Name\s*:\s*([^\n]+)"), "Husband"),
+    (re.compile(r"Father'?s?\s*Name\s*:\s*([^\n]+)"), "Father"),
+    (re.compile(r"Mother'?s?\s*Name\s*:\s*([^\n]+)"), "Mother"),
+    (re.compile(r"Others?\s*:?\s*([^\n]+)"), "Other"),
+]
+
+# Everything after "House Number:" up to the age/gender line, which PSM 11 often splits over several lines
+HOUSE_BLOCK_PATTERN = re.compile(r'House\s*Number\s*:\s*(.*?)(?=\s*(?:Age|Gender|Available))', re.DOTALL)
+HOUSE_LINE_PATTERN = re.compile(r'House\s*Number\s*:\s*([^\n]+?)(?=\s*(?:Age|Gender|Photo|$))')
+
+AGE_GENDER_PATTERN = re.compile(r'Age\s*[>:]?\s*(\d+).*?(?:Gender|Gander)\s*[>:]?\s*([MmFf][^\s\n]*)')
+AGE_PATTERN = re.compile(r'Age\s*[>:]?\s*(\d+)')
+GENDER_PATTERN = re.compile(r'(?:Gender|Gander)\s*[>:]?\s*([MmFf][^\s\n]*)')
+
+# Last resort when the labelled fields were not read: any two-digit number, any M/F word
+LOOSE_AGE_PATTERN = re.compile(r'\b(\d{2})\b')
+LOOSE_GENDER_PATTERNS = [
+    re.compile(r'(?:Gender|Gander)\s*[>:]?\s*([MmFf][^\s\n]*)', re.IGNORECASE),
+    re.compile(r'\b(M[ae]le)\b', re.IGNORECASE),
+    re.compile(r'\b(F[ae]male)\b', re.IGNORECASE),
+    re.compile(r'\b([MmFf][^\s\n]*)\b', re.IGNORECASE),
+]
+
+# Electoral rolls only list adults
+MIN_AGE = 18
+MAX_AGE = 120
+
+# Parsed fields, in the extractor's column order
+FIELDS = ('voter_id', 'name', 'relation_type', 'relative_name', 'house_number', 'age', 'gender')
+
+# Candidates for every field from one text. name is None when the label is missing,
+# age_gender is None when age and gender are not on one line, and its age is ''
+# when that line's age is out of range
+TextFields = namedtuple('TextFields', ['voter_id', 'name', 'relation_type', 'relative_name', 'house_block',
+                                       'house_line', 'age_gender', 'age', 'gender', 'loose_age', 'loose_gender'])
+
+
+def valid_age(age):
+    return age if MIN_AGE <= int(age) <= MAX_AGE else ''
+
+
+def gender_label(text):
+    """'Male' or 'Female' from an OCR'd gender word, '' if it is neither"""
+    text = text.strip().upper()
+    if text.startswith('M'):
+        return 'Male'
+    if text.startswith('F'):
+        return 'Female'
+    return ''
+
+
+def valid_house_number(house_number):
+    # A meaningful address, not just a stray number or dot
+    return house_number if len(house_number) > 2 and not house_number.endswith('.') else ''
+
+
+def find_voter_id(text):
+    for pattern in VOTER_ID_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            voter_id = match.group(1).replace(" ", "")
+            # Drop the extra character after the prefix
+            if len(voter_id) > 10:
+                voter_id = voter_id[:3] + voter_id[4:]
+            return voter_id
+    return ''
+
+
+def find_relation(text):
+    for pattern, relation_type in RELATION_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            relative_name = match.group(1).strip().replace('Photo', '').strip()
+            if relative_name:
+                return relation_type, relative_name
+    return '', ''
+
+
+def find_house_block(text):
+    match = HOUSE_BLOCK_PATTERN.search(text)
+    if not match:
+        return ''
+    # Join the lines after "House Number:", dropping the "Photo is Available" label
+    lines = [line.strip() for line in match.group(1).split('\n') if line.strip() and 'Photo' not in line]
+    house_number = ' '.join(lines).replace('Flat Photo', 'Flat').replace('  ', ' ').strip()
+    return valid_house_number(house_number)
+
+
+def find_house_line(text):
+    match = HOUSE_LINE_PATTERN.search(text)
+    return valid_house_number(match.group(1).strip()) if match else ''
+
+
+def find_loose_gender(text):
+    for pattern in LOOSE_GENDER_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return gender_label(match.group(1))
+    return ''
+
+
+@lru_cache(maxsize=1024)
+def scan_text(text):
+    """Read every field candidate out of one OCR text
+
+    Results are cached, so re-parsing a box after another OCR pass only
+    scans the new text.
+    """
+    name_match = NAME_PATTERN.search(text)
+    relation_type, relative_name = find_relation(text)
+
+    age_gender = None
+    age = gender = ''
+    match = AGE_GENDER_PATTERN.search(text)
+    if match:
+        age_gender = (valid_age(match.group(1)), gender_label(match.group(2)))
+    else:
+        age_match = AGE_PATTERN.search(text)
+        gender_match = GENDER_PATTERN.search(text)
+        age = valid_age(age_match.group(1)) if age_match else ''
+        gender = gender_label(gender_match.group(1)) if gender_match else ''
+
+    loose_age_match = LOOSE_AGE_PATTERN.search(text)
+    return TextFields(
+        voter_id=find_voter_id(text),
+        name=name_match.group(1).strip() if name_match else None,
+        relation_type=relation_type,
+        relative_name=relative_name,
+        house_block=find_house_block(text),
+        house_line=find_house_line(text),
+        age_gender=age_gender,
+        age=age,
+        gender=gender,
+        loose_age=valid_age(loose_age_match.group(1)) if loose_age_match else '',
+        loose_gender=find_loose_gender(text),
+    )
+
+
+def parse_voter_fields(id_texts, name_texts, age_texts, fallback_texts):
+    """Parse a voter box's fields from its OCR texts
+
+    Each argument lists texts in the order they are trusted: id_texts for
+    the voter ID and house number, name_texts for the name and relation,
+    age_texts for age and gender, and fallback_texts for the loose
+    age/gender match when those are still missing.
+    """
+    info = dict.fromkeys(FIELDS, '')
+    id_scans = [scan_text(text) for text in id_texts]
+    name_scans = [scan_text(text) for text in name_texts]
+
+    info['voter_id'] = next((scan.voter_id for scan in id_scans if scan.voter_id), '')
+    info['name'] = next((scan.name for scan in name_scans if scan.name is not None), '')
+    for scan in name_scans:
+        if scan.relative_name:
+            info['relation_type'], info['relative_name'] = scan.relation_type, scan.relative_name
+            break
+    info['house_number'] = (next((scan.house_block for scan in id_scans if scan.house_block), '')
+                            or next((scan.house_line for scan in id_scans if scan.house_line), ''))
+
+    for scan in map(scan_text, age_texts):
+        if scan.age_gender is not None:
+            # Age and gender on one line, used only when the age is plausible
+            age, gender = scan.age_gender
+            if age:
+                info['age'] = age
+                info['gender'] = gender or info['gender']
+                break
+        else:
+            info['age'] = scan.age or info['age']
+            info['gender'] = scan.gender or info['gender']
+            if info['age'] and info['gender']:
+                break
+
+    if not info['age'] or not info['gender']:
+        for scan in map(scan_text, fallback_texts):
+            info['age'] = info['age'] or scan.loose_age
+            info['gender'] = info['gender'] or scan.loose_gender
+            if info['age'] and info['gender']:
+                break
+
+    return info
+
+
+def parse_voter_text(text):
+    """Parse a voter's fields from a single OCR text"""
+    return parse_voter_fields([text], [text], [text], [text])
+
+
+def split_voter_blocks(page_text):
+    """Split whole-page OCR text into one chunk per voter, starting at each "Name" line"""
+    return [block for block in re.split(r'\n(?=Name\s*:)', page_text) if block.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse voter fields from OCR text and time the parser")
+    parser.add_argument("path", nargs="?", default=os.path.join("..", "ocr_text_output", "page_1.txt"),
+                        help="Whole-page OCR text (default: %(default)s)")
+    parser.add_argument("-n", "--repeat", type=int, default=100, help="Timed parses of the page (default: %(default)s)")
+    args = parser.parse_args()
+
+    with open(args.path, encoding='utf-8') as f:
+        blocks = split_voter_blocks(f.read())
+
+    records = [parse_voter_text(block) for block in blocks]
+    for field in FIELDS:
+        print(f"{field}: {sum(1 for record in records if record[field])} of {len(records)}")
+
+    start_time = time.perf_counter()
+    for _ in range(args.repeat):
+        # Fresh texts each round, so the scan cache isn't what is being timed
+        scan_text.cache_clear()
+        for block in blocks:
+            parse_voter_text(block)
+    elapsed = time.perf_counter() - start_time
+    print(f"Parsed {len(blocks)} blocks x {args.repeat} in {elapsed:.3f}s "
+          f"({elapsed / (len(blocks) * args.repeat) * 1e6:.1f} us per block)")
+
+
+if __name__ == "__main__":
+    main()
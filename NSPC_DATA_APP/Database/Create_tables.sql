@@ -61,7 +61,8 @@ CREATE TABLE Polling_booth_mapping (
 
 -- 7. Master_data Table
 CREATE TABLE Master_data (
-    master_id BIGINT(20) PRIMARY KEY,
+    master_id BIGINT(20) AUTO_INCREMENT PRIMARY KEY,
+    booth_id BIGINT(20),
     s_no VARCHAR(5),
     v_id VARCHAR(45) UNIQUE,
     v_name VARCHAR(100),
@@ -71,7 +72,19 @@ CREATE TABLE Master_data (
     age INT,
     gender VARCHAR(1),
     v_status VARCHAR(45),
-    contact BIGINT(12)
+    contact BIGINT(12),
+    -- Search keys derived from v_name on insert (see Backend/name_index.py)
+    v_name_norm VARCHAR(100),
+    v_name_phonetic VARCHAR(150),
+    -- Secondary indexes for the get_master_data lookups
+    INDEX idx_master_contact (contact),
+    INDEX idx_master_v_name (v_name),
+    INDEX idx_master_booth (booth_id),
+    -- /search: prefix matches, word-by-word phonetic matches, and an n-gram index for fuzzy matches
+    INDEX idx_master_name_norm (v_name_norm),
+    FULLTEXT INDEX ft_master_name_phonetic (v_name_phonetic),
+    FULLTEXT INDEX ft_master_name_norm (v_name_norm) WITH PARSER ngram,
+    FOREIGN KEY (booth_id) REFERENCES Polling_booth(booth_id)
 );
 
 
@@ -0,0 +1,13 @@
+-- Bring an existing Master_data table in line with Create_tables.sql:
+-- server-generated master_id, a booth foreign key and indexes for lookups
+-- by contact and by name. Check the result with Backend/check_indexes.py
+
+USE NSPC_DATA_APP;
+
+ALTER TABLE Master_data
+    MODIFY master_id BIGINT(20) NOT NULL AUTO_INCREMENT,
+    ADD COLUMN booth_id BIGINT(20) AFTER master_id,
+    ADD INDEX idx_master_contact (contact),
+    ADD INDEX idx_master_v_name (v_name),
+    ADD INDEX idx_master_booth (booth_id),
+    ADD CONSTRAINT fk_master_booth FOREIGN KEY (booth_id) REFERENCES Polling_booth(booth_id);
@@ -0,0 +1,15 @@
+-- Search keys for the /search endpoint: a normalized name, its phonetic key
+-- and an n-gram FULLTEXT index on the normalized name. Fill the new columns
+-- for existing rows with Backend/backfill_name_index.py
+
+USE NSPC_DATA_APP;
+
+ALTER TABLE Master_data
+    ADD COLUMN v_name_norm VARCHAR(100) AFTER contact,
+    ADD COLUMN v_name_phonetic VARCHAR(150) AFTER v_name_norm,
+    ADD INDEX idx_master_name_norm (v_name_norm),
+    ADD INDEX idx_master_name_phonetic (v_name_phonetic);
+
+-- InnoDB builds a FULLTEXT index in its own ALTER
+ALTER TABLE Master_data
+    ADD FULLTEXT INDEX ft_master_name_norm (v_name_norm) WITH PARSER ngram;
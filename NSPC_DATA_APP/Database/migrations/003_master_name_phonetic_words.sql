@@ -0,0 +1,13 @@
+-- Match /search phonetic keys word by word, so "Laxmi" finds "Lakshmi Devi".
+-- v_name_phonetic now holds one padded key per word, indexed with the default
+-- FULLTEXT parser. Recompute it for existing rows with
+-- Backend/backfill_name_index.py --all
+
+USE NSPC_DATA_APP;
+
+ALTER TABLE Master_data
+    DROP INDEX idx_master_name_phonetic;
+
+-- InnoDB builds a FULLTEXT index in its own ALTER
+ALTER TABLE Master_data
+    ADD FULLTEXT INDEX ft_master_name_phonetic (v_name_phonetic);
@@ -0,0 +1,117 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from ocr_backend import get_backend, words_to_text
+
+# Tesseract rejects images larger than 32767 pixels on either side
+MAX_MOSAIC_EXTENT = 30000
+# White space between tiles so tesseract never joins words across boxes
+TILE_GAP = 60
+
+
+def _chunk_tiles(images, axis, gap, max_extent):
+    """Split images into runs whose stitched extent fits in one mosaic"""
+    chunk, extent = [], 0
+    for index, image in enumerate(images):
+        size = image.shape[axis]
+        if chunk and extent + gap + size > max_extent:
+            yield chunk
+            chunk, extent = [], 0
+        chunk.append(index)
+        extent += size + (gap if len(chunk) > 1 else 0)
+    if chunk:
+        yield chunk
+
+
+def build_mosaic(images, axis=0, gap=TILE_GAP):
+    """Stitch grayscale images into one white-padded mosaic
+
+    axis=0 stacks tiles top to bottom, axis=1 left to right.
+    Returns the mosaic and the start offset of each tile along the axis.
+    """
+    cross = 1 - axis
+    length = sum(image.shape[axis] for image in images) + gap * (len(images) - 1)
+    breadth = max(image.shape[cross] for image in images)
+
+    shape = (length, breadth) if axis == 0 else (breadth, length)
+    mosaic = np.full(shape, 255, dtype=np.uint8)
+
+    offsets = []
+    position = 0
+    for image in images:
+        h, w = image.shape[:2]
+        if axis == 0:
+            mosaic[position:position + h, :w] = image
+        else:
+            mosaic[:h, position:position + w] = image
+        offsets.append(position)
+        position += image.shape[axis] + gap
+
+    return mosaic, offsets
+
+
+def batch_image_to_string(images, config='', axis=0, gap=TILE_GAP, max_extent=MAX_MOSAIC_EXTENT, backend=None):
+    """OCR many grayscale images with one tesseract call per mosaic
+
+    Words are mapped back to their source image by the centre of their
+    bounding box along the stitching axis. Use axis=1 (side by side) for
+    single-line modes such as --psm 7. Returns one OcrText (text plus word
+    confidences) per image.
+    """
+    if backend is None:
+        backend = get_backend()
+    texts = [''] * len(images)
+
+    for chunk in _chunk_tiles(images, axis, gap, max_extent):
+        mosaic, offsets = build_mosaic([images[i] for i in chunk], axis=axis, gap=gap)
+        data = backend.image_to_data(mosaic, config=config)
+
+        tile_words = [[] for _ in chunk]
+        starts = data['top'] if axis == 0 else data['left']
+        extents = data['height'] if axis == 0 else data['width']
+        for i, word in enumerate(data['text']):
+            if not word.strip():
+                continue
+            centre = starts[i] + extents[i] / 2
+            tile = bisect_right(offsets, centre) - 1
+            if tile < 0 or centre > offsets[tile] + images[chunk[tile]].shape[axis]:
+                # Word sits in the gap between tiles
+                continue
+            tile_words[tile].append((data['block_num'][i], data['par_num'][i], data['line_num'][i], word,
+                                     float(data['conf'][i])))
+
+        for tile, index in enumerate(chunk):
+            texts[index] = words_to_text(tile_words[tile])
+
+    return texts
+
+
+def page_image_to_texts(page, boxes, config='', backend=None):
+    """OCR a whole page once and split its words among the voter boxes
+
+    boxes are (x, y, w, h) in page pixels. Each word goes to the box that
+    contains the centre of its bounding box; words outside every box
+    (headers, footers) are dropped. Returns one OcrText per box.
+    """
+    if backend is None:
+        backend = get_backend()
+    if not boxes:
+        return []
+    data = backend.image_to_data(page, config=config)
+
+    centres_x = np.asarray(data['left'], dtype=np.float32) + np.asarray(data['width'], dtype=np.float32) / 2
+    centres_y = np.asarray(data['top'], dtype=np.float32) + np.asarray(data['height'], dtype=np.float32) / 2
+    x, y, w, h = (np.asarray(column, dtype=np.float32)[None, :] for column in zip(*boxes))
+    # words x boxes containment, boxes don't overlap so each word has at most one
+    inside = ((centres_x[:, None] >= x) & (centres_x[:, None] < x + w)
+              & (centres_y[:, None] >= y) & (centres_y[:, None] < y + h))
+    owners = np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
+
+    box_words = [[] for _ in boxes]
+    for i, word in enumerate(data['text']):
+        if owners[i] < 0 or not word.strip():
+            continue
+        box_words[owners[i]].append((data['block_num'][i], data['par_num'][i], data['line_num'][i], word,
+                                     float(data['conf'][i])))
+    return [words_to_text(words) for words in box_words]
@@ -0,0 +1,171 @@
+import argparse
+import time
+
+import pandas as pd
+import pytesseract
+
+from page_source import POPPLER_PATH, COLOR_MODES
+from page_preprocess import box_scale_for_dpi
+from ocr_backend import BACKENDS
+from voter_extractor_v4 import VoterExtractor, OCR_MODES, OCR_STRATEGIES, VOTER_ID_FORMAT
+from parallel_extract import TESSERACT_CMD
+
+# Fields scored against the reference
+SCORED_FIELDS = ('voter_id', 'name', 'relative_name', 'house_number', 'age', 'gender')
+# Column names of the pdf-ocr-extracter.py output
+REFERENCE_COLUMNS = {
+    'VoterID': 'voter_id',
+    'Name': 'name',
+    'Relative Name': 'relative_name',
+    'House Number': 'house_number',
+    'Age': 'age',
+    'Gender': 'gender',
+}
+DEFAULT_SETTINGS = ('300:rgb', '300:gray', '300:mono', '200:gray', '400:gray', '600:gray')
+
+
+def parse_setting(text):
+    """(dpi, color, box_scale) from DPI[:COLOR[:SCALE]], box_scale None for the DPI default"""
+    parts = text.split(':')
+    if not 1 <= len(parts) <= 3:
+        raise argparse.ArgumentTypeError(f"expected DPI[:COLOR[:SCALE]], got {text!r}")
+    try:
+        dpi = int(parts[0])
+        color = parts[1] if len(parts) > 1 else 'rgb'
+        box_scale = int(parts[2]) if len(parts) > 2 else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected DPI[:COLOR[:SCALE]], got {text!r}")
+    if color not in COLOR_MODES:
+        raise argparse.ArgumentTypeError(f"color must be one of {COLOR_MODES}, got {color!r}")
+    return dpi, color, box_scale
+
+
+def normalize(field, value):
+    """Comparable form of a field value, '' when missing"""
+    if pd.isna(value):
+        return ''
+    value = ' '.join(str(value).split()).casefold()
+    if field == 'gender':
+        return value[:1]
+    if field == 'age':
+        try:
+            return str(int(float(value)))
+        except ValueError:
+            return ''
+    if field == 'voter_id':
+        return value.replace(' ', '')
+    return value
+
+
+def load_records(df):
+    """Normalized field dicts from a reference or extractor DataFrame"""
+    df = df.rename(columns=REFERENCE_COLUMNS)
+    return [{field: normalize(field, row.get(field)) for field in SCORED_FIELDS}
+            for row in df.to_dict('records')]
+
+
+def reference_for_pages(df, pages):
+    """Reference rows on the first pages pages, by the 1-based page_num column of extractor CSVs
+
+    A reference without page_num is taken to cover exactly those pages.
+    """
+    if 'page_num' not in df.columns:
+        return df
+    return df[pd.to_numeric(df['page_num'], errors='coerce').between(1, pages)]
+
+
+def score(reference, extracted):
+    """Recall and per-field accuracy of extracted against reference
+
+    Rows are paired by voter ID where the reference has a well-formed one,
+    otherwise by name. Recall is the share of reference rows paired with an
+    extracted row; each field's accuracy is over the paired rows whose
+    reference has that field, so a voter that was never found doesn't count
+    against how well the found ones were read.
+    """
+    by_id, by_name = {}, {}
+    for record in extracted:
+        if record['voter_id']:
+            by_id.setdefault(record['voter_id'], record)
+        if record['name']:
+            by_name.setdefault(record['name'], []).append(record)
+
+    matched = 0
+    correct = dict.fromkeys(SCORED_FIELDS, 0)
+    totals = dict.fromkeys(SCORED_FIELDS, 0)
+    used = set()
+    for ref in reference:
+        record = None
+        if VOTER_ID_FORMAT.fullmatch(ref['voter_id'].upper()):
+            record = by_id.get(ref['voter_id'])
+        if record is None or id(record) in used:
+            record = next((candidate for candidate in by_name.get(ref['name'], [])
+                           if id(candidate) not in used), None)
+        if record is None:
+            continue
+        used.add(id(record))
+        matched += 1
+        for field in SCORED_FIELDS:
+            if ref[field]:
+                totals[field] += 1
+                correct[field] += record[field] == ref[field]
+    recall = matched / len(reference) if reference else float('nan')
+    accuracy = {field: correct[field] / totals[field] if totals[field] else float('nan')
+                for field in SCORED_FIELDS}
+    return recall, accuracy
+
+
+def run_setting(args, dpi, color, box_scale):
+    """Extract the first args.pages pages at one setting, returning (pages, seconds, DataFrame)"""
+    extractor = VoterExtractor(args.pdf, poppler_path=args.poppler_path, ocr_mode=args.ocr_mode,
+                               ocr_backend=args.ocr_backend, ocr_strategy=args.ocr_strategy,
+                               dpi=dpi, color=color, box_scale=box_scale)
+    page_nums = range(min(args.pages, extractor.pages.page_count))
+    start_time = time.perf_counter()
+    frames = [df for _, df in extractor.iter_page_results(page_nums)]
+    elapsed = time.perf_counter() - start_time
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=SCORED_FIELDS)
+    return len(page_nums), elapsed, df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare extraction speed and accuracy across render DPI and color modes")
+    parser.add_argument("pdf", help="Booth roll PDF to extract")
+    parser.add_argument("--reference", required=True,
+                        help="Known-good voters of the same PDF: an extractor CSV, scored on the extracted "
+                             "pages by its page_num column, or any CSV covering exactly those pages")
+    parser.add_argument("--setting", dest="settings", action="append", type=parse_setting,
+                        help="DPI[:COLOR[:SCALE]] to run, repeatable "
+                             f"(default: {' '.join(DEFAULT_SETTINGS)})")
+    parser.add_argument("--pages", type=int, default=3, help="Pages extracted per setting (default: %(default)s)")
+    parser.add_argument("--ocr-mode", choices=OCR_MODES, default='box')
+    parser.add_argument("--ocr-backend", choices=BACKENDS, default='auto')
+    parser.add_argument("--ocr-strategy", choices=OCR_STRATEGIES, default='adaptive')
+    parser.add_argument("--tesseract-cmd", default=TESSERACT_CMD)
+    parser.add_argument("--poppler-path", default=POPPLER_PATH)
+    args = parser.parse_args()
+
+    pytesseract.pytesseract.tesseract_cmd = args.tesseract_cmd
+    settings = args.settings or [parse_setting(setting) for setting in DEFAULT_SETTINGS]
+    reference_df = pd.read_csv(args.reference, dtype=str)
+
+    rows = []
+    for dpi, color, box_scale in settings:
+        pages, elapsed, df = run_setting(args, dpi, color, box_scale)
+        reference = load_records(reference_for_pages(reference_df, pages))
+        recall, accuracy = score(reference, load_records(df))
+        rows.append((dpi, color, box_scale, pages, elapsed, len(df), recall, accuracy))
+
+    print(f"\n{len(reference)} reference voters on {pages} pages of {args.reference}, OCR mode {args.ocr_mode}")
+    print("Field accuracy is over the reference voters that were found (recall)")
+    print(f"{'dpi':>4} {'color':>5} {'scale':>5} {'pages/s':>8} {'voters':>6} {'recall':>7} "
+          + " ".join(f"{field:>12}" for field in SCORED_FIELDS))
+    for dpi, color, box_scale, pages, elapsed, voters, recall, accuracy in rows:
+        scale = box_scale or box_scale_for_dpi(dpi)
+        print(f"{dpi:>4} {color:>5} {scale:>5} {pages / elapsed:>8.2f} {voters:>6} {recall:>7.1%} "
+              + " ".join(f"{'-' if pd.isna(accuracy[field]) else f'{accuracy[field]:.1%}':>12}"
+                         for field in SCORED_FIELDS))
+
+
+if __name__ == "__main__":
+    main()
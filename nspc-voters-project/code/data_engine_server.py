@@ -1,23 +1,175 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, current_app, request, jsonify, send_file
+import atexit
+import json
+import os
+import uuid
+import pandas as pd
+import pytesseract
+from werkzeug.exceptions import RequestEntityTooLarge
+from extraction_jobs import JobManager
+from page_source import POPPLER_PATH
 
-app = Flask(__name__)
+bp = Blueprint('data_engine', __name__)
 
-@app.route('/api', methods=['POST'])
+# Booth rolls the server may read by path, nspc-voters-project/input
+INPUT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'input'))
+
+# Defaults, each overridable with an NSPC_ prefixed environment variable (e.g. NSPC_JOB_WORKERS=4)
+DEFAULT_CONFIG = {
+    'JOB_WORKERS': 2,                 # PDFs extracted at the same time
+    'JOB_OUTPUT_DIR': 'job_output',   # Per-job CSV results
+    'JOB_UPLOAD_DIR': 'job_uploads',  # Uploaded PDFs, removed when their job finishes
+    'JOB_PDF_ROOT': INPUT_DIR,        # pdf_path submissions must be inside this directory
+    'MAX_CONTENT_LENGTH': 50 * 1024 * 1024,  # Largest accepted upload, booth rolls are a few MB
+    'TESSERACT_CMD': None,            # tesseract executable, when it is not on PATH
+    'POPPLER_PATH': POPPLER_PATH,
+    'OCR_MODE': 'box',
+    'OCR_BACKEND': 'auto',
+    'OCR_STRATEGY': 'adaptive',
+    'OCR_CACHE': None,                # SQLite file of OCR results, reused when a PDF is extracted again
+    'DESKEW': False,                  # Straighten skewed scans before box detection
+    'RENDER_DPI': 300,
+    'RENDER_COLOR': 'rgb',            # rgb, gray or mono page renders
+    'BOX_SCALE': None,                # Voter box upscale factor, by default towards 600 DPI
+}
+
+
+def get_jobs():
+    return current_app.extensions['extraction_jobs']
+
+
+def resolve_pdf_path(pdf_path):
+    """Validate a server-side PDF path from a job submission, relative paths are under JOB_PDF_ROOT"""
+    root = os.path.realpath(current_app.config['JOB_PDF_ROOT'])
+    # Resolve symlinks and '..' first, so neither can lead out of JOB_PDF_ROOT
+    pdf_path = os.path.realpath(os.path.join(root, pdf_path))
+    if os.path.commonpath([root, pdf_path]) != root:
+        raise ValueError('pdf_path is outside the allowed directory')
+    if not pdf_path.lower().endswith('.pdf') or not os.path.isfile(pdf_path):
+        raise ValueError(f'No PDF file at {pdf_path}')
+    return pdf_path
+
+
+# Submit a booth PDF for extraction: a multipart upload in "pdf", or JSON {"pdf_path": ...}
+@bp.route('/api', methods=['POST'])
 def handle_request():
     try:
-        # Get JSON data from request
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No JSON data received'}), 400
-        
-        # Process data (Example: Echo back with a message)
-        response = {
-            'message': 'Received your request',
-            'received_data': data
-        }
-        return jsonify(response), 200
+        upload = request.files.get('pdf')
+        if upload is not None:
+            if not upload.filename.lower().endswith('.pdf'):
+                return jsonify({'error': 'Uploaded file must be a PDF'}), 400
+            upload_dir = current_app.config['JOB_UPLOAD_DIR']
+            os.makedirs(upload_dir, exist_ok=True)
+            pdf_path = os.path.join(upload_dir, f"{uuid.uuid4().hex}.pdf")
+            upload.save(pdf_path)
+            job = get_jobs().submit(pdf_path, source_name=os.path.basename(upload.filename), uploaded=True)
+        else:
+            # Get JSON data from request
+            data = request.get_json(silent=True)
+            if not data or not data.get('pdf_path'):
+                return jsonify({'error': 'Upload a PDF as "pdf" or send JSON with a pdf_path'}), 400
+            try:
+                pdf_path = resolve_pdf_path(data['pdf_path'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            job = get_jobs().submit(pdf_path)
+
+        # The job runs in the background, poll the status URL for progress
+        return jsonify({'job_id': job.job_id, 'status': job.status,
+                        'status_url': f"/api/jobs/{job.job_id}"}), 202
+    except RequestEntityTooLarge:
+        return jsonify({'error': f"Upload is larger than {current_app.config['MAX_CONTENT_LENGTH']} bytes"}), 413
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    jobs = get_jobs()
+    return jsonify({'jobs': [jobs.snapshot(job) for job in jobs.jobs()]}), 200
+
+
+@bp.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    jobs = get_jobs()
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(jobs.snapshot(job)), 200
+
+
+@bp.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    jobs = get_jobs()
+    if jobs.get(job_id) is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    if not jobs.cancel(job_id):
+        return jsonify({'error': 'Job has already started'}), 409
+    return jsonify(jobs.snapshot(jobs.get(job_id))), 200
+
+
+# Extracted voters of a finished job, as JSON records or ?format=csv
+@bp.route('/api/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    try:
+        jobs = get_jobs()
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown job'}), 404
+        if job.status != 'done':
+            return jsonify({'error': f'Job is {job.status}', **jobs.snapshot(job)}), 409
+
+        has_rows = os.path.exists(job.output_path)
+        if request.args.get('format') == 'csv':
+            if not has_rows:
+                return current_app.response_class('', mimetype='text/csv')
+            return send_file(os.path.abspath(job.output_path), mimetype='text/csv', as_attachment=True,
+                             download_name=f"{os.path.splitext(job.source_name)[0]}.csv")
+
+        # Read as text so house numbers like 08 keep their zeros; to_json writes missing values as null
+        records = json.loads(pd.read_csv(job.output_path, dtype=str).to_json(orient='records')) if has_rows else []
+        return jsonify({'job_id': job.job_id, 'source': job.source_name, 'count': len(records), 'data': records}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def create_app(config=None):
+    """Build the data engine API
+
+    Configuration is DEFAULT_CONFIG, then NSPC_* environment variables, then
+    config. Jobs live in this process, so serve it with a single worker
+    process: a second one using the same JOB_OUTPUT_DIR fails to start.
+    JOB_WORKERS sets how many PDFs are extracted in parallel.
+    """
+    app = Flask(__name__)
+    app.config.from_mapping(DEFAULT_CONFIG)
+    app.config.from_prefixed_env('NSPC')
+    if config:
+        app.config.from_mapping(config)
+
+    if app.config['TESSERACT_CMD']:
+        pytesseract.pytesseract.tesseract_cmd = app.config['TESSERACT_CMD']
+
+    jobs = JobManager(
+        workers=app.config['JOB_WORKERS'],
+        output_dir=app.config['JOB_OUTPUT_DIR'],
+        poppler_path=app.config['POPPLER_PATH'],
+        ocr_mode=app.config['OCR_MODE'],
+        ocr_backend=app.config['OCR_BACKEND'],
+        ocr_strategy=app.config['OCR_STRATEGY'],
+        ocr_cache=app.config['OCR_CACHE'],
+        deskew=app.config['DESKEW'],
+        dpi=app.config['RENDER_DPI'],
+        color=app.config['RENDER_COLOR'],
+        box_scale=app.config['BOX_SCALE'],
+    )
+    # Cancel queued jobs and let running ones finish when the server stops
+    atexit.register(jobs.close)
+    app.extensions['extraction_jobs'] = jobs
+
+    app.register_blueprint(bp)
+    return app
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    from serve import main
+    # Job state is per process, so one worker process with several request threads
+    main(default_app='data_engine_server:create_app', default_workers=1, max_workers=1)
\ No newline at end of file
@@ -0,0 +1,71 @@
+import atexit
+import os
+import queue
+import threading
+
+import cv2
+
+DEBUG_LEVELS = ('off', 'failures', 'full')
+
+
+class DebugWriter:
+    """Write debug images and text files on a background thread
+
+    Writes are queued on a bounded queue so OCR never waits on the disk.
+    When the queue is full the artifact is dropped and counted instead.
+    """
+
+    def __init__(self, folder, max_pending=256):
+        self.folder = folder
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="debug-writer", daemon=True)
+        self._thread.start()
+        # Daemon threads are killed at exit, so drain the queue first
+        atexit.register(self.close)
+
+    def write_image(self, relative_path, image):
+        self._put(('image', relative_path, image))
+
+    def write_text(self, relative_path, text):
+        self._put(('text', relative_path, text))
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                kind, relative_path, payload = item
+                path = os.path.join(self.folder, relative_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if kind == 'image':
+                    cv2.imwrite(path, payload)
+                else:
+                    with open(path, 'w') as f:
+                        f.write(payload)
+            except Exception as e:
+                print(f"Debug write failed for {item[1]}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued artifact is on disk"""
+        self._queue.join()
+        if self.dropped:
+            print(f"Dropped {self.dropped} debug artifacts (writer queue full)")
+            self.dropped = 0
+
+    def close(self):
+        if not self._thread.is_alive():
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        atexit.unregister(self.close)
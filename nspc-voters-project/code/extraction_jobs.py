@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from voter_extractor_v4 import VoterExtractor
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed', 'cancelled')
+FINISHED_STATUSES = ('done', 'failed', 'cancelled')
+# Held by the JobManager using an output directory
+LOCK_FILE = '.jobs.lock'
+
+
+def lock_output_dir(output_dir):
+    """Lock output_dir for this JobManager, returning the open lock file
+
+    Job state lives in one process, so a second process serving the same
+    jobs (e.g. another gunicorn worker) would answer 404 for them. The lock
+    is released when the file is closed or the process exits.
+    """
+    lock_file = open(os.path.join(output_dir, LOCK_FILE), 'w')
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        raise RuntimeError(f"Another process is running jobs in {output_dir}; "
+                           "serve the data engine with a single worker process")
+    return lock_file
+
+
+class ExtractionJob:
+    """One booth PDF queued for extraction, and its progress"""
+
+    def __init__(self, job_id, pdf_path, source_name, output_path, uploaded=False):
+        self.job_id = job_id
+        self.pdf_path = pdf_path
+        self.source_name = source_name
+        self.output_path = output_path
+        # Uploaded PDFs are temporary copies, deleted when the job finishes
+        self.uploaded = uploaded
+        self.status = 'queued'
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.pages_total = None
+        self.pages_done = 0
+        self.boxes_done = 0
+        self.future = None
+
+    def to_dict(self):
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0
+        throughput = {'pages_per_minute': None, 'boxes_per_second': None}
+        eta = None
+        if elapsed > 0 and self.pages_done:
+            throughput = {'pages_per_minute': round(self.pages_done / elapsed * 60, 2),
+                          'boxes_per_second': round(self.boxes_done / elapsed, 2)}
+            if self.status == 'running' and self.pages_total:
+                eta = round((self.pages_total - self.pages_done) * elapsed / self.pages_done, 1)
+        return {
+            'job_id': self.job_id,
+            'source': self.source_name,
+            'status': self.status,
+            'error': self.error,
+            'pages_total': self.pages_total,
+            'pages_done': self.pages_done,
+            'boxes_done': self.boxes_done,
+            'elapsed_seconds': round(elapsed, 1),
+            'eta_seconds': eta,
+            **throughput,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobManager:
+    """Run VoterExtractor jobs on a pool of background threads
+
+    Jobs are submitted and polled by id. Each page's rows are appended to
+    the job's CSV in output_dir as soon as the page is done, so memory does
+    not grow with the PDF. OCR runs in tesseract (a subprocess, or tesserocr
+    with the GIL released), so the worker threads extract in parallel.
+    Only one JobManager, in any process, can use an output_dir at a time.
+    """
+
+    def __init__(self, workers=2, output_dir='job_output', max_jobs_kept=1000, **extractor_options):
+        self.output_dir = output_dir
+        self.max_jobs_kept = max_jobs_kept
+        self.extractor_options = extractor_options
+        os.makedirs(output_dir, exist_ok=True)
+        self._lock_file = lock_output_dir(output_dir)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='extraction-job')
+
+    def submit(self, pdf_path, source_name=None, uploaded=False):
+        """Queue a PDF for extraction and return its job"""
+        job_id = uuid.uuid4().hex
+        job = ExtractionJob(job_id, pdf_path, source_name or os.path.basename(pdf_path),
+                            os.path.join(self.output_dir, f"{job_id}.csv"), uploaded=uploaded)
+        with self._lock:
+            self._jobs[job_id] = job
+            self._forget_finished()
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def snapshot(self, job):
+        """Consistent copy of a job's progress"""
+        with self._lock:
+            return job.to_dict()
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started yet; returns False once it is running"""
+        job = self.get(job_id)
+        if job is None or not job.future.cancel():
+            return False
+        with self._lock:
+            job.status = 'cancelled'
+            job.finished_at = time.time()
+        self._cleanup(job)
+        return True
+
+    def _forget_finished(self):
+        # Oldest finished jobs go first once more than max_jobs_kept are known
+        excess = len(self._jobs) - self.max_jobs_kept
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATUSES][:max(excess, 0)]:
+            job = self._jobs.pop(job_id)
+            if os.path.exists(job.output_path):
+                os.remove(job.output_path)
+
+    def _cleanup(self, job):
+        if job.uploaded and os.path.exists(job.pdf_path):
+            os.remove(job.pdf_path)
+
+    def _run(self, job):
+        with self._lock:
+            job.status = 'running'
+            job.started_at = time.time()
+        extractor = None
+        try:
+            extractor = VoterExtractor(job.pdf_path, **self.extractor_options)
+            page_count = extractor.pages.page_count
+            with self._lock:
+                job.pages_total = page_count
+
+            header = True
+            for page_num, df in extractor.iter_page_results():
+                # Cover and map pages have no voter boxes
+                if len(df):
+                    df.insert(0, 'source_pdf', job.source_name)
+                    df.to_csv(job.output_path, mode='w' if header else 'a', header=header, index=False)
+                    header = False
+                with self._lock:
+                    job.pages_done += 1
+                    job.boxes_done += len(df)
+            extractor.flush_debug()
+
+            with self._lock:
+                job.status = 'done'
+        except Exception as e:
+            with self._lock:
+                job.status = 'failed'
+                job.error = str(e)
+        finally:
+            # Each job has its own extractor, stop its debug writer thread with it
+            if extractor is not None and extractor.debug is not None:
+                extractor.debug.close()
+            with self._lock:
+                job.finished_at = time.time()
+            self._cleanup(job)
+
+    def close(self):
+        """Drop queued jobs and wait for the running ones to finish"""
+        with self._lock:
+            queued = [job for job in self._jobs.values() if job.status == 'queued']
+        for job in queued:
+            self.cancel(job.job_id)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._lock_file.close()
@@ -0,0 +1,255 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:  # tesserocr is optional, pytesseract is the fallback
+    tesserocr = None
+
+BACKENDS = ('auto', 'tesserocr', 'pytesseract')
+
+DATA_KEYS = ('level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+             'left', 'top', 'width', 'height', 'conf', 'text')
+
+
+class OcrText(str):
+    """OCR'd text that also carries its (word, confidence) pairs"""
+
+    def __new__(cls, text, words=()):
+        obj = super().__new__(cls, text)
+        obj.words = list(words)
+        return obj
+
+
+def words_to_text(words):
+    """Rebuild image_to_string style text from (block, par, line, word, conf) tuples"""
+    lines = {}
+    for block, par, line, text, conf in words:
+        lines.setdefault((block, par, line), []).append(text)
+
+    parts = []
+    previous_block = None
+    for (block, _, _), line_words in lines.items():
+        if previous_block is not None and block != previous_block:
+            parts.append('')
+        parts.append(' '.join(line_words))
+        previous_block = block
+
+    text = '\n'.join(parts) + '\n' if parts else ''
+    return OcrText(text, [(word, conf) for _, _, _, word, conf in words])
+
+
+def data_to_text(data):
+    """Turn an image_to_data result into OcrText, skipping empty entries"""
+    words = [
+        (data['block_num'][i], data['par_num'][i], data['line_num'][i], word, float(data['conf'][i]))
+        for i, word in enumerate(data['text'])
+        if word.strip()
+    ]
+    return words_to_text(words)
+
+
+class OcrBackend:
+    """Common interface for the OCR engines used by the extractors"""
+
+    name = None
+
+    def __init__(self, threads=1):
+        self.threads = threads
+        self._pool = None
+
+    def version(self):
+        """Engine version string, part of every OCR cache key"""
+        raise NotImplementedError
+
+    def image_to_string(self, image, config=''):
+        raise NotImplementedError
+
+    def image_to_data(self, image, config=''):
+        """Word-level results as a dict of lists (pytesseract Output.DICT layout)"""
+        raise NotImplementedError
+
+    def image_to_text(self, image, config=''):
+        """Text plus word confidences, from a single image_to_data call"""
+        return data_to_text(self.image_to_data(image, config))
+
+    def _map(self, function, images, config):
+        if self.threads <= 1 or len(images) < 2:
+            return [function(image, config) for image in images]
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="ocr")
+        return list(self._pool.map(lambda image: function(image, config), images))
+
+    def map_image_to_string(self, images, config=''):
+        """OCR several images, using the persistent thread pool when threads > 1"""
+        return self._map(self.image_to_string, images, config)
+
+    def map_image_to_text(self, images, config=''):
+        """image_to_text over several images, on the thread pool when threads > 1"""
+        return self._map(self.image_to_text, images, config)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class PytesseractBackend(OcrBackend):
+    """Runs the tesseract binary once per call through pytesseract"""
+
+    name = 'pytesseract'
+
+    def version(self):
+        return str(pytesseract.get_tesseract_version())
+
+    def image_to_string(self, image, config=''):
+        return pytesseract.image_to_string(image, config=config)
+
+    def image_to_data(self, image, config=''):
+        return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+
+
+def parse_config(config):
+    """Split a tesseract CLI config string into (oem, psm, variables)"""
+    oem_match = re.search(r'--oem\s+(\d+)', config)
+    psm_match = re.search(r'--psm\s+(\d+)', config)
+    variables = dict(re.findall(r'-c\s+(\w+)=(\S+)', config))
+    oem = int(oem_match.group(1)) if oem_match else 3
+    psm = int(psm_match.group(1)) if psm_match else 3
+    return oem, psm, variables
+
+
+class TesserocrBackend(OcrBackend):
+    """In-process tesseract through tesserocr
+
+    Each thread keeps one initialized API handle per config, so the
+    language model is loaded once per thread instead of once per call and
+    images are passed as raw pixel buffers with no temp files.
+    """
+
+    name = 'tesserocr'
+
+    def __init__(self, threads=1, lang='eng', tessdata_path=None):
+        if tesserocr is None:
+            raise ImportError("tesserocr is not installed")
+        super().__init__(threads=threads)
+        self.lang = lang
+        self.tessdata_path = tessdata_path
+        self._local = threading.local()
+        self._apis = []
+        self._apis_lock = threading.Lock()
+
+    def version(self):
+        return tesserocr.tesseract_version().strip()
+
+    def _get_api(self, config):
+        oem, psm, variables = parse_config(config)
+        apis = getattr(self._local, 'apis', None)
+        if apis is None:
+            apis = self._local.apis = {}
+
+        key = (oem, psm, tuple(sorted(variables.items())))
+        api = apis.get(key)
+        if api is None:
+            kwargs = {'lang': self.lang, 'psm': psm, 'oem': oem}
+            if self.tessdata_path:
+                kwargs['path'] = self.tessdata_path
+            api = tesserocr.PyTessBaseAPI(**kwargs)
+            for name, value in variables.items():
+                api.SetVariable(name, value)
+            apis[key] = api
+            with self._apis_lock:
+                self._apis.append(api)
+        return api
+
+    def _set_image(self, api, image):
+        if isinstance(image, Image.Image):
+            api.SetImage(image)
+            return
+
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+        api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+
+    def image_to_string(self, image, config=''):
+        api = self._get_api(config)
+        self._set_image(api, image)
+        return api.GetUTF8Text()
+
+    def image_to_data(self, image, config=''):
+        api = self._get_api(config)
+        self._set_image(api, image)
+        api.Recognize()
+
+        data = {key: [] for key in DATA_KEYS}
+        iterator = api.GetIterator()
+        if iterator is None:
+            return data
+
+        level = tesserocr.RIL.WORD
+        block = par = line = word = 0
+        for result in tesserocr.iterate_level(iterator, level):
+            if result.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                block, par, line, word = block + 1, 0, 0, 0
+            if result.IsAtBeginningOf(tesserocr.RIL.PARA):
+                par, line, word = par + 1, 0, 0
+            if result.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                line, word = line + 1, 0
+            word += 1
+
+            box = result.BoundingBox(level)
+            if box is None:
+                continue
+            left, top, right, bottom = box
+            for key, value in zip(DATA_KEYS, (5, 1, block, par, line, word, left, top,
+                                              right - left, bottom - top,
+                                              result.Confidence(level),
+                                              result.GetUTF8Text(level) or '')):
+                data[key].append(value)
+        return data
+
+    def close(self):
+        super().close()
+        with self._apis_lock:
+            for api in self._apis:
+                api.End()
+            self._apis = []
+
+
+def create_backend(name='auto', threads=1, **kwargs):
+    """Build an OCR backend, falling back to pytesseract when tesserocr is missing"""
+    if name not in BACKENDS:
+        raise ValueError(f"OCR backend must be one of {BACKENDS}, got {name!r}")
+
+    if name == 'tesserocr' or (name == 'auto' and tesserocr is not None):
+        return TesserocrBackend(threads=threads, **kwargs)
+    return PytesseractBackend(threads=threads)
+
+
+# One backend per process, so every extractor in a worker shares its engine handles
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name='auto', threads=1, cache_path=None):
+    """Return this process's shared backend, creating it on first use
+
+    With cache_path, results are read from and saved to that on-disk OCR cache.
+    """
+    with _backends_lock:
+        backend = _backends.get((name, threads, cache_path))
+        if backend is None:
+            backend = create_backend(name, threads=threads)
+            if cache_path is not None:
+                # ocr_cache builds on this module
+                from ocr_cache import CachedBackend, OcrCache
+                backend = CachedBackend(backend, OcrCache(cache_path))
+            _backends[(name, threads, cache_path)] = backend
+        return backend
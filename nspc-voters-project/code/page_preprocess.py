@@ -0,0 +1,150 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+# Gray level above which a pixel counts as paper, the same cut prepare_voter_box has always used
+BINARY_THRESHOLD = 200
+# Voter boxes are OCR'd at twice the render resolution
+BOX_SCALE = 2
+# The resolution boxes are upscaled towards, 2x at the default 300 DPI render
+BOX_OCR_DPI = 600
+# Rotations smaller than this are left alone, larger ones are more likely a bad estimate than real skew
+MIN_SKEW_DEGREES = 0.1
+MAX_SKEW_DEGREES = 5
+# Skew is estimated on every SKEW_SAMPLE-th pixel, plenty for a 300 DPI page
+SKEW_SAMPLE = 4
+
+
+def binarize_page(gray):
+    """Threshold a grayscale page in place and return it"""
+    cv2.threshold(gray, BINARY_THRESHOLD, 255, cv2.THRESH_BINARY, dst=gray)
+    return gray
+
+
+def estimate_skew(gray):
+    """Page rotation in degrees from the minimum-area rectangle around its ink, 0 if negligible"""
+    sample = gray[::SKEW_SAMPLE, ::SKEW_SAMPLE]
+    points = cv2.findNonZero((sample < BINARY_THRESHOLD).view(np.uint8))
+    if points is None:
+        return 0.0
+    angle = cv2.minAreaRect(points)[-1]
+    # OpenCV reports the rectangle's angle in (0, 90] or, before 4.5.1 and since 5, [-90, 0);
+    # fold either into (-45, 45]
+    if angle > 45:
+        angle -= 90
+    elif angle <= -45:
+        angle += 90
+    if not MIN_SKEW_DEGREES <= abs(angle) <= MAX_SKEW_DEGREES:
+        return 0.0
+    return angle
+
+
+def box_scale_for_dpi(dpi):
+    """Whole-number box upscale that brings a render at dpi closest to BOX_OCR_DPI, at least 1"""
+    return max(1, round(BOX_OCR_DPI / dpi))
+
+
+def rotate_page(image, angle):
+    """Rotate a page about its centre, filling the exposed corners with white"""
+    height, width = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=(255, 255, 255))
+
+
+class BoxBuffer:
+    """One reusable allocation that holds every resized voter box of a page
+
+    views() carves it into a contiguous array per box, growing it only when
+    a page needs more room than any page before. Views from the previous
+    call are overwritten, so anything kept past the page must be copied.
+    """
+
+    def __init__(self):
+        self._buffer = np.empty(0, dtype=np.uint8)
+
+    def views(self, shapes):
+        total = sum(height * width for height, width in shapes)
+        if self._buffer.size < total:
+            self._buffer = np.empty(total, dtype=np.uint8)
+        views = []
+        offset = 0
+        for height, width in shapes:
+            views.append(self._buffer[offset:offset + height * width].reshape(height, width))
+            offset += height * width
+        return views
+
+
+def resize_boxes(binary, boxes, buffer, scale=BOX_SCALE):
+    """Upscale each (x, y, w, h) box of a binarized page into buffer, returning the resized boxes
+
+    At scale 1 the boxes are returned as views into the page, without a resize or copy.
+    """
+    if scale == 1:
+        return [binary[y:y + h, x:x + w] for x, y, w, h in boxes]
+    outputs = buffer.views([(h * scale, w * scale) for x, y, w, h in boxes])
+    for (x, y, w, h), out in zip(boxes, outputs):
+        # The crop is a view into the page, cv2 writes straight into the buffer
+        cv2.resize(binary[y:y + h, x:x + w], (w * scale, h * scale), dst=out, interpolation=cv2.INTER_CUBIC)
+    return outputs
+
+
+def synthetic_page(boxes=30, seed=0):
+    """A BGR page of ruled voter cards with random ink, and the card boxes, at 300 DPI"""
+    rng = np.random.default_rng(seed)
+    page = np.full((3508, 2480, 3), 255, dtype=np.uint8)
+    card_boxes = []
+    for i in range(boxes):
+        x, y = 80 + (i % 3) * 780, 300 + (i // 3) * 300
+        card_boxes.append((x, y, 760, 280))
+        cv2.rectangle(page, (x, y), (x + 760, y + 280), (0, 0, 0), 3)
+        for _ in range(40):
+            tx, ty = x + int(rng.integers(10, 700)), y + int(rng.integers(20, 260))
+            cv2.putText(page, "Name", (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (40, 40, 40), 2)
+    return page, card_boxes
+
+
+def preprocess_per_box(page, boxes):
+    """The original per-box path: crop, gray, threshold and resize each box on its own"""
+    resized = []
+    for x, y, w, h in boxes:
+        gray = cv2.cvtColor(page[y:y + h, x:x + w], cv2.COLOR_BGR2GRAY)
+        _, binary = cv2.threshold(gray, BINARY_THRESHOLD, 255, cv2.THRESH_BINARY)
+        resized.append(cv2.resize(binary, None, fx=BOX_SCALE, fy=BOX_SCALE, interpolation=cv2.INTER_CUBIC))
+    return resized
+
+
+def preprocess_page(page, boxes, buffer):
+    """The page path: one gray conversion and threshold, boxes resized into buffer"""
+    binary = binarize_page(cv2.cvtColor(page, cv2.COLOR_BGR2GRAY))
+    return resize_boxes(binary, boxes, buffer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark per-box vs whole-page box preprocessing")
+    parser.add_argument("-n", "--repeat", type=int, default=20, help="Pages preprocessed per path (default: %(default)s)")
+    args = parser.parse_args()
+
+    page, boxes = synthetic_page()
+    buffer = BoxBuffer()
+    per_box = preprocess_per_box(page, boxes)
+    per_page = preprocess_page(page, boxes, buffer)
+    identical = all(np.array_equal(a, b) for a, b in zip(per_box, per_page))
+    print(f"{len(boxes)} boxes per page, outputs identical: {identical}")
+
+    # The extractor already has the gray page from box detection, the last row leaves that conversion out
+    gray = cv2.cvtColor(page, cv2.COLOR_BGR2GRAY)
+    for name, run in (("per box", lambda: preprocess_per_box(page, boxes)),
+                      ("per page", lambda: preprocess_page(page, boxes, buffer)),
+                      ("per page, gray reused", lambda: resize_boxes(binarize_page(gray), boxes, buffer))):
+        start_time = time.perf_counter()
+        for _ in range(args.repeat):
+            run()
+        elapsed = (time.perf_counter() - start_time) / args.repeat
+        print(f"{name}: {elapsed * 1000:.1f} ms per page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import pytesseract
+
+from page_source import PdfPageSource, POPPLER_PATH, COLOR_MODES
+from ocr_backend import BACKENDS
+from debug_writer import DEBUG_LEVELS
+from voter_extractor_v4 import VoterExtractor, OCR_MODES, OCR_STRATEGIES
+
+TESSERACT_CMD = "C:\\Program Files\\Tesseract-OCR\\tesseract.exe"
+INPUT_DIR = os.path.join("..", "input", "Anakapalli", "Narsipatnam")
+
+# Per-process state, set up by _init_worker in every pool worker
+_extractor_options = {}
+_extractor = None
+
+
+def _init_worker(tesseract_cmd, extractor_options):
+    """Configure OCR tools once per worker process"""
+    global _extractor_options
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    _extractor_options = extractor_options
+    # One tesseract thread per worker, the pool already uses every core
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _get_extractor(pdf_path):
+    """Return this worker's extractor for a PDF
+
+    A worker holds one extractor at a time, replaced when a page of another
+    PDF comes in. Pages are queued PDF by PDF, so that is rare, and worker
+    memory stays flat however many booths a run covers.
+    """
+    global _extractor
+    previous = _extractor
+    if previous is None or previous.pdf_path != pdf_path:
+        _extractor = VoterExtractor(pdf_path, **_extractor_options)
+        if previous is not None:
+            # One box buffer per process, grown to the largest page seen
+            _extractor.box_buffer = previous.box_buffer
+            if previous.debug is not None:
+                previous.debug.close()
+    return _extractor
+
+
+def _extract_page(pdf_path, page_num):
+    """Worker task: render and process a single page of a PDF"""
+    extractor = _get_extractor(pdf_path)
+    df = extractor.process_page(page_num, image=extractor.load_page_image(page_num, cache=False))
+    # Worker processes exit without waiting on daemon threads
+    extractor.flush_debug()
+    return pdf_path, page_num, df
+
+
+def find_pdfs(paths):
+    """Expand files and directories into a sorted list of PDF paths"""
+    pdfs = []
+    for path in paths:
+        if os.path.isdir(path):
+            pdfs.extend(glob.glob(os.path.join(path, "*.pdf")))
+        else:
+            pdfs.append(path)
+    return sorted(set(pdfs))
+
+
+def extract_parallel(pdf_paths, workers=None, tesseract_cmd=TESSERACT_CMD, poppler_path=POPPLER_PATH,
+                     **extractor_options):
+    """Extract every page of every PDF on a process pool and merge the results
+
+    extractor_options (ocr_mode, ocr_strategy, dpi, ...) are passed to every VoterExtractor.
+    """
+    # Page counts come from PDF metadata, so building the task list is cheap
+    tasks = []
+    for pdf_path in pdf_paths:
+        page_count = PdfPageSource(pdf_path, poppler_path=poppler_path).page_count
+        tasks.extend((pdf_path, page_num) for page_num in range(page_count))
+
+    print(f"Queued {len(tasks)} pages from {len(pdf_paths)} PDFs")
+
+    results = {}
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(tesseract_cmd, dict(extractor_options, poppler_path=poppler_path))) as executor:
+        futures = [executor.submit(_extract_page, pdf_path, page_num) for pdf_path, page_num in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            pdf_path, page_num, df = future.result()
+            results[(pdf_path, page_num)] = df
+            print(f"[{done}/{len(tasks)}] {os.path.basename(pdf_path)} page {page_num + 1}: "
+                  f"{len(df)} voters ({time.time() - start_time:.1f}s elapsed)")
+
+    # Merge in (pdf, page) order so the output does not depend on completion order
+    frames = []
+    for pdf_path, page_num in tasks:
+        df = results[(pdf_path, page_num)]
+        df.insert(0, 'source_pdf', os.path.basename(pdf_path))
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract voter data from booth PDFs in parallel")
+    parser.add_argument("paths", nargs="*", default=[INPUT_DIR],
+                        help="PDF files or directories of PDFs (default: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+                        help="Number of worker processes (default: %(default)s)")
+    parser.add_argument("-o", "--output", default="voter_data_all.csv",
+                        help="Combined CSV output path (default: %(default)s)")
+    parser.add_argument("--ocr-mode", choices=OCR_MODES, default='box',
+                        help="'batch' OCRs all boxes of a page in one mosaic, 'page' OCRs the whole page once "
+                             "and only re-reads failed boxes (default: %(default)s)")
+    parser.add_argument("--ocr-strategy", choices=OCR_STRATEGIES, default='adaptive',
+                        help="'adaptive' only re-OCRs boxes with missing or low-confidence fields "
+                             "(default: %(default)s)")
+    parser.add_argument("--ocr-backend", choices=BACKENDS, default='auto',
+                        help="'auto' uses in-process tesserocr when installed (default: %(default)s)")
+    parser.add_argument("--ocr-cache", metavar="PATH",
+                        help="SQLite file of OCR results reused across runs, e.g. ocr_cache.sqlite")
+    parser.add_argument("--deskew", action="store_true", help="Straighten skewed scans before box detection")
+    parser.add_argument("--dpi", type=int, default=300, help="Page render resolution (default: %(default)s)")
+    parser.add_argument("--color", choices=COLOR_MODES, default='rgb',
+                        help="Render pages in color, or single-channel gray/mono (default: %(default)s)")
+    parser.add_argument("--box-scale", type=int,
+                        help="Upscale factor for voter boxes (default: towards 600 DPI, 2 at --dpi 300)")
+    parser.add_argument("--debug-level", choices=DEBUG_LEVELS, default='off',
+                        help="Debug images/text to write under debug_images/ (default: %(default)s)")
+    parser.add_argument("--tesseract-cmd", default=TESSERACT_CMD)
+    parser.add_argument("--poppler-path", default=POPPLER_PATH)
+    args = parser.parse_args()
+
+    pdf_paths = find_pdfs(args.paths)
+    if not pdf_paths:
+        parser.error("No PDF files found")
+
+    start_time = time.time()
+    df = extract_parallel(pdf_paths, workers=args.workers,
+                          tesseract_cmd=args.tesseract_cmd, poppler_path=args.poppler_path,
+                          ocr_mode=args.ocr_mode, ocr_backend=args.ocr_backend,
+                          debug_level=args.debug_level, ocr_strategy=args.ocr_strategy,
+                          ocr_cache=args.ocr_cache, deskew=args.deskew,
+                          dpi=args.dpi, color=args.color, box_scale=args.box_scale)
+    df.to_csv(args.output, index=False)
+
+    print(f"\nSaved {len(df)} records to {args.output}", f"Time Taken {time.time() - start_time}")
+
+
+if __name__ == "__main__":
+    main()
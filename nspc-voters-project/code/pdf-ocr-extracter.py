@@ -1,6 +1,10 @@
 from pdf2image import convert_from_path
 import pytesseract
+import argparse
 import os
+import random
+import time
+from ocr_backend import get_backend
 
 import re
 import pandas as pd
@@ -8,20 +12,30 @@ import pandas as pd
 pytesseract.pytesseract.tesseract_cmd = "C:\\Program Files\\Tesseract-OCR\\tesseract.exe" 
 pdf_path = "D:\\Projects\\nspc-voters-project\\input\\Anakapalli\\Narsipatnam\\booth_79.pdf"  # Update with your file path
 
+# Each voter block starts after a 'Name' label at the start of a line
+NAME_LABEL_PATTERN = re.compile(r"\n\s*(?:Name\s*[:=+\s]+)", re.IGNORECASE)
+VOTER_CODE_PATTERN = re.compile(r"\b([A-Z0-9]{10})\b")
+HOUSE_PATTERN = re.compile(r"House Number\s*[:=]\s*(.+?)(?:\n|$)", re.IGNORECASE)
+RELATIVE_PATTERN = re.compile(r"(Husbands Name|Fathers Name|Mothers Name|Others)[:=]\s*(.+?)(?:\n|$)", re.IGNORECASE)
+AGE_PATTERN = re.compile(r"Age\s*[:=+\s]*?(\d+)", re.IGNORECASE)
+GENDER_PATTERN = re.compile(r"Gender\s*[:=+\s]*?(Male|Female)", re.IGNORECASE)
+
 
 def ocr_extract_text(pdf_path):
     # Convert PDF pages to images
     pages = convert_from_path(pdf_path, dpi=300, poppler_path= "C:\\Users\\chsat\\Documents\\poppler-24.08.0\\Library\\bin")
     # print(pages)
     extracted_pages_text = []
+    # In-process engine when tesserocr is available, pytesseract otherwise
+    ocr = get_backend()
     
     for i, page_img in enumerate(pages[2:3]):
-        text = pytesseract.image_to_string(page_img)
+        text = ocr.image_to_string(page_img)
         extracted_pages_text.append(text)
         
         # Optional: Save each page image for verification
         page_img.save(f"page_{i+1}.png", "PNG")
-    
+
     return extracted_pages_text
 
 def save_ocr_output(ocr_text_list, output_dir="ocr_text_output"):
@@ -31,68 +45,118 @@ def save_ocr_output(ocr_text_list, output_dir="ocr_text_output"):
     for i, page_text in enumerate(ocr_text_list, start=1):
         with open(os.path.join(output_dir, f"page_{i}.txt"), "w", encoding="utf-8") as f:
             f.write(page_text)
-    
-    print(f"Saved {len(ocr_text_list)} pages of OCR output in folder: {output_dir}")
-
-
-
-
 
+    print(f"Saved {len(ocr_text_list)} pages of OCR output in folder: {output_dir}")
 
-ocr_pages_text = ocr_extract_text(pdf_path)
-save_ocr_output(ocr_pages_text)
-
-# Load text
-with open("ocr_text_output\\page_1.txt", "r", encoding="utf-8") as f:
-    text = f.read()
-
-# Phase 1: Split into blocks by 'Name' occurrences
-blocks = re.split(r"\n\s*(?:Name\s*[:=+\s]+)", text, flags=re.IGNORECASE)[1:]  # skip the first split part
-
-# Extract all voter codes beforehand
-codes = re.findall(r"\b([A-Z0-9]{10})\b", text)
-
-data = []
-
-for block in blocks:
-    block = block.strip()
 
-    # Phase 2: extract fields from each block
-    name = block.split('\n')[0].strip()  # first line after "Name" is the name
-    house_match = re.search(r"House Number\s*[:=]\s*(.+?)(?:\n|$)", block, re.IGNORECASE)
+def parse_block(block):
+    """Fields of one voter block, the text after its 'Name' label"""
+    name = block.split('\n', 1)[0].strip()  # first line after "Name" is the name
+    house_match = HOUSE_PATTERN.search(block)
     house = house_match.group(1).replace("\n", " ").strip() if house_match else ""
 
     # Relative name: try all options
-    relative_match = re.search(
-        r"(Husbands Name|Fathers Name|Mothers Name|Others)[:=]\s*(.+?)(?:\n|$)", block, re.IGNORECASE)
+    relative_match = RELATIVE_PATTERN.search(block)
     relative = relative_match.group(2).strip() if relative_match else ""
 
-    age_match = re.search(r"Age\s*[:=+\s]*?(\d+)", block, re.IGNORECASE)
+    age_match = AGE_PATTERN.search(block)
     age = age_match.group(1) if age_match else ""
 
-    gender_match = re.search(r"Gender\s*[:=+\s]*?(Male|Female)", block, re.IGNORECASE)
+    gender_match = GENDER_PATTERN.search(block)
     gender = gender_match.group(1) if gender_match else ""
 
-    # Find the nearest voter code after this block in the full text
-    block_pos = text.find(block)
-    nearest_code = None
-    for code in codes:
-        code_pos = text.find(code, block_pos)
-        if code_pos > block_pos:
-            nearest_code = code
-            break
-
-    data.append({
+    return {
         "Name": name,
         "House Number": house,
         "Relative Name": relative,
         "Age": age,
         "Gender": gender,
-        "VoterID": nearest_code if nearest_code else ""
-    })
-
-# Save to CSV
-df = pd.DataFrame(data)
-df.to_csv("D:\\Projects\\nspc-voters-project\\parsed_voters_robust.csv", index=False)
-print(f"Extracted {len(df)} records.")
-
+    }
+
+
+def parse_page_text(text):
+    """Parse every voter block of a page's OCR text
+
+    Block and voter code offsets are found in one pass each, then every
+    block is paired with the first code after its start by walking both
+    lists together, so the page is scanned a fixed number of times
+    whatever its size. Offsets come from the matches themselves, so
+    repeated names no longer pick up an earlier block's code.
+    """
+    labels = list(NAME_LABEL_PATTERN.finditer(text))
+    codes = [(match.start(1), match.group(1)) for match in VOTER_CODE_PATTERN.finditer(text)]
+
+    data = []
+    code_index = 0
+    for i, label in enumerate(labels):
+        end = labels[i + 1].start() if i + 1 < len(labels) else len(text)
+        raw_block = text[label.end():end]
+        block = raw_block.strip()
+        block_pos = label.end() + len(raw_block) - len(raw_block.lstrip())
+
+        # Blocks come in text order, so the code pointer only moves forward
+        while code_index < len(codes) and codes[code_index][0] <= block_pos:
+            code_index += 1
+        nearest_code = codes[code_index][1] if code_index < len(codes) else ""
+
+        data.append({**parse_block(block), "VoterID": nearest_code})
+    return data
+
+
+def synthetic_page_text(voters, seed=0):
+    """OCR-like text for a run of voters, laid out like ocr_text_output/page_1.txt"""
+    rng = random.Random(seed)
+    names = ["Nagamani Gavireddy", "Ravana Gavireddy", "RAMU SURLA", "PALIMALA VARAHALABABU"]
+    parts = []
+    for i in range(voters):
+        relation = rng.choice(["Husbands Name", "Fathers Name", "Mothers Name"])
+        parts.append(
+            f"\nName : {rng.choice(names)}\n{relation}: {rng.choice(names)}\nHouse Number : {i // 4 + 1}-{i % 9}\n\n"
+            f"Age: {rng.randint(18, 99)} Gender: {rng.choice(['MALE', 'FEMALE'])}\n\n"
+            f"AEX{i:07d}\n\nPhoto is\nAvailable\n")
+    return "Assembly Constituency No and Name : 34-Narsipatnam\n" + "".join(parts)
+
+
+def benchmark(sizes=(1000, 2000, 4000, 8000)):
+    """Time parse_page_text on synthetic pages of increasing size"""
+    for voters in sizes:
+        text = synthetic_page_text(voters)
+        start_time = time.perf_counter()
+        data = parse_page_text(text)
+        elapsed = time.perf_counter() - start_time
+        # Every block's own ID follows it in the synthetic layout
+        correct = sum(1 for i, row in enumerate(data) if row["VoterID"] == f"AEX{i:07d}")
+        print(f"{voters} voters ({len(text) / 1e6:.2f} MB): {elapsed:.3f}s, "
+              f"{elapsed / voters * 1e6:.1f} us per voter, {correct} of {len(data)} IDs matched")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR a booth PDF page and parse its voters from the raw text")
+    parser.add_argument("--text", help="Parse an existing OCR text file instead of running OCR")
+    parser.add_argument("--output", default="D:\\Projects\\nspc-voters-project\\parsed_voters_robust.csv")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Time the page parser on synthetic pages of 1000 to 8000 voters")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+        return
+
+    text_path = args.text
+    if text_path is None:
+        ocr_pages_text = ocr_extract_text(pdf_path)
+        save_ocr_output(ocr_pages_text)
+        text_path = os.path.join("ocr_text_output", "page_1.txt")
+
+    # Load text
+    with open(text_path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    # Save to CSV
+    df = pd.DataFrame(parse_page_text(text))
+    df.to_csv(args.output, index=False)
+    print(f"Extracted {len(df)} records.")
+
+
+if __name__ == "__main__":
+    main()
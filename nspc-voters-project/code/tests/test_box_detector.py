@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+import pytest
+
+from box_detector import _dedupe_nested, detect_voter_boxes, sort_reading_order
+from page_preprocess import synthetic_page
+
+
+def gray_page(page):
+    return cv2.cvtColor(page, cv2.COLOR_BGR2GRAY)
+
+
+def assert_near(found, expected, slack=10):
+    assert len(found) == len(expected)
+    for box, card in zip(found, expected):
+        assert all(abs(a - b) <= slack for a, b in zip(box, card)), (box, card)
+
+
+def test_synthetic_page_cards_in_reading_order():
+    page, cards = synthetic_page()
+    boxes, stats = detect_voter_boxes(gray_page(page))
+    assert_near(boxes, cards)
+    assert stats['method'] == 'grid'
+    # Each ruled card has an outer and inner outline, one of them is dropped
+    assert stats['rejected_nested'] == len(cards)
+    assert stats['rejected'] == stats['candidates'] - len(boxes)
+
+
+def test_limits_scale_with_dpi():
+    page, cards = synthetic_page(boxes=6)
+    half = cv2.resize(gray_page(page), None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+    boxes, _ = detect_voter_boxes(half, dpi=150)
+    assert_near(boxes, [tuple(v // 2 for v in card) for card in cards], slack=6)
+
+
+def test_section_frame_and_bad_shapes_are_rejected():
+    page, cards = synthetic_page(boxes=3)
+    # A frame around the whole row of cards, a square and a box too small to be a card
+    cv2.rectangle(page, (40, 260), (2440, 620), (0, 0, 0), 3)
+    cv2.rectangle(page, (100, 1000), (500, 1400), (0, 0, 0), 3)
+    cv2.rectangle(page, (100, 2000), (400, 2100), (0, 0, 0), 3)
+    boxes, stats = detect_voter_boxes(gray_page(page))
+    assert_near(boxes, cards)
+    assert stats['rejected_aspect'] >= 1
+    assert stats['rejected_size'] >= 1
+
+
+def test_blank_page_has_no_boxes():
+    boxes, stats = detect_voter_boxes(np.full((3508, 2480), 255, dtype=np.uint8))
+    assert boxes == []
+    assert stats['method'] == 'contours'
+
+
+@pytest.mark.parametrize('boxes, expected', [
+    # Same card outlined twice, the outer outline is kept
+    ([(0, 0, 700, 280), (4, 4, 692, 272)], [(0, 0, 700, 280)]),
+    # Frame enclosing two smaller cards
+    ([(0, 0, 1500, 300), (10, 10, 700, 280), (760, 10, 700, 280)], [(10, 10, 700, 280), (760, 10, 700, 280)]),
+])
+def test_dedupe_nested(boxes, expected):
+    assert sorted(_dedupe_nested(boxes)) == sorted(expected)
+
+
+def test_sort_reading_order_tolerates_skew():
+    boxes = [(800, 305, 700, 280), (0, 600, 700, 280), (0, 300, 700, 280), (800, 590, 700, 280)]
+    assert sort_reading_order(boxes) == [(0, 300, 700, 280), (800, 305, 700, 280),
+                                         (0, 600, 700, 280), (800, 590, 700, 280)]
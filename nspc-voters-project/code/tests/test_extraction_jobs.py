@@ -0,0 +1,81 @@
+import types
+
+import pandas as pd
+import pytest
+
+import extraction_jobs
+import serve
+from extraction_jobs import JobManager
+
+
+class FakeDebugWriter:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeExtractor:
+    """Two pages of one voter each, or a failure on the second page"""
+    instances = []
+
+    def __init__(self, pdf_path, **options):
+        self.pdf_path = pdf_path
+        self.pages = types.SimpleNamespace(page_count=2)
+        self.debug = FakeDebugWriter()
+        FakeExtractor.instances.append(self)
+
+    def iter_page_results(self):
+        yield 0, pd.DataFrame([{'voter_id': 'AEX1'}])
+        if 'broken' in self.pdf_path:
+            raise ValueError('page 2 is unreadable')
+        yield 1, pd.DataFrame([{'voter_id': 'AEX2'}])
+
+    def flush_debug(self):
+        pass
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    FakeExtractor.instances = []
+    monkeypatch.setattr(extraction_jobs, 'VoterExtractor', FakeExtractor)
+    manager = JobManager(workers=1, output_dir=str(tmp_path / 'out'))
+    yield manager
+    manager.close()
+
+
+def test_job_writes_csv_and_closes_its_debug_writer(jobs):
+    job = jobs.submit('booth.pdf')
+    job.future.result()
+    snapshot = jobs.snapshot(job)
+    assert (snapshot['status'], snapshot['pages_done'], snapshot['boxes_done']) == ('done', 2, 2)
+    assert list(pd.read_csv(job.output_path)['voter_id']) == ['AEX1', 'AEX2']
+    assert FakeExtractor.instances[0].debug.closed
+
+
+def test_failed_job_still_closes_its_debug_writer(jobs):
+    job = jobs.submit('broken.pdf')
+    job.future.result()
+    assert jobs.snapshot(job)['status'] == 'failed'
+    assert jobs.snapshot(job)['error'] == 'page 2 is unreadable'
+    assert FakeExtractor.instances[0].debug.closed
+
+
+def test_second_manager_on_the_same_output_dir_is_refused(jobs, tmp_path):
+    with pytest.raises(RuntimeError):
+        JobManager(workers=1, output_dir=str(tmp_path / 'out'))
+    # A different directory is fine
+    JobManager(workers=1, output_dir=str(tmp_path / 'other')).close()
+
+
+def test_output_dir_is_unlocked_on_close(tmp_path):
+    JobManager(workers=1, output_dir=str(tmp_path)).close()
+    JobManager(workers=1, output_dir=str(tmp_path)).close()
+
+
+def test_serve_refuses_more_workers_than_the_app_allows(monkeypatch):
+    monkeypatch.setattr(serve, 'serve_gunicorn', lambda *args: pytest.fail('server started'))
+    monkeypatch.setattr(serve, 'serve_threaded', lambda *args: pytest.fail('server started'))
+    with pytest.raises(SystemExit):
+        serve.main(['--workers', '2'], default_app='data_engine_server:create_app', default_workers=1, max_workers=1)
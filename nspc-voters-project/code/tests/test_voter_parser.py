@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from voter_parser import (FIELDS, find_voter_id, parse_voter_fields, parse_voter_text, scan_text,
+                          split_voter_blocks)
+
+SAMPLE_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'ocr_text_output', 'page_1.txt')
+
+BOX_TEXT = """AEX1778737
+Name : Lakshmi Devi
+Husband's Name: Ramu Photo
+House Number : 1-23
+Flat 4
+Photo is
+Age: 40 Gender: FEMALE
+"""
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('AEX1345693', 'AEX1345693'),
+    ('id AEX 1345693 here', 'AEX1345693'),
+    ('ABC1/12345', 'ABC1/12345'),
+    ('Name : Ramu', ''),
+])
+def test_find_voter_id(text, expected):
+    assert find_voter_id(text) == expected
+
+
+def test_parse_voter_text():
+    assert parse_voter_text(BOX_TEXT) == {
+        'voter_id': 'AEX1778737', 'name': 'Lakshmi Devi', 'relation_type': 'Husband', 'relative_name': 'Ramu',
+        'house_number': '1-23 Flat 4', 'age': '40', 'gender': 'Female'}
+
+
+@pytest.mark.parametrize('text, age, gender', [
+    ('Age: 45\nGander: F', '45', 'Female'),
+    ('Age > 33 Gender > MALE', '33', 'Male'),
+    # Out of range ages are dropped, gender still comes from the loose match
+    ('Age: 150 Gender: M', '', 'Male'),
+    ('Age: 12 Gender: Female', '', 'Female'),
+])
+def test_age_and_gender(text, age, gender):
+    info = parse_voter_text(text)
+    assert (info['age'], info['gender']) == (age, gender)
+
+
+def test_missing_fields_are_empty():
+    assert parse_voter_text('') == dict.fromkeys(FIELDS, '')
+
+
+def test_fields_come_from_the_most_trusted_text_that_has_them():
+    info = parse_voter_fields(
+        id_texts=['no id', 'AEX1111111', 'AEX2222222'],
+        name_texts=['Name: First\nFather Name: Appa', 'Name: Second'],
+        age_texts=['Age: 40', 'Gender: F', 'Age: 50 Gender: M'],
+        fallback_texts=['99 Male'],
+    )
+    assert (info['voter_id'], info['name'], info['relative_name']) == ('AEX1111111', 'First', 'Appa')
+    # Age and gender read from separate texts are combined
+    assert (info['age'], info['gender']) == ('40', 'Female')
+
+
+def test_loose_fallback_only_fills_what_is_missing():
+    info = parse_voter_fields([], [], ['Age: 40'], ['55 Female'])
+    assert (info['age'], info['gender']) == ('40', 'Female')
+
+
+def test_scan_text_is_cached():
+    scan_text.cache_clear()
+    parse_voter_text(BOX_TEXT)
+    parse_voter_text(BOX_TEXT)
+    assert scan_text.cache_info().hits > 0
+
+
+def test_split_voter_blocks():
+    page = "Header\n\nName : A\nAge: 30\nName: B\nAge: 40\n"
+    assert split_voter_blocks(page) == ["Header\n", "Name : A\nAge: 30", "Name: B\nAge: 40\n"]
+
+
+def test_sample_page():
+    with open(SAMPLE_PAGE, encoding='utf-8') as f:
+        blocks = split_voter_blocks(f.read())
+    records = [parse_voter_text(block) for block in blocks]
+    assert records[1] == {'voter_id': '', 'name': 'PALIMALA VARAHALABABU', 'relation_type': 'Father',
+                          'relative_name': 'PALIMALA KANNAYYA', 'house_number': '1-7', 'age': '33', 'gender': 'Male'}
+    named = [record for record in records if record['name']]
+    assert len(named) >= len(records) - 1
+    assert all(record['gender'] in ('Male', 'Female', '') for record in records)